@@ -0,0 +1,56 @@
+"""Headless SQL Server AlwaysOn planning engine.
+
+Importing this package never touches Streamlit; ``streamlit_app.py`` is a thin
+page over these functions.
+"""
+
+from .cache import LRUCache
+from .defaults import (
+    ALWAYSON_CLUSTER,
+    BYOL,
+    DEFAULT_AUTOMATION_COMPONENTS,
+    DEFAULT_CONFIG_PARAMS,
+    DEFAULT_CURRENT_SKILLS,
+    DEFAULT_GOVERNANCE_FRAMEWORK,
+    DEFAULT_ITIL_PRACTICES,
+    DEFAULT_PLAN,
+    DEFAULT_PORTFOLIO,
+    LICENSE_INCLUDED,
+    OPERATIONS_ROLES,
+    STANDALONE_SQL_SERVER,
+    default_state,
+    make_plan,
+)
+from .engine import (
+    cached_total_cost_of_ownership,
+    calculate_automation_maturity,
+    calculate_enterprise_metrics,
+    calculate_governance_maturity,
+    calculate_infrastructure_costs,
+    calculate_monthly_forecast,
+    calculate_skills_requirements,
+    calculate_sql_server_licensing_aws,
+    calculate_total_cost_of_ownership,
+    calculate_workforce_requirements,
+    estimate_byol_annual_cost,
+    evaluate_plan,
+)
+from .forecast import forecast_arrays, forecast_records, select_scenario, skills_requirements_array
+from .optimizer import optimize_automation
+from .pipeline import PipelineGraph, planning_graph, portfolio_planning_graph
+from .portfolio import (
+    cached_portfolio_costs,
+    calculate_portfolio_costs,
+    calculate_portfolio_licensing,
+    calculate_portfolio_tco,
+    normalize_portfolio,
+    portfolio_rollup,
+    portfolio_totals,
+)
+from .price_index import MissingPriceError, PriceIndex, as_price_index
+from .pricing import DEFAULT_PRICING, EDITION_KEY_MAP, default_pricing
+from .regions import RegionalPricing, catalog_loader, compare_regions, representative_loader
+from .rightsizing import InstanceSizer, rightsize_servers
+from .simulation import DEFAULT_DISTRIBUTIONS, simulate_tco
+from .storage import cheapest_volumes, size_sql_storage
+from .sweep import cheapest_meeting_target, pareto_frontier, sweep_configurations
@@ -0,0 +1,381 @@
+"""Asynchronous HTTP planning API over the engine.
+
+A dependency-free asyncio HTTP/1.1 server (keep-alive, JSON in and out)
+exposing the planning engine to other services:
+
+    POST /tco         TCO for the current, target and no-automation footprints
+    POST /forecast    monthly scaling forecast
+    POST /licensing   SQL Server licensing on AWS
+    POST /rightsize   cheapest instance per server row
+    POST /batch       TCO breakdown, skills gap and forecast tables for many scenarios
+    GET  /health      liveness plus response cache counters
+
+Single-scenario requests take the same body as one entry of a batch
+scenario file (``plan`` plus optional state overrides, see
+``planner.batch``) and are evaluated on the event loop; ``/batch`` runs in a
+process pool. Numeric plan inputs and configuration parameters must lie in
+the ranges the page's sidebar enforces. Responses are memoized by a hash of the path and canonical
+request body, and identical requests arriving together share one evaluation.
+
+    python -m planner.api --port 8080 --workers 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from .batch import build_scenario, evaluate_scenarios
+from .cache import LRUCache
+from .catalog import DEFAULT_CATALOG_PATH
+from .defaults import CONFIG_RANGES, DEFAULT_PLAN, PLAN_RANGES
+from .engine import (
+    cached_total_cost_of_ownership,
+    calculate_automation_maturity,
+    calculate_monthly_forecast,
+    calculate_sql_server_licensing_aws,
+)
+from .price_index import ON_DEMAND
+from .regions import RegionalPricing, catalog_loader, representative_loader
+from .rightsizing import rightsize_servers
+from .scenarios import canonical_json
+
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH_SCENARIOS = 5000
+STATE_OVERRIDES = ('automation_components', 'itil_practices', 'governance_framework', 'current_skills',
+                   'config_params')
+RESPONSE_CACHE_SIZE = int(os.environ.get('SQLAO_API_CACHE_SIZE', 16384))
+
+
+class RequestError(ValueError):
+    """Client error reported with an HTTP status"""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------------------------------------------------------------------
+# Endpoint handlers: plain functions of (request body, price index) -> JSON value
+# ---------------------------------------------------------------------------
+
+def tco_endpoint(request, prices):
+    scenario = build_scenario(request)
+    plan, state = scenario['plan'], scenario['state']
+    automation = calculate_automation_maturity(state['automation_components'])
+    footprints = {'current': (plan['current_clusters'], automation), 'target': (plan['target_clusters'], automation),
+                  'baseline': (plan['target_clusters'], 0)}
+    return {
+        'automation_maturity': automation,
+        **{name: cached_total_cost_of_ownership(clusters, level, plan['timeframe'], plan, prices,
+                                                state['config_params'])
+           for name, (clusters, level) in footprints.items()},
+    }
+
+
+def forecast_endpoint(request, prices):
+    scenario = build_scenario(request)
+    state = scenario['state']
+    automation = calculate_automation_maturity(state['automation_components'])
+    return {'forecast': calculate_monthly_forecast(scenario['plan'], automation, state['current_skills'],
+                                                   state['config_params'])}
+
+
+def licensing_endpoint(request, prices):
+    plan = build_scenario(request)['plan']
+    return calculate_sql_server_licensing_aws(plan['deployment_type'], plan['instance_type'], plan['target_clusters'],
+                                              plan['sql_edition'], plan['licensing_model'], prices, plan['region'])
+
+
+def rightsize_endpoint(request, prices):
+    sized = rightsize_servers(request['servers'], prices, headroom=float(request.get('headroom', 0.0)),
+                              purchase_option=request.get('purchase_option', ON_DEMAND))
+    return {'servers': _records(sized)}
+
+
+def batch_endpoint(request, prices):
+    """Runs in a worker process"""
+
+    scenarios = [build_scenario(entry, position) for position, entry in enumerate(request['scenarios'])]
+    return {table: _records(frame) for table, frame in evaluate_scenarios(scenarios, prices).items()}
+
+
+def _records(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def _check_objects(container, prefix=''):
+    # The plan and state overrides are merged key by key, and component / practice overrides item by item
+    for key in ('plan',) + STATE_OVERRIDES:
+        value = container.get(key) or {}
+        if not isinstance(value, dict):
+            raise RequestError(f"'{prefix}{key}' must be a JSON object")
+        if key in ('automation_components', 'itil_practices'):
+            for item, overrides in value.items():
+                if not isinstance(overrides, dict):
+                    raise RequestError(f"'{prefix}{key}.{item}' must be a JSON object")
+
+
+def _check_ranges(container, prefix=''):
+    # Same bounds as the sidebar widgets: out-of-range sizes and ratios give nonsense results or exhaust memory
+    for key, ranges in (('plan', PLAN_RANGES), ('config_params', CONFIG_RANGES)):
+        values = container.get(key) or {}
+        for name, (low, high) in ranges.items():
+            value = values.get(name, low)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+                raise RequestError(f"'{prefix}{key}.{name}' must be a number from {low} to {high}")
+
+
+def _request_regions(path, request):
+    if path == '/rightsize':
+        regions = {row.get('region') for row in request.get('servers') or [] if isinstance(row, dict)}
+    elif path == '/batch':
+        regions = {(entry.get('plan') or {}).get('region') for entry in request['scenarios']}
+    else:
+        regions = {(request.get('plan') or {}).get('region')}
+    # Never an empty tuple: combined_index(()) raises StopIteration, which cannot cross an await
+    return tuple(sorted(region or DEFAULT_PLAN['region'] for region in regions)) or (DEFAULT_PLAN['region'],)
+
+
+ENDPOINTS = {
+    '/tco': tco_endpoint,
+    '/forecast': forecast_endpoint,
+    '/licensing': licensing_endpoint,
+    '/rightsize': rightsize_endpoint,
+    '/batch': batch_endpoint,
+}
+POOLED_ENDPOINTS = {'/batch'}
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class PlanningService:
+    """Routes requests to endpoint handlers with response memoization and a process pool for batches"""
+
+    def __init__(self, regional_pricing, workers=None, cache_size=RESPONSE_CACHE_SIZE):
+        self.regional_pricing = regional_pricing
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = LRUCache(cache_size)
+        self._pool = None
+        self._indexes = {}
+        self._pending = {}
+
+    def _pool_executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def prices(self, regions):
+        """Price index covering ``regions``; loading runs off the event loop once per region set"""
+
+        index = self._indexes.get(regions)
+        if index is None:
+            if len(regions) == 1:
+                load = self.regional_pricing.index
+                argument = regions[0]
+            else:
+                load = self.regional_pricing.combined_index
+                argument = regions
+            index = self._indexes.setdefault(regions, await asyncio.to_thread(load, argument))
+        return index
+
+    async def respond(self, path, request):
+        """Encoded JSON response body for a parsed request; identical requests are evaluated once"""
+
+        key = hashlib.sha256(f"{path}\n{canonical_json(request)}".encode()).digest()
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            body = await self._evaluate(path, request)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; mark it retrieved for the case with none
+            raise
+        else:
+            self.cache.put(key, body)
+            future.set_result(body)
+            return body
+        finally:
+            del self._pending[key]
+
+    async def _evaluate(self, path, request):
+        if path == '/batch':
+            scenarios = request.get('scenarios')
+            if not isinstance(scenarios, list) or not scenarios:
+                raise RequestError("'scenarios' must be a non-empty list")
+            if len(scenarios) > MAX_BATCH_SCENARIOS:
+                raise RequestError(f"At most {MAX_BATCH_SCENARIOS} scenarios per batch request")
+            for position, entry in enumerate(scenarios):
+                if not isinstance(entry, dict):
+                    raise RequestError(f"'scenarios[{position}]' must be a JSON object")
+                _check_objects(entry, f"scenarios[{position}].")
+                _check_ranges(entry, f"scenarios[{position}].")
+        elif path == '/rightsize':
+            servers = request.get('servers')
+            if not isinstance(servers, list) or not servers or not all(isinstance(row, dict) for row in servers):
+                raise RequestError("'servers' must be a non-empty list of rows with vcpu and memory_gib")
+            headroom = request.get('headroom', 0.0)
+            if isinstance(headroom, bool) or not isinstance(headroom, (int, float)) or not 0 <= headroom <= 1:
+                raise RequestError("'headroom' must be a number from 0 to 1")
+        else:
+            _check_objects(request)
+            _check_ranges(request)
+
+        prices = await self.prices(_request_regions(path, request))
+        handler = ENDPOINTS[path]
+        if path in POOLED_ENDPOINTS and self.workers > 1:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool_executor(), handler, request, prices)
+        else:
+            result = handler(request, prices)
+        try:
+            return canonical_json(result, allow_nan=False).encode()
+        except ValueError:
+            raise RequestError("These inputs produce non-finite results", HTTPStatus.UNPROCESSABLE_ENTITY) from None
+
+    async def handle(self, method, path, body):
+        """(status, encoded JSON body) for one HTTP request"""
+
+        path = path.split('?', 1)[0].rstrip('/') or '/'
+        if path == '/health':
+            return HTTPStatus.OK, json.dumps({'status': 'ok', 'cache': self.cache.stats()}).encode()
+        if path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, _error(f"No endpoint {path}")
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, _error(f"{path} only accepts POST")
+
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise RequestError("Request body must be a JSON object")
+            return HTTPStatus.OK, await self.respond(path, request)
+        except RequestError as e:
+            return e.status, _error(str(e))
+        except (KeyError, ValueError, TypeError) as e:  # Unknown plan or state entries, bad values
+            return HTTPStatus.BAD_REQUEST, _error(e.args[0] if e.args else str(e))
+        except LookupError as e:  # MissingPriceError, or a region the catalog has no prices for
+            return HTTPStatus.UNPROCESSABLE_ENTITY, _error(str(e))
+        except Exception as e:  # Anything else is a bug; answer instead of dropping the connection
+            return HTTPStatus.INTERNAL_SERVER_ERROR, _error(f"Internal error: {type(e).__name__}: {e}")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        self.regional_pricing.close()
+
+
+def _error(message):
+    return json.dumps({'error': message}).encode()
+
+
+# ---------------------------------------------------------------------------
+# HTTP/1.1 over asyncio streams
+# ---------------------------------------------------------------------------
+
+def _response(status, body, keep_alive):
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def _read_request(reader):
+    """(method, path, version, headers, body) of the next request, or None at end of stream"""
+
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode('latin-1').split()
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY_BYTES:
+        raise RequestError(f"Request body over {MAX_BODY_BYTES} bytes", HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b''
+    return method, path, version, headers, body
+
+
+def connection_handler(service):
+    """``asyncio.start_server`` callback serving keep-alive HTTP/1.1 connections"""
+
+    async def serve(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as e:
+                    writer.write(_response(e.status, _error(str(e)), keep_alive=False))
+                    break
+                except ValueError:
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, _error("Malformed HTTP request"), False))
+                    break
+                if request is None:
+                    break
+
+                method, path, version, headers, body = request
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await service.handle(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return serve
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, workers=None, catalog_path=DEFAULT_CATALOG_PATH):
+    loader = catalog_loader(catalog_path) if os.path.exists(catalog_path) else representative_loader
+    service = PlanningService(RegionalPricing(loader), workers)
+    server = await asyncio.start_server(connection_handler(service), host, port)
+    print(f"Planning API listening on http://{host}:{port} "
+          f"({'catalog ' + catalog_path if loader is not representative_loader else 'representative pricing'})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the planning engine over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, help="Processes for /batch requests (default: CPU count)")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH,
+                        help="Price catalog; representative pricing is used when it does not exist")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.catalog))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
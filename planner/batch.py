@@ -0,0 +1,239 @@
+"""Command-line batch runner for scenario files.
+
+Reads a YAML or JSON file of scenarios, evaluates each with the same
+``evaluate_plan`` pipeline as the app (without importing Streamlit or
+Plotly) across a pool of worker processes, and writes the TCO breakdown,
+skills gap and monthly forecast tables as CSV or Parquet.
+
+    python -m planner.batch scenarios.yaml --output-dir results/ --format parquet --workers 4
+
+A scenario file is either a list of scenarios or a mapping with
+``scenarios`` and optional ``defaults`` (plan inputs shared by every
+scenario)::
+
+    defaults:
+      region: us-east-1
+    scenarios:
+      - name: finance
+        plan: {target_clusters: 120, sql_edition: Enterprise}
+        automation_components: {Infrastructure as Code: {enabled: true}}
+        current_skills: {SQL Server DBA Expert: 3}
+        config_params: {dba_ratio: 20}
+
+Plans start from the page defaults; ``automation_components``,
+``itil_practices`` and ``governance_framework`` entries are merged into the
+default state, ``current_skills`` and ``config_params`` override it key by key.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .catalog import DEFAULT_CATALOG_PATH
+from .defaults import DEFAULT_PLAN, default_state, make_plan
+from .engine import evaluate_plan
+from .regions import RegionalPricing, catalog_loader, representative_loader
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+OUTPUT_TABLES = ('tco_breakdown', 'skills_gap', 'forecast')
+FOOTPRINTS = ('current_tco', 'target_tco', 'baseline_tco')
+TCO_COLUMNS = ('scenario', 'footprint', 'clusters', 'timeframe', 'total_monthly', 'total_infrastructure_cost',
+               'total_fte')  # followed by one column per TCO component
+
+
+def read_scenario_file(path):
+    """Raw scenario list from a YAML (.yaml / .yml) or JSON file"""
+
+    with open(path, encoding='utf-8') as handle:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Reading YAML scenario files requires PyYAML (pip install pyyaml)") from e
+            document = yaml.safe_load(handle)
+        else:
+            document = json.load(handle)
+
+    if isinstance(document, list):
+        document = {'scenarios': document}
+    if not isinstance(document, dict) or not document.get('scenarios'):
+        raise ValueError(f"{path} has no scenarios")
+
+    defaults = document.get('defaults') or {}
+    return [{**entry, 'plan': {**defaults, **(entry.get('plan') or {})}} for entry in document['scenarios']]
+
+
+def build_scenario(entry, position=0):
+    """Resolve one scenario entry into ``{'name', 'plan', 'state'}`` on top of the page defaults"""
+
+    state = default_state()
+    for key in ('automation_components', 'itil_practices'):
+        for item, overrides in (entry.get(key) or {}).items():
+            if item not in state[key]:
+                raise KeyError(f"Unknown {key} entry '{item}'")
+            state[key][item].update(overrides)
+    for item, enabled in (entry.get('governance_framework') or {}).items():
+        if item not in state['governance_framework']:
+            raise KeyError(f"Unknown governance_framework entry '{item}'")
+        state['governance_framework'][item] = bool(enabled)
+    state['current_skills'].update(entry.get('current_skills') or {})
+    state['config_params'].update(entry.get('config_params') or {})
+
+    return {'name': str(entry.get('name') or f'scenario_{position + 1}'),
+            'plan': make_plan(**(entry.get('plan') or {})), 'state': state}
+
+
+def scenario_tables(scenario, prices):
+    """TCO breakdown, skills gap and forecast rows for one scenario"""
+
+    name, plan, state = scenario['name'], scenario['plan'], scenario['state']
+    results = evaluate_plan(plan, state['automation_components'], state['itil_practices'],
+                            state['governance_framework'], state['current_skills'], state['config_params'], prices)
+
+    tco_rows = []
+    for footprint in FOOTPRINTS:
+        tco = results[footprint]
+        tco_rows.append({
+            'scenario': name,
+            'footprint': footprint.replace('_tco', ''),
+            'clusters': plan['target_clusters'] if footprint != 'current_tco' else plan['current_clusters'],
+            'timeframe': plan['timeframe'],
+            'total_monthly': tco['infrastructure']['total_monthly'],
+            'total_infrastructure_cost': tco['total_infrastructure_cost'],
+            'total_fte': tco['workforce_requirements']['total_fte'],
+            **tco['tco_breakdown'],
+        })
+
+    required = results['target_tco']['skills_required']
+    skills_rows = [{
+        'scenario': name,
+        'role': role,
+        'current_staff': state['current_skills'].get(role, 0),
+        'required_for_target': required[role],
+        'gap': max(0, required[role] - state['current_skills'].get(role, 0)),
+    } for role in required]
+
+    forecast = pd.json_normalize(results['forecast'])
+    forecast.insert(0, 'scenario', name)
+    return tco_rows, skills_rows, forecast
+
+
+def _zero_absent_components(tco_breakdown):
+    # Components differ by licensing model and Datadog; absent ones cost nothing
+    components = [column for column in tco_breakdown.columns if column not in TCO_COLUMNS]
+    tco_breakdown[components] = tco_breakdown[components].fillna(0.0)
+    return tco_breakdown
+
+
+def evaluate_scenarios(scenarios, prices):
+    """The three output tables for a list of resolved scenarios"""
+
+    tco_rows, skills_rows, forecasts = [], [], []
+    for scenario in scenarios:
+        tco, skills, forecast = scenario_tables(scenario, prices)
+        tco_rows.extend(tco)
+        skills_rows.extend(skills)
+        forecasts.append(forecast)
+
+    return {
+        'tco_breakdown': _zero_absent_components(pd.DataFrame(tco_rows)),
+        'skills_gap': pd.DataFrame(skills_rows),
+        'forecast': pd.concat(forecasts, ignore_index=True),
+    }
+
+
+_worker_state = {}
+
+
+def _init_worker(prices):
+    _worker_state['prices'] = prices
+
+
+def _evaluate_chunk(chunk):
+    return evaluate_scenarios(chunk, _worker_state['prices'])
+
+
+def run_batch(scenarios, prices, workers=None):
+    """Evaluate resolved scenarios, in chunks across ``workers`` processes when there is more than one"""
+
+    workers = min(workers or os.cpu_count() or 1, len(scenarios))
+    if workers <= 1:
+        return evaluate_scenarios(scenarios, prices)
+
+    # Contiguous chunks keep the output in scenario-file order
+    size = -(-len(scenarios) // workers)
+    chunks = [scenarios[start:start + size] for start in range(0, len(scenarios), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(prices,)) as pool:
+        parts = list(pool.map(_evaluate_chunk, chunks))
+    tables = {table: pd.concat([part[table] for part in parts], ignore_index=True) for table in OUTPUT_TABLES}
+    tables['tco_breakdown'] = _zero_absent_components(tables['tco_breakdown'])
+    return tables
+
+
+def batch_prices(scenarios, catalog_path=DEFAULT_CATALOG_PATH):
+    """One price index covering every scenario's region, from the catalog when it exists"""
+
+    loader = catalog_loader(catalog_path) if os.path.exists(catalog_path) else representative_loader
+    regional_pricing = RegionalPricing(loader)
+    try:
+        regions = sorted({scenario['plan'].get('region') or DEFAULT_PLAN['region'] for scenario in scenarios})
+        return regional_pricing.combined_index(regions)
+    finally:
+        regional_pricing.close()
+
+
+def write_tables(tables, output_dir, output_format='csv'):
+    """Write each table as ``<output_dir>/<table>.<format>`` and return the paths"""
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'; expected one of {', '.join(OUTPUT_FORMATS)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for table, frame in tables.items():
+        path = os.path.join(output_dir, f"{table}.{output_format}")
+        if output_format == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        paths[table] = path
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a file of planning scenarios without the web app")
+    parser.add_argument('scenario_file', help="YAML or JSON scenario file")
+    parser.add_argument('--output-dir', default='planner_results')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', dest='output_format')
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH,
+                        help="Price catalog; representative pricing is used when it does not exist")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = [build_scenario(entry, position)
+                     for position, entry in enumerate(read_scenario_file(args.scenario_file))]
+    except (KeyError, ValueError, ImportError) as e:
+        parser.error(e.args[0] if e.args else str(e))
+
+    names = pd.Index([scenario['name'] for scenario in scenarios])
+    duplicates = sorted(set(names[names.duplicated()]))
+    if duplicates:
+        parser.error(f"Duplicate scenario names: {', '.join(duplicates)}")
+
+    if not os.path.exists(args.catalog):
+        print(f"Price catalog {args.catalog} not found; using representative pricing", file=sys.stderr)
+    try:
+        tables = run_batch(scenarios, batch_prices(scenarios, args.catalog), args.workers)
+    except LookupError as e:
+        parser.error(f"Pricing unavailable: {e}")
+    print(json.dumps(write_tables(tables, args.output_dir, args.output_format), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
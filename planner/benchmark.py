@@ -0,0 +1,309 @@
+"""Scaling benchmarks for the planning engine and the page.
+
+Times the engine's core calculations across scale tiers (10 to 10,000
+clusters, 6- and 60-month timeframes, automation catalogs of 20 to 500
+components) and a full page rerun through Streamlit's app test harness.
+Each function is only run over the tiers that reach it: skills and
+infrastructure costs scale with clusters, TCO and the forecast with
+clusters and timeframe, enterprise metrics with clusters and catalog size.
+
+Every run is appended as one JSON line to ``BENCHMARK_RESULTS_PATH`` with
+its label, commit and environment, and compared with the last stored run
+(or the latest run labelled ``--baseline``). The command exits non-zero
+when a case's best time got slower than the baseline by more than the
+regression threshold:
+
+    python -m planner.benchmark --label v1.4
+    python -m planner.benchmark --baseline v1.4 --no-page
+    python -m planner.benchmark --functions calculate_monthly_forecast --clusters 1000 10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+from .defaults import DEFAULT_AUTOMATION_COMPONENTS, DEFAULT_CURRENT_SKILLS, DEFAULT_ITIL_PRACTICES, make_plan
+from .engine import (
+    calculate_enterprise_metrics,
+    calculate_infrastructure_costs,
+    calculate_monthly_forecast,
+    calculate_skills_requirements,
+    calculate_total_cost_of_ownership,
+)
+from .price_index import as_price_index
+from .startup import DEFAULT_APP_PATH
+
+BENCHMARK_CLUSTERS = (10, 100, 1000, 10000)
+BENCHMARK_TIMEFRAMES = (6, 60)
+BENCHMARK_COMPONENTS = (20, 100, 500)
+BENCHMARK_RESULTS_PATH = os.environ.get('SQLAO_BENCHMARK_RESULTS', 'benchmark_results.jsonl')
+REGRESSION_THRESHOLD = 0.25  # Fractional slowdown of a case's best time that counts as a regression
+PAGE_RERUNS = 5
+
+
+def synthetic_components(count):
+    """Automation catalog of ``count`` components cycling the defaults, every other one enabled"""
+
+    templates = list(DEFAULT_AUTOMATION_COMPONENTS.items())
+    components = {}
+    for position in range(count):
+        name, template = templates[position % len(templates)]
+        if position >= len(templates):
+            name = f"{name} #{position // len(templates) + 1}"
+        components[name] = dict(template, enabled=position % 2 == 0)
+    return components
+
+
+def _plan(clusters, timeframe=24):
+    return make_plan(current_clusters=max(1, clusters // 4), target_clusters=clusters, timeframe=timeframe)
+
+
+# Case setups: build the inputs once and return the call to time
+
+def _skills_case(prices, clusters):
+    return lambda: calculate_skills_requirements(clusters, 40.0, True)
+
+
+def _infrastructure_case(prices, clusters):
+    plan = _plan(clusters)
+    return lambda: calculate_infrastructure_costs(
+        clusters, plan['instance_type'], plan['ec2_per_cluster'], plan['current_storage_tb'], plan['ebs_volume_type'],
+        plan['enable_ssm_patching'], plan['sql_edition'], plan['licensing_model'], plan['enable_datadog'],
+        deployment_type=plan['deployment_type'], pricing_data=prices, region=plan['region']
+    )
+
+
+def _tco_case(prices, clusters, timeframe):
+    plan = _plan(clusters, timeframe)
+    return lambda: calculate_total_cost_of_ownership(clusters, 40.0, timeframe, plan, prices)
+
+
+def _forecast_case(prices, clusters, timeframe):
+    plan = _plan(clusters, timeframe)
+    return lambda: calculate_monthly_forecast(plan, 40.0, DEFAULT_CURRENT_SKILLS)
+
+
+def _metrics_case(prices, clusters, components):
+    plan = _plan(clusters)
+    catalog = synthetic_components(components)
+    return lambda: calculate_enterprise_metrics(plan, catalog, DEFAULT_ITIL_PRACTICES, DEFAULT_CURRENT_SKILLS)
+
+
+# Benchmarked calculations: name -> (tiers it scales with, case setup)
+BENCHMARKS = {
+    'calculate_skills_requirements': (('clusters',), _skills_case),
+    'calculate_infrastructure_costs': (('clusters',), _infrastructure_case),
+    'calculate_total_cost_of_ownership': (('clusters', 'timeframe'), _tco_case),
+    'calculate_monthly_forecast': (('clusters', 'timeframe'), _forecast_case),
+    'calculate_enterprise_metrics': (('clusters', 'components'), _metrics_case),
+}
+
+
+def benchmark_cases(functions=None, clusters=BENCHMARK_CLUSTERS, timeframes=BENCHMARK_TIMEFRAMES,
+                    components=BENCHMARK_COMPONENTS):
+    """``(case id, function name, tier values)`` for every benchmarked function over its tiers"""
+
+    tiers = {'clusters': clusters, 'timeframe': timeframes, 'components': components}
+    cases = []
+    for name in functions or BENCHMARKS:
+        axes, _ = BENCHMARKS[name]
+        combinations = [{}]
+        for axis in axes:
+            combinations = [dict(combination, **{axis: value}) for combination in combinations for value in tiers[axis]]
+        for values in combinations:
+            cases.append((f"{name}[{','.join(f'{axis}={value}' for axis, value in values.items())}]", name, values))
+    return cases
+
+
+def time_call(call, repeat=5):
+    """Best and median time per call in ms, over ``repeat`` timings of an auto-ranged loop count"""
+
+    timer = timeit.Timer(call)
+    loops, _ = timer.autorange()
+    timings = [total / loops * 1000 for total in timer.repeat(repeat=repeat, number=loops)]
+    return {'best_ms': min(timings), 'median_ms': statistics.median(timings), 'loops': loops}
+
+
+def run_engine_benchmarks(cases, prices=None, repeat=5, progress=None):
+    """Timing of each engine case: case id -> ``time_call`` result"""
+
+    prices = as_price_index(prices)
+    results = {}
+    for case_id, name, values in cases:
+        call = BENCHMARKS[name][1](prices, **values)
+        results[case_id] = time_call(call, repeat)
+        if progress:
+            progress(case_id, results[case_id])
+    return results
+
+
+def run_page_benchmark(app_path=DEFAULT_APP_PATH, reruns=PAGE_RERUNS):
+    """Full page runs through Streamlit's app test harness.
+
+    ``page[first_run]`` is the first script run in this process (modules
+    already imported; see ``planner.startup`` for the cold start),
+    ``page[rerun]`` a rerun with no input changed and
+    ``page[rerun_after_edit]`` a rerun after the target cluster count changes.
+    """
+
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(app_path, default_timeout=600)
+
+    def timed_run(edit=None):
+        started = time.perf_counter()
+        (edit() if edit else app).run()
+        if app.exception:
+            raise RuntimeError(f"App raised: {app.exception[0].message}")
+        return (time.perf_counter() - started) * 1000
+
+    first_run = timed_run()
+    unchanged = [timed_run() for _ in range(reruns)]
+    target = app.number_input(key='plan_target_clusters')
+    values = (target.value + 10, target.value)
+    edited = [timed_run(lambda value=values[run % 2]: app.number_input(key='plan_target_clusters').set_value(value))
+              for run in range(reruns)]
+
+    return {
+        'page[first_run]': {'best_ms': first_run, 'median_ms': first_run, 'loops': 1},
+        'page[rerun]': {'best_ms': min(unchanged), 'median_ms': statistics.median(unchanged), 'loops': reruns},
+        'page[rerun_after_edit]': {'best_ms': min(edited), 'median_ms': statistics.median(edited), 'loops': reruns},
+    }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None if result.returncode == 0 else None
+
+
+def run_metadata(label=None):
+    """Label, commit, time and environment of a benchmark run"""
+
+    import numpy
+    import pandas
+
+    commit = _git_commit()
+    return {
+        'label': label or commit or 'unlabelled',
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+    }
+
+
+def load_runs(path=BENCHMARK_RESULTS_PATH):
+    """Stored benchmark runs, oldest first"""
+
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def save_run(run, path=BENCHMARK_RESULTS_PATH):
+    """Append one run as a JSON line"""
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(json.dumps(run, separators=(',', ':')) + '\n')
+
+
+def find_baseline(runs, label=None):
+    """Latest stored run, or the latest labelled ``label``; None when there is none"""
+
+    candidates = [run for run in runs if label is None or run['label'] == label]
+    return candidates[-1] if candidates else None
+
+
+def compare_runs(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Cases in both runs with their change in best time, slowest change first, flagged past ``threshold``"""
+
+    changes = []
+    for case_id, result in current['results'].items():
+        previous = baseline['results'].get(case_id)
+        if previous is None or previous['best_ms'] <= 0:
+            continue
+        change = result['best_ms'] / previous['best_ms'] - 1
+        changes.append({'case': case_id, 'baseline_ms': previous['best_ms'], 'current_ms': result['best_ms'],
+                        'change': change, 'regression': change > threshold})
+    return sorted(changes, key=lambda item: item['change'], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planning engine across scale tiers and the page rerun")
+    parser.add_argument('--label', help="Name of this run in the results file (default: the git commit)")
+    parser.add_argument('--results', default=BENCHMARK_RESULTS_PATH, help="JSON lines file of stored runs")
+    parser.add_argument('--baseline', metavar='LABEL', help="Compare with the latest run with this label "
+                                                            "(default: the latest stored run)")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {REGRESSION_THRESHOLD:.0%})")
+    parser.add_argument('--functions', nargs='+', choices=list(BENCHMARKS), help="Only benchmark these functions")
+    parser.add_argument('--clusters', nargs='+', type=int, default=BENCHMARK_CLUSTERS)
+    parser.add_argument('--timeframes', nargs='+', type=int, default=BENCHMARK_TIMEFRAMES)
+    parser.add_argument('--components', nargs='+', type=int, default=BENCHMARK_COMPONENTS)
+    parser.add_argument('--repeat', type=int, default=5, help="Timings per case; the best and median are kept")
+    parser.add_argument('--no-page', action='store_true', help="Skip the full page rerun benchmark")
+    parser.add_argument('--app', default=DEFAULT_APP_PATH)
+    parser.add_argument('--reruns', type=int, default=PAGE_RERUNS, help="Page reruns per page case")
+    parser.add_argument('--no-save', action='store_true', help="Compare without storing this run")
+    parser.add_argument('--json', action='store_true', help="Print the run and comparison as JSON")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1 or args.reruns < 1:
+        parser.error("--repeat and --reruns must be at least 1")
+
+    def progress(case_id, result):
+        if not args.json:
+            print(f"{case_id:<72} {result['best_ms']:12.4f} ms  (median {result['median_ms']:.4f})", flush=True)
+
+    results = run_engine_benchmarks(benchmark_cases(args.functions, args.clusters, args.timeframes, args.components),
+                                    repeat=args.repeat, progress=progress)
+    if not args.no_page:
+        try:
+            page_results = run_page_benchmark(args.app, args.reruns)
+        except ImportError:
+            print("Streamlit is not installed; skipping the page benchmark", file=sys.stderr)
+        else:
+            for case_id, result in page_results.items():
+                progress(case_id, result)
+            results.update(page_results)
+
+    run = {**run_metadata(args.label), 'results': results}
+    baseline = find_baseline(load_runs(args.results), args.baseline)
+    if baseline is None and args.baseline:
+        parser.error(f"No stored run labelled '{args.baseline}' in {args.results}")
+    changes = compare_runs(run, baseline, args.threshold) if baseline else []
+    regressions = [change for change in changes if change['regression']]
+    if not args.no_save:
+        save_run(run, args.results)
+
+    if args.json:
+        print(json.dumps({'run': run, 'baseline': baseline and baseline['label'], 'changes': changes}, indent=2))
+    elif baseline is None:
+        print(f"No earlier run in {args.results} to compare with")
+    else:
+        print(f"\nCompared with {baseline['label']} ({baseline['timestamp']}): "
+              f"{len(regressions)} of {len(changes)} cases over {args.threshold:.0%} slower")
+        for change in regressions:
+            print(f"  {change['case']:<70} {change['baseline_ms']:.4f} -> {change['current_ms']:.4f} ms "
+                  f"({change['change']:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
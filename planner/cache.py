@@ -0,0 +1,87 @@
+"""Process-wide bounded LRU cache for planning results.
+
+Streamlit runs every session in the same process, so results cached here are
+shared by all sessions: two planners with identical inputs reuse one result.
+Cached values are shared objects and must be treated as read-only.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = int(os.environ.get('SQLAO_RESULT_CACHE_SIZE', 4096))
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a size bound and hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Cached value for ``key`` (counted as a hit or miss), or ``default``"""
+
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entries past ``maxsize``"""
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` and storing the result on a miss"""
+
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # Compute outside the lock; concurrent misses on one key just store the same result twice
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Counters snapshot: hits, misses, evictions, size, maxsize and hit_rate"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
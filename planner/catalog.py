@@ -0,0 +1,528 @@
+"""AWS Pricing API ingestion into a compact on-disk SQLite price catalog.
+
+Ingestion pages through ``pricing:GetProducts`` for Windows / SQL Server EC2,
+EBS (storage, IOPS and gp3 throughput) and Systems Manager, normalizes the price lists and stores them keyed by
+region, instance type, OS, license model, edition and purchase option. The
+app loads the catalog at startup instead of calling AWS on every cache expiry.
+
+    python -m planner.catalog ingest --catalog pricing_catalog.sqlite --region us-east-1
+    python -m planner.catalog ingest --from-dump price_lists.json --catalog pricing_catalog.sqlite
+    python -m planner.catalog summary --catalog pricing_catalog.sqlite
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+from .pricing import EDITION_KEY_MAP, default_pricing
+
+DEFAULT_CATALOG_PATH = os.environ.get('SQLAO_PRICING_CATALOG', 'pricing_catalog.sqlite')
+DEFAULT_REGION = 'us-east-1'
+PRICING_API_REGION = 'us-east-1'  # GetProducts is only served from a few regions
+HOURS_PER_YEAR = 8760
+
+EC2_SERVICE_CODE = 'AmazonEC2'
+SSM_SERVICE_CODE = 'AWSSystemsManager'
+
+# preInstalledSw attribute -> edition column ("Windows" means no SQL Server)
+PREINSTALLED_SW_EDITIONS = {
+    'NA': 'Windows',
+    'SQL Web': 'Web',
+    'SQL Std': 'Standard',
+    'SQL Ent': 'Enterprise',
+}
+
+LICENSE_MODELS = {
+    'No License required': 'License-Included',
+    'Bring your own license': 'BYOL',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ec2_prices (
+    region TEXT NOT NULL,
+    instance_type TEXT NOT NULL,
+    operating_system TEXT NOT NULL,
+    license_model TEXT NOT NULL,
+    edition TEXT NOT NULL,
+    purchase_option TEXT NOT NULL,
+    price_per_hour REAL NOT NULL,
+    PRIMARY KEY (region, instance_type, operating_system, license_model, edition, purchase_option)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS instance_specs (
+    instance_type TEXT PRIMARY KEY,
+    vcpu INTEGER,
+    memory_gib REAL,
+    network_gbps REAL,
+    ebs_bandwidth_mbps REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ebs_prices (
+    region TEXT NOT NULL,
+    volume_type TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    begin_range REAL NOT NULL,
+    end_range REAL,
+    unit TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (region, volume_type, dimension, begin_range)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ssm_prices (
+    region TEXT NOT NULL,
+    usage_type TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (region, usage_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+# ---------------------------------------------------------------------------
+# Pricing API access
+# ---------------------------------------------------------------------------
+
+def term_filters(**attributes):
+    """Build GetProducts TERM_MATCH filters from attribute keyword arguments"""
+
+    return [{'Type': 'TERM_MATCH', 'Field': field, 'Value': value} for field, value in attributes.items()]
+
+
+def iter_price_list(client, service_code, filters, page_size=100):
+    """Yield decoded price list items, following NextToken until exhausted"""
+
+    kwargs = {'ServiceCode': service_code, 'Filters': filters, 'FormatVersion': 'aws_v1', 'MaxResults': page_size}
+    while True:
+        response = client.get_products(**kwargs)
+        for item in response.get('PriceList', []):
+            yield json.loads(item) if isinstance(item, str) else item
+        next_token = response.get('NextToken')
+        if not next_token:
+            return
+        kwargs['NextToken'] = next_token
+
+
+class PriceListDumpClient:
+    """Offline stand-in for the Pricing API client backed by a JSON dump.
+
+    The dump maps service code -> list of price list items, as written by
+    ``ingest --dump``. TERM_MATCH filters and NextToken paging behave like the
+    real ``get_products`` so ingestion runs unchanged without AWS access.
+    """
+
+    def __init__(self, price_lists):
+        self.price_lists = price_lists
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as handle:
+            return cls(json.load(handle))
+
+    def get_products(self, ServiceCode, Filters=(), MaxResults=100, NextToken=None, **_):
+        items = [
+            item for item in self.price_lists.get(ServiceCode, [])
+            if all(_attribute(item, f['Field']) == f['Value'] for f in Filters)
+        ]
+        start = int(NextToken or 0)
+        page = items[start:start + MaxResults]
+        response = {'PriceList': [json.dumps(item) for item in page]}
+        if start + MaxResults < len(items):
+            response['NextToken'] = str(start + MaxResults)
+        return response
+
+
+def _attribute(item, field):
+    product = item.get('product', {})
+    if field in product:
+        return product[field]
+    return product.get('attributes', {}).get(field)
+
+
+def create_pricing_client(profile_name=None):
+    """Create a boto3 Pricing API client (boto3 is only needed for live ingestion)"""
+
+    import boto3
+
+    session = boto3.Session(profile_name=profile_name)
+    return session.client('pricing', region_name=PRICING_API_REGION)
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+def _first_number(text):
+    match = re.search(r'[\d.,]+', text or '')
+    return float(match.group(0).replace(',', '')) if match else None
+
+
+def _usd(dimension):
+    return float(dimension['pricePerUnit'].get('USD', 0))
+
+
+def parse_instance_specs(attributes):
+    """Pull vCPU / memory / network / EBS bandwidth out of EC2 product attributes"""
+
+    network = attributes.get('networkPerformance', '')
+    network_gbps = _first_number(network)
+    if network_gbps is not None and 'Megabit' in network:
+        network_gbps /= 1000
+
+    return {
+        'instance_type': attributes['instanceType'],
+        'vcpu': int(_first_number(attributes.get('vcpu')) or 0),
+        'memory_gib': _first_number(attributes.get('memory')),
+        'network_gbps': network_gbps,
+        'ebs_bandwidth_mbps': _first_number(attributes.get('dedicatedEbsThroughput')),
+    }
+
+
+def ec2_purchase_options(terms):
+    """Effective hourly rate per purchase option: On-Demand plus standard Reserved terms"""
+
+    options = {}
+    for term in terms.get('OnDemand', {}).values():
+        for dimension in term['priceDimensions'].values():
+            if dimension.get('unit') == 'Hrs':
+                options['OnDemand'] = _usd(dimension)
+
+    for term in terms.get('Reserved', {}).values():
+        attributes = term.get('termAttributes', {})
+        if attributes.get('OfferingClass', 'standard') != 'standard':
+            continue
+        years = int(_first_number(attributes.get('LeaseContractLength')) or 1)
+        hourly = upfront = 0.0
+        for dimension in term['priceDimensions'].values():
+            if dimension.get('unit') == 'Quantity':
+                upfront += _usd(dimension)
+            else:
+                hourly += _usd(dimension)
+        option = f"{years}yr {attributes.get('PurchaseOption', 'No Upfront')}"
+        options[option] = hourly + upfront / (HOURS_PER_YEAR * years)
+
+    return options
+
+
+def normalize_ec2_product(item):
+    """Return (price rows, spec row) for one EC2 price list item, or ([], None) if out of scope"""
+
+    attributes = item['product'].get('attributes', {})
+    edition = PREINSTALLED_SW_EDITIONS.get(attributes.get('preInstalledSw'))
+    license_model = LICENSE_MODELS.get(attributes.get('licenseModel'))
+    if not edition or not license_model or 'instanceType' not in attributes:
+        return [], None
+
+    rows = [
+        {
+            'region': attributes.get('regionCode', ''),
+            'instance_type': attributes['instanceType'],
+            'operating_system': attributes.get('operatingSystem', 'Windows'),
+            'license_model': license_model,
+            'edition': edition,
+            'purchase_option': option,
+            'price_per_hour': price,
+        }
+        for option, price in ec2_purchase_options(item.get('terms', {})).items()
+    ]
+    return rows, parse_instance_specs(attributes)
+
+
+def _ebs_dimension(product):
+    if product.get('productFamily') == 'Storage':
+        return 'storage'
+    group = product.get('attributes', {}).get('group', '')
+    return re.sub(r'[^a-z0-9]+', '_', group.lower().replace('ebs', '')).strip('_') or 'other'
+
+
+def normalize_ebs_product(item):
+    """Return tiered price rows for one EBS storage / IOPS / throughput product"""
+
+    product = item['product']
+    attributes = product.get('attributes', {})
+    volume_type = attributes.get('volumeApiName')
+    if not volume_type:
+        return []
+
+    rows = []
+    for term in item.get('terms', {}).get('OnDemand', {}).values():
+        for dimension in term['priceDimensions'].values():
+            end_range = dimension.get('endRange', 'Inf')
+            rows.append({
+                'region': attributes.get('regionCode', ''),
+                'volume_type': volume_type,
+                'dimension': _ebs_dimension(product),
+                'begin_range': float(dimension.get('beginRange', 0)),
+                'end_range': None if end_range == 'Inf' else float(end_range),
+                'unit': dimension.get('unit', ''),
+                'price': _usd(dimension),
+            })
+    return rows
+
+
+def normalize_ssm_product(item):
+    """Return hourly price rows for one Systems Manager product"""
+
+    attributes = item['product'].get('attributes', {})
+    rows = []
+    for term in item.get('terms', {}).get('OnDemand', {}).values():
+        for dimension in term['priceDimensions'].values():
+            if dimension.get('unit') != 'Hrs':
+                continue
+            rows.append({
+                'region': attributes.get('regionCode', ''),
+                'usage_type': attributes.get('usagetype', ''),
+                'unit': dimension['unit'],
+                'price': _usd(dimension),
+            })
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Catalog storage
+# ---------------------------------------------------------------------------
+
+def connect_catalog(path=DEFAULT_CATALOG_PATH):
+    """Open (and create if needed) the SQLite price catalog"""
+
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _upsert(connection, table, rows):
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    connection.executemany(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows]
+    )
+    return len(rows)
+
+
+def region_queries(region):
+    """(service code, filters) for every GetProducts query the catalog needs in one region"""
+
+    return [
+        (EC2_SERVICE_CODE, term_filters(regionCode=region, operatingSystem='Windows', tenancy='Shared',
+                                        capacitystatus='Used', productFamily='Compute Instance')),
+        (EC2_SERVICE_CODE, term_filters(regionCode=region, productFamily='Storage')),
+        (EC2_SERVICE_CODE, term_filters(regionCode=region, productFamily='System Operation')),
+        (EC2_SERVICE_CODE, term_filters(regionCode=region, productFamily='Provisioned Throughput')),
+        (SSM_SERVICE_CODE, term_filters(regionCode=region)),
+    ]
+
+
+def ingest_region(client, connection, region):
+    """Page through EC2 Windows/SQL, EBS and SSM price lists for one region into the catalog"""
+
+    rows = {'ec2_prices': [], 'ebs_prices': [], 'ssm_prices': []}
+    specs = {}
+    for service_code, filters in region_queries(region):
+        for item in iter_price_list(client, service_code, filters):
+            if service_code == SSM_SERVICE_CODE:
+                rows['ssm_prices'].extend(normalize_ssm_product(item))
+            elif item['product'].get('productFamily') == 'Compute Instance':
+                price_rows, spec = normalize_ec2_product(item)
+                rows['ec2_prices'].extend(price_rows)
+                if spec:
+                    specs[spec['instance_type']] = spec
+            else:
+                rows['ebs_prices'].extend(normalize_ebs_product(item))
+
+    counts = {table: _upsert(connection, table, table_rows) for table, table_rows in rows.items()}
+    counts['instance_specs'] = _upsert(connection, 'instance_specs', list(specs.values()))
+    return counts
+
+
+def ingest_pricing(client, regions, catalog_path=DEFAULT_CATALOG_PATH):
+    """Ingest every region into the catalog in one transaction and stamp the refresh time"""
+
+    connection = connect_catalog(catalog_path)
+    totals = {}
+    try:
+        with connection:
+            for region in regions:
+                for table, count in ingest_region(client, connection, region).items():
+                    totals[table] = totals.get(table, 0) + count
+            _upsert(connection, 'catalog_meta', [
+                {'key': 'last_updated', 'value': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")},
+            ])
+    finally:
+        connection.close()
+    return totals
+
+
+def dump_price_lists(client, regions, path):
+    """Save the raw price lists the ingestion reads, for offline re-ingestion"""
+
+    price_lists = {EC2_SERVICE_CODE: [], SSM_SERVICE_CODE: []}
+    for region in regions:
+        for service_code, filters in region_queries(region):
+            price_lists[service_code].extend(iter_price_list(client, service_code, filters))
+
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(price_lists, handle)
+    return {service: len(items) for service, items in price_lists.items()}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def catalog_regions(catalog_path=DEFAULT_CATALOG_PATH):
+    """Regions present in the catalog"""
+
+    connection = connect_catalog(catalog_path)
+    try:
+        return [row[0] for row in connection.execute("SELECT DISTINCT region FROM ec2_prices ORDER BY region")]
+    finally:
+        connection.close()
+
+
+def load_instance_specs(catalog_path=DEFAULT_CATALOG_PATH):
+    """The catalog's instance_specs table as a DataFrame indexed by instance type"""
+
+    import pandas as pd
+
+    connection = connect_catalog(catalog_path)
+    try:
+        return pd.read_sql_query(
+            "SELECT instance_type, vcpu, memory_gib, network_gbps, ebs_bandwidth_mbps FROM instance_specs",
+            connection, index_col='instance_type'
+        )
+    finally:
+        connection.close()
+
+
+def pricing_from_connection(connection, region=DEFAULT_REGION, purchase_option='OnDemand'):
+    """Build a ``pricing_data`` dict for one region from an open catalog connection.
+
+    The result has the same shape as ``pricing.DEFAULT_PRICING`` so every
+    engine function works unchanged; tables missing from the catalog keep the
+    representative defaults.
+    """
+
+    pricing = default_pricing()
+    rows = connection.execute(
+        "SELECT instance_type, edition, price_per_hour FROM ec2_prices "
+        "WHERE region = ? AND license_model = 'License-Included' AND purchase_option = ?",
+        (region, purchase_option)
+    ).fetchall()
+    if not rows:
+        raise LookupError(f"No {purchase_option} EC2 prices for region {region} in the catalog")
+
+    edition_tables = {'Windows': 'ec2_windows', **EDITION_KEY_MAP}
+    for table in edition_tables.values():
+        pricing[table] = {}
+    for instance_type, edition, price in rows:
+        pricing[edition_tables[edition]][instance_type] = price
+
+    ebs_tiers = {}
+    for volume_type, dimension, begin, end, unit, price in connection.execute(
+        "SELECT volume_type, dimension, begin_range, end_range, unit, price FROM ebs_prices "
+        "WHERE region = ? ORDER BY volume_type, dimension, begin_range", (region,)
+    ):
+        ebs_tiers.setdefault(volume_type, {}).setdefault(dimension, []).append((begin, end, price, unit))
+        if dimension == 'storage' and begin == 0:
+            pricing['ebs'][volume_type] = price
+    pricing['ebs_tiers'] = ebs_tiers
+
+    # Advanced-tier instance management hours are the closest SSM hourly rate to patch management
+    ssm_row = connection.execute(
+        "SELECT price FROM ssm_prices WHERE region = ? AND usage_type LIKE '%Adv%' AND price > 0 "
+        "ORDER BY price LIMIT 1", (region,)
+    ).fetchone()
+    if ssm_row:
+        pricing['ssm']['patch_manager'] = ssm_row[0]
+
+    meta = dict(connection.execute("SELECT key, value FROM catalog_meta"))
+
+    pricing['region'] = region
+    pricing['purchase_option'] = purchase_option
+    pricing['last_updated'] = f"AWS Pricing API catalog ({meta.get('last_updated', 'unknown')})"
+    return pricing
+
+
+def load_catalog_pricing(catalog_path=DEFAULT_CATALOG_PATH, region=DEFAULT_REGION, purchase_option='OnDemand'):
+    """Build a ``pricing_data`` dict for one region from the catalog file"""
+
+    if not os.path.exists(catalog_path):
+        raise FileNotFoundError(f"Pricing catalog not found: {catalog_path}")
+
+    connection = connect_catalog(catalog_path)
+    try:
+        return pricing_from_connection(connection, region, purchase_option)
+    finally:
+        connection.close()
+
+
+def fetch_region_pricing(client, region, purchase_option='OnDemand'):
+    """Ingest one region from the Pricing API into an in-memory catalog and return its pricing dict"""
+
+    connection = connect_catalog(':memory:')
+    try:
+        ingest_region(client, connection, region)
+        _upsert(connection, 'catalog_meta', [
+            {'key': 'last_updated', 'value': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")},
+        ])
+        return pricing_from_connection(connection, region, purchase_option)
+    finally:
+        connection.close()
+
+
+def catalog_summary(catalog_path=DEFAULT_CATALOG_PATH):
+    """Row counts per table and region, for the ``summary`` command"""
+
+    connection = connect_catalog(catalog_path)
+    try:
+        summary = {}
+        for table in ('ec2_prices', 'ebs_prices', 'ssm_prices'):
+            summary[table] = dict(connection.execute(f"SELECT region, COUNT(*) FROM {table} GROUP BY region"))
+        summary['instance_specs'] = connection.execute("SELECT COUNT(*) FROM instance_specs").fetchone()[0]
+        summary['meta'] = dict(connection.execute("SELECT key, value FROM catalog_meta"))
+        return summary
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect the local AWS price catalog")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="Page through the Pricing API into the catalog")
+    ingest.add_argument('--catalog', default=DEFAULT_CATALOG_PATH)
+    ingest.add_argument('--region', action='append', dest='regions',
+                        help="Region code to ingest (repeatable, default us-east-1)")
+    ingest.add_argument('--profile', help="AWS profile for the Pricing API")
+    ingest.add_argument('--from-dump', help="Ingest from a saved price list dump instead of calling AWS")
+    ingest.add_argument('--dump', help="Also save the raw price lists to this JSON file")
+
+    summary = commands.add_parser('summary', help="Show catalog contents")
+    summary.add_argument('--catalog', default=DEFAULT_CATALOG_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'summary':
+        print(json.dumps(catalog_summary(args.catalog), indent=2))
+        return 0
+
+    regions = args.regions or [DEFAULT_REGION]
+    if args.from_dump:
+        client = PriceListDumpClient.from_file(args.from_dump)
+    else:
+        client = create_pricing_client(args.profile)
+    if args.dump:
+        # Fetch once, then ingest from the saved dump
+        print(json.dumps(dump_price_lists(client, regions, args.dump)))
+        client = PriceListDumpClient.from_file(args.dump)
+    print(json.dumps(ingest_pricing(client, regions, args.catalog)))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
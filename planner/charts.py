@@ -0,0 +1,144 @@
+"""Browser-friendly Plotly figures: LTTB downsampling, WebGL switching and payload size.
+
+Every figure the page ships is serialized to JSON and rendered by the
+browser on each rerun. ``optimize_figure`` keeps that bounded: line traces
+longer than ``max_points`` are downsampled with Largest-Triangle-Three-Buckets
+(which keeps the visual peaks and troughs a plain stride would drop), and
+figures still carrying more than ``webgl_threshold`` points switch their
+scatter traces to ``Scattergl``. ``figure_payload`` reports what is left.
+
+Plotly is only imported here and by the page; the engine never needs it.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+MAX_POINTS_PER_TRACE = 1000
+WEBGL_POINT_THRESHOLD = 5000
+
+# Trace properties holding one value per point, downsampled alongside x and y
+PER_POINT_KEYS = ('x', 'y', 'text', 'hovertext', 'customdata', 'ids')
+
+
+def lttb(x, y, threshold):
+    """Indices of the ``threshold`` points Largest-Triangle-Three-Buckets keeps from series ``(x, y)``.
+
+    ``x`` must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle with
+    the previously kept point and the next bucket's average.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    # Bucket boundaries for the points between the first and the last
+    edges = (np.arange(threshold - 1) * (size - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = size - 1
+    averages_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / np.diff(edges)
+    averages_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / np.diff(edges)
+    averages_x = np.append(averages_x[1:], x[-1])
+    averages_y = np.append(averages_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        areas = np.abs((ax - averages_x[bucket]) * (y[start:stop] - ay)
+                       - (ax - x[start:stop]) * (averages_y[bucket] - ay))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def _is_line(trace):
+    mode = trace.get('mode')
+    return mode is None or 'lines' in mode
+
+
+def _has_point_styles(trace):
+    """Error bars or per-point marker arrays that would need downsampling too"""
+
+    styled = [trace.get('error_x', {}), trace.get('error_y', {}), trace.get('marker', {})]
+    return any(isinstance(value, (list, tuple, np.ndarray)) and len(value) > 1
+               for style in styled for value in style.values())
+
+
+def _downsample(trace, max_points):
+    """Trace dict with its points reduced to ``max_points`` by LTTB; non-line and styled traces are kept whole"""
+
+    y = trace.get('y')
+    if y is None or len(y) <= max_points or not _is_line(trace) or _has_point_styles(trace):
+        return trace
+
+    x = trace.get('x')
+    try:
+        positions = np.arange(len(y)) if x is None else np.asarray(x, dtype=float)
+        values = np.asarray(y, dtype=float)
+    except (TypeError, ValueError):
+        positions = np.arange(len(y))  # Category or date labels: bucket by position
+        values = np.asarray(y, dtype=float)
+    if np.isnan(values).any() or np.any(np.diff(positions) < 0):
+        return trace
+
+    keep = lttb(positions, values, max_points)
+    trace = dict(trace)
+    for key in PER_POINT_KEYS:
+        value = trace.get(key)
+        if isinstance(value, (list, tuple, np.ndarray)) and len(value) == len(y):
+            trace[key] = np.asarray(value)[keep]
+    if x is None:
+        trace['x'] = keep
+    return trace
+
+
+def figure_points(fig):
+    """Number of (x, y) points across a figure's traces"""
+
+    return sum(len(trace.y) for trace in fig.data if getattr(trace, 'y', None) is not None)
+
+
+def optimize_figure(fig, max_points=MAX_POINTS_PER_TRACE, webgl_threshold=WEBGL_POINT_THRESHOLD):
+    """Downsample long line traces with LTTB and switch to WebGL above ``webgl_threshold`` points.
+
+    Returns ``fig`` unchanged when neither applies, otherwise a new figure
+    with the same layout. Either way the figure carries ``_source_points``,
+    its point count before downsampling, for ``figure_payload``.
+    """
+
+    source_points = figure_points(fig)
+    long_traces = any(getattr(trace, 'y', None) is not None and len(trace.y) > max_points for trace in fig.data)
+    if not long_traces and source_points <= webgl_threshold:
+        fig._source_points = source_points
+        return fig
+
+    traces = [_downsample(trace.to_plotly_json(), max_points) for trace in fig.data]
+    if sum(len(trace['y']) for trace in traces if trace.get('y') is not None) > webgl_threshold:
+        for trace in traces:
+            # Stacked areas have no WebGL form; other scatter options carry over
+            if trace['type'] == 'scatter' and 'stackgroup' not in trace:
+                trace['type'] = 'scattergl'
+
+    optimized = go.Figure(layout=fig.layout)
+    optimized.add_traces([go.Scattergl(trace, skip_invalid=True) if trace['type'] == 'scattergl' else trace
+                          for trace in traces])
+    optimized._source_points = source_points
+    return optimized
+
+
+def figure_payload(fig):
+    """Size of the JSON the browser receives for ``fig`` plus its point and WebGL trace counts"""
+
+    points = figure_points(fig)
+    return {
+        'bytes': len(pio.to_json(fig, validate=False).encode()),
+        'traces': len(fig.data),
+        'points': points,
+        'source_points': getattr(fig, '_source_points', points),
+        'webgl': sum(trace.type == 'scattergl' for trace in fig.data),
+    }
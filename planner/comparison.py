@@ -0,0 +1,168 @@
+"""Side-by-side comparison of saved planning scenarios.
+
+Every scenario's current, target and no-automation baseline footprints are
+priced together in one ``calculate_portfolio_costs`` batch, and FTE needs and
+monthly forecasts come from the array forms of the skills and forecast
+models, one call per distinct timeframe / configuration. Twenty scenarios
+cost about as much as one full-page evaluation.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .defaults import BYOL, OPERATIONS_ROLES, resolve_config
+from .engine import calculate_automation_maturity
+from .forecast import forecast_arrays, skills_requirements_array
+from .portfolio import calculate_portfolio_costs
+from .price_index import as_price_index
+
+MAX_COMPARED_SCENARIOS = 20
+
+# TCO component -> monthly cost column, in the order of engine.calculate_total_cost_of_ownership
+TCO_COMPONENTS = {
+    'EC2 Compute': 'ec2_compute_monthly',
+    'EBS Storage': 'ebs_monthly',
+    'SSM Patching': 'ssm_monthly',
+    'Data Transfer': 'data_transfer_monthly',
+    'SQL Licensing (AWS)': 'sql_licensing_monthly',
+    'BYOL Licensing': None,
+    'Datadog Monitoring': 'datadog_monthly',
+}
+
+FORECAST_COLUMNS = ('clusters', 'automation_maturity', 'total_team_size', 'total_new_hires')
+
+# Per-role forecast columns, named as pd.json_normalize flattens the forecast records
+ROLE_FORECAST_COLUMNS = {f'{group}.{role}': (group, role)
+                         for group in ('required_skills', 'new_hires_needed') for role in OPERATIONS_ROLES}
+
+
+def _config_key(config_params):
+    return tuple(resolve_config(config_params).items())
+
+
+def _footprints(plans, clusters_column):
+    """Portfolio rows pricing every scenario's plan at one footprint (current or target clusters)"""
+
+    return pd.DataFrame({
+        'clusters': plans[clusters_column],
+        'instance_type': plans['instance_type'],
+        'ec2_per_cluster': plans['ec2_per_cluster'],
+        'storage_tb': plans['current_storage_tb'],
+        'ebs_volume_type': plans['ebs_volume_type'],
+        'storage_iops': plans['storage_iops'],
+        'storage_throughput_mbps': plans['storage_throughput_mbps'],
+        'enable_ssm_patching': plans['enable_ssm_patching'],
+        'sql_edition': plans['sql_edition'],
+        'licensing_model': plans['licensing_model'],
+        'enable_datadog': plans['enable_datadog'],
+        'deployment_type': plans['deployment_type'],
+        'region': plans['region'],
+    })
+
+
+def compare_scenarios(scenarios, pricing_data=None, max_scenarios=MAX_COMPARED_SCENARIOS):
+    """Aligned TCO, FTE and forecast results for several scenarios.
+
+    ``scenarios`` is a list of ``{'name', 'plan', 'state'}`` dicts as returned
+    by ``scenarios.load_scenario``. Returns a dict of DataFrames: ``summary``
+    (one row per scenario), ``tco_breakdown`` (scenario x TCO component over
+    each scenario's timeframe) and ``forecast`` (one row per scenario and month,
+    with per-role required and new-hire columns).
+    """
+
+    if not scenarios:
+        raise ValueError("Nothing to compare: no scenarios given")
+    if len(scenarios) > max_scenarios:
+        raise ValueError(f"At most {max_scenarios} scenarios can be compared at once, got {len(scenarios)}")
+
+    prices = as_price_index(pricing_data)
+    names = [scenario['name'] for scenario in scenarios]
+    states = [scenario['state'] for scenario in scenarios]
+    plans = pd.DataFrame([scenario['plan'] for scenario in scenarios])
+    plans['region'] = plans['region'].fillna(prices.default_region) if 'region' in plans else prices.default_region
+    for column in ('storage_iops', 'storage_throughput_mbps'):
+        plans[column] = plans[column].fillna(0) if column in plans else 0
+
+    automation = np.array([calculate_automation_maturity(state['automation_components']) for state in states])
+    timeframe = plans['timeframe'].to_numpy()
+    support_24x7 = plans['support_24x7'].to_numpy(dtype=bool)
+    current_clusters = plans['current_clusters'].to_numpy()
+    target_clusters = plans['target_clusters'].to_numpy()
+
+    # Current and target footprints of every scenario in one costing batch
+    costs = calculate_portfolio_costs(
+        pd.concat([_footprints(plans, 'current_clusters'), _footprints(plans, 'target_clusters')],
+                  ignore_index=True), prices
+    )
+    current_costs = costs.iloc[:len(plans)].reset_index(drop=True)
+    target_costs = costs.iloc[len(plans):].reset_index(drop=True)
+
+    byol = (plans['licensing_model'] == BYOL).to_numpy()
+    datadog = plans['enable_datadog'].to_numpy(dtype=bool)
+    breakdown = pd.DataFrame(index=pd.Index(names, name='scenario'))
+    for component, column in TCO_COMPONENTS.items():
+        values = np.zeros(len(plans)) if column is None else target_costs[column].to_numpy() * timeframe
+        if component == 'SQL Licensing (AWS)':
+            values = np.where(byol, 0.0, values)
+        elif component == 'Datadog Monitoring':
+            values = np.where(datadog, values, 0.0)
+        breakdown[component] = values
+
+    # FTE needs and forecasts share a config (and forecasts a timeframe) within each batch
+    current_fte = np.zeros(len(plans), dtype=np.int64)
+    target_fte = np.zeros(len(plans), dtype=np.int64)
+    baseline_fte = np.zeros(len(plans), dtype=np.int64)
+    forecasts = []
+    batches = {}
+    for row, state in enumerate(states):
+        batches.setdefault((_config_key(state.get('config_params')), int(timeframe[row])), []).append(row)
+    for (config_key, months), rows in batches.items():
+        rows = np.array(rows)
+        config_params = dict(config_key)
+        for fte, clusters, level in ((current_fte, current_clusters, automation),
+                                     (target_fte, target_clusters, automation),
+                                     (baseline_fte, target_clusters, np.zeros(len(plans)))):
+            skills = skills_requirements_array(clusters[rows], level[rows], support_24x7[rows], config_params)
+            fte[rows] = sum(skills.values())
+
+        current_skills = {role: np.array([states[row]['current_skills'].get(role, 0) for row in rows])
+                          for role in OPERATIONS_ROLES}
+        arrays = forecast_arrays(current_clusters[rows], target_clusters[rows], automation[rows], months,
+                                 support_24x7[rows], current_skills, config_params)
+        forecasts.append({
+            'row': np.repeat(rows, len(arrays['month'])),
+            'month': np.tile(arrays['month'], len(rows)),
+            **{column: arrays[column].ravel() for column in FORECAST_COLUMNS},
+            **{column: arrays[group][role].ravel() for column, (group, role) in ROLE_FORECAST_COLUMNS.items()},
+        })
+
+    # One long frame of (scenario, month) rows in scenario order
+    rows = np.concatenate([batch['row'] for batch in forecasts])
+    order = np.argsort(rows, kind='stable')
+    forecast = pd.DataFrame({
+        'scenario': np.asarray(names, dtype=object)[rows[order]],
+        **{column: np.concatenate([batch[column] for batch in forecasts])[order]
+           for column in ('month', *FORECAST_COLUMNS, *ROLE_FORECAST_COLUMNS)},
+    })
+    peaks = forecast.groupby('scenario', sort=False).agg(peak_team_size=('total_team_size', 'max'),
+                                                         total_new_hires=('total_new_hires', 'sum'))
+
+    summary = pd.DataFrame({
+        'automation_maturity': automation,
+        'current_clusters': current_clusters,
+        'target_clusters': target_clusters,
+        'timeframe': timeframe,
+        'instance_type': plans['instance_type'].to_numpy(),
+        'sql_edition': plans['sql_edition'].to_numpy(),
+        'licensing_model': plans['licensing_model'].to_numpy(),
+        'region': plans['region'].to_numpy(),
+        'current_monthly': current_costs['total_monthly'].to_numpy(),
+        'target_monthly': target_costs['total_monthly'].to_numpy(),
+        'total_infrastructure_cost': target_costs['total_monthly'].to_numpy() * timeframe,
+        'current_fte': current_fte,
+        'target_fte': target_fte,
+        'baseline_fte': baseline_fte,
+        'fte_reduction': baseline_fte - target_fte,
+    }, index=breakdown.index).join(peaks)
+
+    return {'summary': summary, 'tco_breakdown': breakdown, 'forecast': forecast}
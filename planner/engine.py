@@ -0,0 +1,478 @@
+"""Headless planning engine: skills, infrastructure cost, TCO, metrics and forecast.
+
+Every function takes its inputs explicitly so it can run outside Streamlit
+(batch jobs, benchmarks, caches). ``plan`` arguments are dicts shaped like
+``defaults.DEFAULT_PLAN``; ``config_params`` like ``defaults.DEFAULT_CONFIG_PARAMS``.
+"""
+
+import math
+from operator import itemgetter
+
+from .cache import LRUCache
+from .defaults import ALWAYSON_CLUSTER, BYOL, resolve_config
+from .forecast import HIRE_LEAD_TIME_MONTHS, forecast_arrays, forecast_records
+from .price_index import as_price_index
+from .pricing import BYOL_ANNUAL_PER_CORE
+from .storage import size_sql_storage
+from .tracing import traced
+
+
+def data_transfer_rate(deployment_type):
+    """Monthly data transfer cost per cluster (reduced from 25/10)"""
+
+    return 20 if deployment_type == ALWAYSON_CLUSTER else 8
+
+
+def estimate_byol_annual_cost(edition, num_instances, cores_per_instance=4):
+    """Estimate external BYOL licence spend (not part of the AWS bill)"""
+
+    per_core = BYOL_ANNUAL_PER_CORE.get(edition, BYOL_ANNUAL_PER_CORE['Web'])
+    return per_core * cores_per_instance * num_instances
+
+
+# Skills requirements calculation with realistic constraints
+@traced
+def calculate_skills_requirements(clusters, automation_level, support_24x7, config_params=None):
+    """Calculate required skills with practical automation constraints and minimum staffing"""
+
+    params = resolve_config(config_params)
+
+    # Cap automation at realistic maximum (65%)
+    effective_automation = min(automation_level, params['max_automation_maturity'])
+
+    base_requirements = {
+        'SQL Server DBA Expert': max(1, math.ceil(clusters / params['dba_ratio'])),
+        'Infrastructure Automation': max(1, math.ceil(clusters / params['automation_ratio'])),
+        'ITIL Service Manager': max(1, math.ceil(clusters / params['itil_ratio'])),
+    }
+
+    # Support coverage multiplier (increased for true 24x7)
+    support_multiplier = params['support_24x7_multiplier'] if support_24x7 else 1.0
+
+    adjusted_requirements = {}
+    for role, base_req in base_requirements.items():
+
+        # Role-specific automation limitations (more conservative)
+        if role == 'SQL Server DBA Expert':
+            # DBAs capped at 50% automation due to legacy systems, human judgment needs
+            role_automation_cap = min(effective_automation, 50)
+            role_reduction = (role_automation_cap / 100) * 0.45  # Max 45% reduction
+            role_multiplier = 1.0 - role_reduction
+
+        elif role == 'Infrastructure Automation':
+            # Automation engineers benefit most but still need oversight
+            role_automation_cap = effective_automation
+            role_reduction = (role_automation_cap / 100) * 0.60  # Up to 60% reduction
+            role_multiplier = 1.0 - role_reduction
+
+        elif role == 'ITIL Service Manager':
+            # Service management capped at 40% automation - coordination requires humans
+            role_automation_cap = min(effective_automation, 40)
+            role_reduction = (role_automation_cap / 100) * 0.35  # Max 35% reduction
+            role_multiplier = 1.0 - role_reduction
+
+        else:
+            # Generic fallback
+            automation_reduction_factor = (effective_automation / 100) * (params['max_workforce_reduction'] / 100)
+            role_multiplier = 1.0 - automation_reduction_factor
+
+        # Apply both automation and support multipliers
+        adjusted_req = math.ceil(base_req * support_multiplier * role_multiplier)
+
+        # Apply minimum staffing levels for enterprise operations
+        min_staffing_levels = {
+            'SQL Server DBA Expert': 1,  # Always need at least 1 DBA
+            'Infrastructure Automation': 1,  # Always need at least 1 automation engineer
+            'ITIL Service Manager': 1 if clusters > 10 else 0  # Need ITIL manager for 10+ clusters
+        }
+
+        min_required = min_staffing_levels.get(role, 0)
+        adjusted_requirements[role] = max(adjusted_req, min_required) if base_req > 0 else 0
+
+    return adjusted_requirements
+
+
+# Cost calculation functions with BYOL and Datadog support
+@traced
+def calculate_infrastructure_costs(clusters, instance_type, instances_per_cluster, storage_tb, ebs_type,
+                                   enable_patching, sql_edition, licensing_model, enable_datadog,
+                                   deployment_type=ALWAYSON_CLUSTER, pricing_data=None, region=None,
+                                   storage_iops=None, storage_throughput_mbps=None):
+    """Calculate comprehensive infrastructure costs with BYOL and Datadog support.
+
+    ``pricing_data`` may be a compiled ``PriceIndex`` or a pricing dict; missing
+    prices raise ``MissingPriceError``. ``region`` defaults to the index's
+    first region. With a per-instance IOPS or throughput requirement, storage
+    is split into data / log / tempdb volumes, each priced on its cheapest EBS
+    type (``ebs_type`` is then not used) and described under ``storage_layout``.
+    """
+
+    prices = as_price_index(pricing_data)
+
+    windows_rate = prices.ec2_rate(instance_type, 'Windows', region)
+
+    # Calculate SQL Server costs based on licensing model
+    if licensing_model == BYOL:
+        # BYOL: Only pay for Windows compute, customer provides SQL licenses
+        hourly_rate = windows_rate
+        licensing_component = 0
+    else:
+        # License-Included: Pay for SQL Server + Windows
+        sql_rate = prices.ec2_rate(instance_type, sql_edition, region)
+        hourly_rate = sql_rate
+        licensing_component = sql_rate - windows_rate
+
+    total_instances = clusters * instances_per_cluster
+
+    monthly_ec2_cost = hourly_rate * 24 * 30 * total_instances
+
+    storage_gb = storage_tb * 1024
+    storage_layout = None
+    if storage_iops or storage_throughput_mbps:
+        storage_layout = size_sql_storage(storage_gb, storage_iops or 0, storage_throughput_mbps or 0, prices,
+                                          region).iloc[0].to_dict()
+        monthly_ebs_cost = storage_layout['storage_monthly'] * total_instances
+    else:
+        ebs_rate_per_gb = prices.ebs_rate(ebs_type, region)
+        monthly_ebs_cost = ebs_rate_per_gb * storage_gb * total_instances
+
+    monthly_ssm_cost = 0
+    if enable_patching:
+        ssm_hourly_rate = prices.ssm_rate(region)
+        monthly_ssm_cost = ssm_hourly_rate * 24 * 30 * total_instances
+
+    # Datadog monitoring cost ($1000/instance/year = $83.33/instance/month)
+    monthly_datadog_cost = 0
+    if enable_datadog:
+        annual_datadog_per_instance = prices.datadog_annual_per_instance
+        monthly_datadog_cost = (annual_datadog_per_instance / 12) * total_instances
+
+    monthly_data_transfer = clusters * data_transfer_rate(deployment_type)
+
+    costs = {
+        'ec2_compute_monthly': (windows_rate * 24 * 30 * total_instances),
+        'sql_licensing_monthly': licensing_component * 24 * 30 * total_instances if licensing_model != BYOL else 0,
+        'ebs_monthly': monthly_ebs_cost,
+        'ssm_monthly': monthly_ssm_cost,
+        'datadog_monthly': monthly_datadog_cost,
+        'data_transfer_monthly': monthly_data_transfer,
+        'total_monthly': monthly_ec2_cost + monthly_ebs_cost + monthly_ssm_cost + monthly_datadog_cost + monthly_data_transfer,
+        'total_instances': total_instances,
+        'licensing_model': licensing_model,
+        'sql_edition': sql_edition
+    }
+    if storage_layout is not None:
+        costs['storage_layout'] = storage_layout
+    return costs
+
+
+@traced
+def calculate_workforce_requirements(skills_requirements):
+    """Calculate workforce requirements in FTE (Full Time Equivalent) counts"""
+
+    total_fte = sum(skills_requirements.values())
+
+    return {
+        'total_fte': total_fte,
+        'breakdown': skills_requirements.copy()
+    }
+
+
+@traced
+def calculate_total_cost_of_ownership(clusters, automation_level, timeframe_months, plan,
+                                      pricing_data=None, config_params=None):
+    """Calculate infrastructure TCO and workforce FTE requirements with BYOL and Datadog support"""
+
+    # Infrastructure costs (infrastructure only - no workforce costs)
+    infra_costs = calculate_infrastructure_costs(
+        clusters, plan['instance_type'], plan['ec2_per_cluster'], plan['current_storage_tb'],
+        plan['ebs_volume_type'], plan['enable_ssm_patching'], plan['sql_edition'],
+        plan['licensing_model'], plan['enable_datadog'],
+        deployment_type=plan['deployment_type'], pricing_data=pricing_data, region=plan.get('region'),
+        storage_iops=plan.get('storage_iops'), storage_throughput_mbps=plan.get('storage_throughput_mbps')
+    )
+
+    # Workforce requirements (FTE counts, not costs)
+    skills_needed = calculate_skills_requirements(clusters, automation_level, plan['support_24x7'], config_params)
+    workforce_requirements = calculate_workforce_requirements(skills_needed)
+
+    # Total infrastructure cost over timeframe
+    total_infrastructure_cost = infra_costs['total_monthly'] * timeframe_months
+
+    tco_breakdown = {
+        'EC2 Compute': infra_costs['ec2_compute_monthly'] * timeframe_months,
+        'EBS Storage': infra_costs['ebs_monthly'] * timeframe_months,
+        'SSM Patching': infra_costs['ssm_monthly'] * timeframe_months,
+        'Data Transfer': infra_costs['data_transfer_monthly'] * timeframe_months,
+    }
+
+    # Add appropriate licensing cost based on model
+    if plan['licensing_model'] == BYOL:
+        tco_breakdown['BYOL Licensing'] = 0  # Customer provides licenses
+    else:
+        tco_breakdown['SQL Licensing (AWS)'] = infra_costs['sql_licensing_monthly'] * timeframe_months
+
+    # Add Datadog if enabled
+    if plan['enable_datadog']:
+        tco_breakdown['Datadog Monitoring'] = infra_costs['datadog_monthly'] * timeframe_months
+
+    return {
+        'infrastructure': infra_costs,
+        'workforce_requirements': workforce_requirements,
+        'skills_required': skills_needed,
+        'total_infrastructure_cost': total_infrastructure_cost,
+        'tco_breakdown': tco_breakdown
+    }
+
+
+# Plan inputs that affect a TCO result; everything else is ignored by the cache key
+TCO_PLAN_KEYS = (
+    'instance_type', 'ec2_per_cluster', 'current_storage_tb', 'ebs_volume_type', 'enable_ssm_patching',
+    'sql_edition', 'licensing_model', 'enable_datadog', 'deployment_type', 'support_24x7'
+)
+_tco_plan_values = itemgetter(*TCO_PLAN_KEYS)
+
+# Shared by every session in the process
+TCO_CACHE = LRUCache()
+
+
+def tco_cache_key(clusters, automation_level, timeframe_months, plan, prices, config_params=None):
+    """Normalized, hashable key for one TCO calculation"""
+
+    # resolve_config keeps the defaults' key order, so equal configs give equal tuples
+    return (
+        int(clusters), float(automation_level), int(timeframe_months),
+        _tco_plan_values(plan),
+        plan.get('storage_iops') or 0, plan.get('storage_throughput_mbps') or 0,
+        plan.get('region') or prices.default_region,
+        prices.fingerprint,
+        tuple(resolve_config(config_params).items())
+    )
+
+
+@traced
+def cached_total_cost_of_ownership(clusters, automation_level, timeframe_months, plan,
+                                   pricing_data=None, config_params=None, cache=TCO_CACHE):
+    """``calculate_total_cost_of_ownership`` through the shared LRU cache.
+
+    The returned dict is shared with other callers and must not be mutated.
+    """
+
+    prices = as_price_index(pricing_data)
+    key = tco_cache_key(clusters, automation_level, timeframe_months, plan, prices, config_params)
+    return cache.get_or_compute(key, lambda: calculate_total_cost_of_ownership(
+        clusters, automation_level, timeframe_months, plan, prices, config_params
+    ))
+
+
+@traced
+def calculate_automation_maturity(automation_components):
+    """Weighted share of enabled automation components (0-100)"""
+
+    total_weight = sum(comp['weight'] for comp in automation_components.values())
+    enabled_weight = sum(comp['weight'] for comp in automation_components.values() if comp['enabled'])
+    return (enabled_weight / total_weight) * 100 if total_weight > 0 else 0
+
+
+@traced
+def calculate_governance_maturity(governance_framework):
+    """Share of governance bodies in place (0-100)"""
+
+    if not governance_framework:
+        return 0
+    return sum(governance_framework.values()) / len(governance_framework) * 100
+
+
+# Calculate comprehensive enterprise metrics
+@traced
+def calculate_enterprise_metrics(plan, automation_components, itil_practices, current_skills, config_params=None):
+    """Calculate enterprise-grade operational metrics with workforce focus"""
+
+    automation_maturity = calculate_automation_maturity(automation_components)
+
+    # Calculate weighted workforce reduction potential
+    enabled_components = [comp for comp in automation_components.values() if comp['enabled']]
+    if enabled_components:
+        total_weight_enabled = sum(comp['weight'] for comp in enabled_components)
+        weighted_workforce_reduction = sum(
+            comp['workforce_reduction'] * (comp['weight'] / total_weight_enabled)
+            for comp in enabled_components
+        )
+    else:
+        weighted_workforce_reduction = 0
+
+    current_clusters = plan['current_clusters']
+    target_clusters = plan['target_clusters']
+    current_ec2_instances = current_clusters * plan['ec2_per_cluster']
+    target_ec2_instances = target_clusters * plan['ec2_per_cluster']
+    scale_factor = target_clusters / current_clusters
+
+    itil_implemented = sum(1 for practice in itil_practices.values() if practice['implemented'])
+    itil_total = len(itil_practices)
+    itil_maturity = (itil_implemented / itil_total * 100) if itil_total > 0 else 0
+
+    required_skills = calculate_skills_requirements(target_clusters, automation_maturity, plan['support_24x7'], config_params)
+    total_skill_gap = sum(
+        max(0, required_skills[role] - current_skills.get(role, 0))
+        for role in required_skills.keys()
+    )
+
+    critical_components = sum(
+        1 for comp in automation_components.values()
+        if comp['enabled'] and comp['business_impact'] == 'Critical'
+    )
+
+    high_complexity_enabled = sum(
+        1 for comp in automation_components.values()
+        if comp['enabled'] and comp['technical_complexity'] == 'High'
+    )
+
+    def component_enabled(name):
+        return automation_components.get(name, {}).get('enabled', False)
+
+    # Risk assessment based on enterprise factors
+    risks = []
+
+    if not component_enabled('Zero-Trust Security Model'):
+        risks.append({
+            'category': 'Security',
+            'risk': 'Inadequate security model for enterprise scale',
+            'severity': 'Critical',
+            'impact': 'Data breaches, unauthorized access, security incidents'
+        })
+
+    if not component_enabled('AI-Powered Monitoring') and target_clusters > 30:
+        risks.append({
+            'category': 'Operations',
+            'risk': 'Manual monitoring at enterprise scale',
+            'severity': 'High',
+            'impact': 'Delayed incident detection, performance degradation'
+        })
+
+    if total_skill_gap > 3:  # Reduced threshold for more realistic alert
+        risks.append({
+            'category': 'Workforce',
+            'risk': 'Critical skills gap for enterprise operations',
+            'severity': 'High',
+            'impact': 'Operational failures, knowledge dependencies, staff burnout'
+        })
+
+    if not component_enabled('Cross-Region DR Automation'):
+        risks.append({
+            'category': 'Business Continuity',
+            'risk': 'Manual disaster recovery procedures',
+            'severity': 'Critical',
+            'impact': 'Extended downtime, data loss, business disruption'
+        })
+
+    return {
+        'automation_maturity': automation_maturity,
+        'workforce_reduction_potential': weighted_workforce_reduction,
+        'current_ec2_instances': current_ec2_instances,
+        'target_ec2_instances': target_ec2_instances,
+        'scale_factor': scale_factor,
+        'itil_maturity': itil_maturity,
+        'total_skill_gap': total_skill_gap,
+        'critical_components': critical_components,
+        'high_complexity_enabled': high_complexity_enabled,
+        'risks': risks
+    }
+
+
+# Monthly Forecasting System with realistic hiring lead times
+@traced
+def calculate_monthly_forecast(plan, automation_start, current_skills, config_params=None,
+                               hire_lead_time=HIRE_LEAD_TIME_MONTHS):
+    """Calculate month-by-month scaling forecast with realistic hiring lead times"""
+
+    arrays = forecast_arrays(
+        plan['current_clusters'], plan['target_clusters'], automation_start, plan['timeframe'],
+        plan['support_24x7'], current_skills, config_params, hire_lead_time
+    )
+    return forecast_records(arrays)
+
+
+# Enhanced SQL Server Licensing Calculator with BYOL support
+@traced
+def calculate_sql_server_licensing_aws(deployment_type, instance_type, num_instances, edition="Standard",
+                                       licensing_model="License-Included", pricing_data=None, region=None):
+    """Calculate SQL Server licensing costs using AWS License-Included pricing or BYOL with updated rates"""
+
+    prices = as_price_index(pricing_data)
+
+    windows_rate = prices.ec2_rate(instance_type, 'Windows', region)
+
+    if licensing_model == BYOL:
+        # For BYOL, only pay for Windows compute, bring your own SQL licenses
+        licensing_hourly_rate = 0
+        total_hourly_rate = windows_rate
+        licensing_model_desc = "🆕 BYOL (Customer Licenses)"
+        licensing_notes = f"Customer provides SQL Server {edition} licenses. Only paying for Windows compute."
+
+        # Estimate typical BYOL licensing costs for reference (assume 4 cores per instance)
+        estimated_byol_annual_cost = estimate_byol_annual_cost(edition, 1)
+
+    else:
+        # AWS License-Included model
+        sql_rate = prices.ec2_rate(instance_type, edition, region)
+
+        licensing_hourly_rate = sql_rate - windows_rate
+        total_hourly_rate = sql_rate
+        licensing_model_desc = "AWS License-Included"
+        licensing_notes = f"Based on updated AWS {edition} License-Included pricing vs Windows-only pricing"
+        estimated_byol_annual_cost = 0
+
+    licensing_monthly_cost = licensing_hourly_rate * 24 * 30
+
+    if deployment_type == ALWAYSON_CLUSTER:
+        total_monthly_cost = licensing_monthly_cost * 3 * num_instances
+    else:
+        total_monthly_cost = licensing_monthly_cost * num_instances
+
+    return {
+        "monthly_cost": total_monthly_cost,
+        "annual_cost": total_monthly_cost * 12,
+        "licensing_model": licensing_model_desc,
+        "edition": edition,
+        "hourly_rate_per_instance": licensing_hourly_rate,
+        "total_hourly_rate": total_hourly_rate,
+        "estimated_byol_annual_per_instance": estimated_byol_annual_cost if licensing_model == BYOL else 0,
+        "notes": licensing_notes
+    }
+
+
+@traced
+def evaluate_plan(plan, automation_components, itil_practices, governance_framework, current_skills,
+                  config_params=None, pricing_data=None):
+    """Run the full planning pipeline for one plan and return every page-level result"""
+
+    timeframe = plan['timeframe']
+
+    metrics = calculate_enterprise_metrics(plan, automation_components, itil_practices, current_skills, config_params)
+    automation = metrics['automation_maturity']
+
+    # Calculate current, target and no-automation baseline scenarios
+    prices = as_price_index(pricing_data)
+    current_tco = cached_total_cost_of_ownership(plan['current_clusters'], automation, timeframe, plan,
+                                                 prices, config_params)
+    target_tco = cached_total_cost_of_ownership(plan['target_clusters'], automation, timeframe, plan,
+                                                prices, config_params)
+    baseline_tco = cached_total_cost_of_ownership(plan['target_clusters'], 0, timeframe, plan,
+                                                  prices, config_params)
+
+    forecast = calculate_monthly_forecast(plan, automation, current_skills, config_params)
+
+    licensing = calculate_sql_server_licensing_aws(
+        plan['deployment_type'], plan['instance_type'], plan['target_clusters'],
+        plan['sql_edition'], plan['licensing_model'], prices, plan.get('region')
+    )
+
+    return {
+        'metrics': metrics,
+        'current_tco': current_tco,
+        'target_tco': target_tco,
+        'baseline_tco': baseline_tco,
+        'forecast': forecast,
+        'licensing': licensing,
+        'governance_maturity': calculate_governance_maturity(governance_framework)
+    }
@@ -0,0 +1,236 @@
+"""Streaming export of monthly roadmaps and TCO tables to XLSX, CSV and Parquet.
+
+Scenarios are evaluated a chunk at a time through ``compare_scenarios`` and
+each chunk's rows are appended to the open writers before the next chunk is
+computed. Memory stays bounded by one chunk however many scenarios are
+exported, and the nested per-month forecast records are never built. XLSX
+goes through xlsxwriter in constant-memory mode (one sheet per table),
+Parquet through a pyarrow ``ParquetWriter`` with one row group per chunk.
+
+    python -m planner.export scenarios.yaml --output roadmap.xlsx
+    python -m planner.export --saved "Q3 baseline" "Q3 stretch" --format parquet --output exports/
+
+Tables: ``summary`` (one row per scenario), ``tco_breakdown`` (scenario x
+TCO component over the scenario's timeframe) and ``forecast`` (one row per
+scenario and month, with per-role required and new-hire headcounts).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from collections import Counter
+
+from .batch import batch_prices, build_scenario, read_scenario_file
+from .catalog import DEFAULT_CATALOG_PATH
+from .comparison import compare_scenarios
+from .scenarios import DEFAULT_SCENARIO_STORE_PATH, load_scenarios
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+EXPORT_TABLES = ('summary', 'tco_breakdown', 'forecast')
+EXPORT_CHUNK_SCENARIOS = 200
+XLSX_MAX_ROWS = 1048576
+WORKBOOK_NAME = 'planner_export.xlsx'
+EXPORT_MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def export_chunks(scenarios, prices, chunk_size=EXPORT_CHUNK_SCENARIOS):
+    """``(table, DataFrame)`` pairs for resolved scenarios, ``chunk_size`` scenarios at a time"""
+
+    for start in range(0, len(scenarios), chunk_size):
+        chunk = scenarios[start:start + chunk_size]
+        tables = compare_scenarios(chunk, prices, max_scenarios=len(chunk))
+        yield 'summary', tables['summary'].reset_index()
+        yield 'tco_breakdown', tables['tco_breakdown'].reset_index()
+        yield 'forecast', tables['forecast']
+
+
+def _require(module, package):
+    try:
+        return __import__(module, fromlist=['_'])
+    except ImportError as e:
+        raise ImportError(f"Exporting {module.split('.')[0]} files requires {package} (pip install {package})") from e
+
+
+class _CsvTable:
+    def __init__(self, handle):
+        self.handle = handle
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.handle, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class _ParquetTable:
+    def __init__(self, sink):
+        self.pa = _require('pyarrow', 'pyarrow')
+        self.pq = _require('pyarrow.parquet', 'pyarrow')
+        self.sink = sink
+        self.writer = None
+
+    def write(self, frame):
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(frame, preserve_index=False)
+            self.writer = self.pq.ParquetWriter(self.sink, table.schema)
+        else:
+            table = self.pa.Table.from_pandas(frame, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class _XlsxSheet:
+    def __init__(self, workbook, name):
+        self.sheet = workbook.add_worksheet(name)
+        self.name = name
+        self.row = 0
+
+    def write(self, frame):
+        if self.row == 0:
+            self.sheet.write_row(0, 0, list(frame.columns))
+            self.row = 1
+        if self.row + len(frame) > XLSX_MAX_ROWS:
+            raise ValueError(f"The {self.name} table is over the XLSX limit of {XLSX_MAX_ROWS} rows; "
+                             "export as CSV or Parquet instead")
+        # Constant-memory sheets must be written row by row, in order
+        for values in frame.astype(object).where(frame.notna(), None).to_numpy().tolist():
+            self.sheet.write_row(self.row, 0, values)
+            self.row += 1
+
+    def close(self):
+        pass
+
+
+def _stream(chunks, output_format, target):
+    """Append every chunk to its table's writer.
+
+    ``target`` is the workbook file (path or binary file object) for xlsx and
+    a table -> file object mapping for csv and parquet.
+    """
+
+    workbook = None
+    if output_format == 'xlsx':
+        xlsxwriter = _require('xlsxwriter', 'xlsxwriter')
+        workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+        writers = {table: _XlsxSheet(workbook, table) for table in EXPORT_TABLES}
+    elif output_format == 'parquet':
+        writers = {table: _ParquetTable(target[table]) for table in EXPORT_TABLES}
+    elif output_format == 'csv':
+        writers = {table: _CsvTable(target[table]) for table in EXPORT_TABLES}
+    else:
+        raise ValueError(f"Unknown export format '{output_format}'; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    try:
+        for table, frame in chunks:
+            writers[table].write(frame)
+    finally:
+        for writer in writers.values():
+            writer.close()
+        if workbook is not None:
+            workbook.close()
+
+
+def write_export(chunks, output, output_format='xlsx'):
+    """Stream ``export_chunks`` output to files and return their paths.
+
+    xlsx writes one workbook at ``output``; csv and parquet write
+    ``<output>/<table>.<format>`` per table, like ``batch.write_tables``.
+    """
+
+    if output_format == 'xlsx':
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        _stream(chunks, output_format, output)
+        return {'workbook': output}
+
+    os.makedirs(output, exist_ok=True)
+    paths = {table: os.path.join(output, f"{table}.{output_format}") for table in EXPORT_TABLES}
+    with contextlib.ExitStack() as stack:
+        if output_format == 'csv':
+            handles = {table: stack.enter_context(open(path, 'w', newline='', encoding='utf-8'))
+                       for table, path in paths.items()}
+        else:
+            handles = paths  # ParquetWriter opens and closes its own file
+        _stream(chunks, output_format, handles)
+    return paths
+
+
+def export_bytes(chunks, output_format='xlsx'):
+    """Stream ``export_chunks`` output into in-memory files: file name -> bytes (for download buttons)"""
+
+    if output_format == 'xlsx':
+        buffer = io.BytesIO()
+        _stream(chunks, output_format, buffer)
+        return {WORKBOOK_NAME: buffer.getvalue()}
+
+    if output_format == 'csv':
+        buffers = {table: io.StringIO() for table in EXPORT_TABLES}
+        _stream(chunks, output_format, buffers)
+        return {f"{table}.csv": buffer.getvalue().encode('utf-8') for table, buffer in buffers.items()}
+
+    pa = _require('pyarrow', 'pyarrow')
+    sinks = {table: pa.BufferOutputStream() for table in EXPORT_TABLES}
+    _stream(chunks, output_format, sinks)
+    return {f"{table}.parquet": sink.getvalue().to_pybytes() for table, sink in sinks.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export monthly roadmaps and TCO tables for planning scenarios")
+    parser.add_argument('scenario_file', nargs='?', help="YAML or JSON scenario file (see planner.batch)")
+    parser.add_argument('--saved', nargs='+', metavar='NAME', help="Export saved scenarios instead of a file")
+    parser.add_argument('--store', default=DEFAULT_SCENARIO_STORE_PATH)
+    parser.add_argument('--output', help="Workbook path for xlsx, directory for csv and parquet "
+                                         "(default: planner_export.xlsx or planner_export/)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='xlsx', dest='output_format')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SCENARIOS,
+                        help="Scenarios evaluated and written per chunk")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH,
+                        help="Price catalog; representative pricing is used when it does not exist")
+    args = parser.parse_args(argv)
+
+    if bool(args.scenario_file) == bool(args.saved):
+        parser.error("Give either a scenario file or --saved names")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    try:
+        if args.saved:
+            scenarios = load_scenarios(args.saved, args.store)
+        else:
+            scenarios = [build_scenario(entry, position)
+                         for position, entry in enumerate(read_scenario_file(args.scenario_file))]
+    except (KeyError, ValueError, ImportError) as e:
+        parser.error(e.args[0] if e.args else str(e))
+
+    duplicates = sorted(name for name, count in Counter(scenario['name'] for scenario in scenarios).items()
+                        if count > 1)
+    if duplicates:
+        parser.error(f"Duplicate scenario names: {', '.join(duplicates)}")
+
+    if not os.path.exists(args.catalog):
+        print(f"Price catalog {args.catalog} not found; using representative pricing", file=sys.stderr)
+    output = args.output or ('planner_export.xlsx' if args.output_format == 'xlsx' else 'planner_export')
+    try:
+        paths = write_export(export_chunks(scenarios, batch_prices(scenarios, args.catalog), args.chunk_size),
+                             output, args.output_format)
+    except LookupError as e:
+        parser.error(f"Pricing unavailable: {e}")
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+    print(json.dumps(paths, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+"""Vectorized closed-form monthly forecast.
+
+The month-by-month loop in the original forecast only ever combines three
+closed-form series (linear cluster growth, capped linear automation growth and
+the ratio-based skills formula), so every month can be computed at once.
+Scenario inputs broadcast: scalars give ``(months,)`` arrays, 1-D inputs of
+length S give ``(S, months)`` arrays for batch planning.
+"""
+
+import numpy as np
+
+from .defaults import OPERATIONS_ROLES, resolve_config
+
+HIRE_LEAD_TIME_MONTHS = 4  # Increased from 3 for specialized roles
+
+# Role-specific automation caps and maximum workforce reduction
+ROLE_AUTOMATION_LIMITS = {
+    'SQL Server DBA Expert': (50, 0.45),
+    'Infrastructure Automation': (None, 0.60),
+    'ITIL Service Manager': (40, 0.35),
+}
+
+ROLE_RATIO_KEYS = {
+    'SQL Server DBA Expert': 'dba_ratio',
+    'Infrastructure Automation': 'automation_ratio',
+    'ITIL Service Manager': 'itil_ratio',
+}
+
+
+def skills_requirements_array(clusters, automation_level, support_24x7, config_params=None):
+    """Vectorized ``calculate_skills_requirements``: returns role -> int64 array"""
+
+    params = resolve_config(config_params)
+    clusters = np.asarray(clusters)
+    automation_level = np.asarray(automation_level, dtype=float)
+
+    effective_automation = np.minimum(automation_level, params['max_automation_maturity'])
+    support_multiplier = np.where(np.asarray(support_24x7, dtype=bool), params['support_24x7_multiplier'], 1.0)
+
+    requirements = {}
+    for role in OPERATIONS_ROLES:
+        base_req = np.maximum(1, np.ceil(clusters / params[ROLE_RATIO_KEYS[role]]))
+
+        role_cap, max_reduction = ROLE_AUTOMATION_LIMITS[role]
+        role_automation = effective_automation if role_cap is None else np.minimum(effective_automation, role_cap)
+        role_multiplier = 1.0 - (role_automation / 100) * max_reduction
+
+        adjusted_req = np.ceil(base_req * support_multiplier * role_multiplier)
+
+        # Minimum staffing: always 1 DBA and 1 automation engineer, ITIL manager for 10+ clusters
+        if role == 'ITIL Service Manager':
+            min_required = (clusters > 10).astype(np.int64)
+        else:
+            min_required = 1
+        requirements[role] = np.maximum(adjusted_req, min_required).astype(np.int64)
+
+    return requirements
+
+
+def forecast_arrays(current_clusters, target_clusters, automation_start, timeframe, support_24x7=False,
+                    current_skills=None, config_params=None, hire_lead_time=HIRE_LEAD_TIME_MONTHS):
+    """Compute the full monthly forecast for one or many scenarios in a single pass.
+
+    ``timeframe`` is shared by every scenario in the batch. ``current_skills``
+    maps role -> headcount (scalar or per-scenario array).
+    """
+
+    params = resolve_config(config_params)
+    current_skills = current_skills or {}
+    max_automation = params['max_automation_maturity']
+
+    current_clusters = np.asarray(current_clusters)[..., None]
+    target_clusters = np.asarray(target_clusters)[..., None]
+    automation_start = np.asarray(automation_start, dtype=float)[..., None]
+    support_24x7 = np.asarray(support_24x7, dtype=bool)[..., None]
+    months = np.arange(timeframe + 1)
+
+    cluster_growth_per_month = (target_clusters - current_clusters) / timeframe
+    clusters = np.trunc(current_clusters + cluster_growth_per_month * months).astype(np.int64)
+
+    # Cap automation target at the configured maximum
+    automation_target = np.minimum(max_automation, automation_start + 35)
+    automation_growth_per_month = (automation_target - automation_start) / timeframe
+    automation = np.minimum(automation_start + automation_growth_per_month * months, max_automation)
+
+    required = skills_requirements_array(clusters, automation, support_24x7, params)
+
+    # Hire ahead of demand: month m recruits for month m + lead time while it is inside the plan
+    lookahead = np.minimum(months + hire_lead_time, timeframe)
+    in_window = (months + hire_lead_time) <= timeframe
+
+    new_hires = {}
+    for role, role_required in required.items():
+        hiring_target = np.where(in_window, role_required[..., lookahead], role_required)
+
+        previous_required = np.empty_like(role_required)
+        previous_required[..., 0] = np.asarray(current_skills.get(role, 0))
+        previous_required[..., 1:] = role_required[..., :-1]
+
+        new_hires[role] = np.maximum(0, hiring_target - previous_required)
+
+    shape = clusters.shape
+    return {
+        'month': months,
+        'clusters': clusters,
+        'automation_maturity': np.broadcast_to(automation, shape),
+        'required_skills': {role: np.broadcast_to(values, shape) for role, values in required.items()},
+        'new_hires_needed': {role: np.broadcast_to(values, shape) for role, values in new_hires.items()},
+        'total_new_hires': sum(new_hires.values()),
+        'total_team_size': sum(required.values())
+    }
+
+
+def select_scenario(arrays, index):
+    """Slice one scenario out of batch forecast arrays"""
+
+    def pick(values):
+        return values[index] if values.ndim > 1 else values
+
+    return {
+        'month': arrays['month'],
+        'clusters': pick(arrays['clusters']),
+        'automation_maturity': pick(arrays['automation_maturity']),
+        'required_skills': {role: pick(values) for role, values in arrays['required_skills'].items()},
+        'new_hires_needed': {role: pick(values) for role, values in arrays['new_hires_needed'].items()},
+        'total_new_hires': pick(arrays['total_new_hires']),
+        'total_team_size': pick(arrays['total_team_size'])
+    }
+
+
+def forecast_records(arrays):
+    """Convert single-scenario forecast arrays into the list-of-dicts forecast format"""
+
+    roles = list(arrays['required_skills'])
+    required = {role: arrays['required_skills'][role].tolist() for role in roles}
+    new_hires = {role: arrays['new_hires_needed'][role].tolist() for role in roles}
+    clusters = arrays['clusters'].tolist()
+    automation = arrays['automation_maturity'].tolist()
+    total_new_hires = arrays['total_new_hires'].tolist()
+    total_team_size = arrays['total_team_size'].tolist()
+
+    return [
+        {
+            'month': month,
+            'clusters': clusters[month],
+            'automation_maturity': automation[month],
+            'required_skills': {role: required[role][month] for role in roles},
+            'new_hires_needed': {role: new_hires[role][month] for role in roles},
+            'total_new_hires': total_new_hires[month],
+            'total_team_size': total_team_size[month]
+        }
+        for month in arrays['month'].tolist()
+    ]
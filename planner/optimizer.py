@@ -0,0 +1,152 @@
+"""Automation portfolio optimizer.
+
+Automation maturity is the enabled share of component weight, and the FTE
+requirement depends on the components only through that maturity (with the
+per-role caps applied in ``calculate_skills_requirements``). So one 0/1
+knapsack table - the minimum effort that reaches each total weight - answers
+both objectives exactly: the most maturity an effort budget buys, and the
+cheapest way to reach the lowest attainable FTE. The table is filled one
+component at a time as a NumPy vector update, so several hundred components
+solve in milliseconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .forecast import skills_requirements_array
+
+OBJECTIVES = ('automation_maturity', 'fte_reduction')
+WEIGHT_DECIMALS = 2  # Component weights must be exact to 0.01
+
+
+def _integer_weights(weights):
+    """Smallest integers with the same ratios as ``weights`` (DP table index).
+
+    Weights are scaled by ``10 ** WEIGHT_DECIMALS`` and divided by their GCD,
+    so the table is no wider than the weights need. Finer weights would have
+    to be rounded, which changes their ratios, so they raise ``ValueError``.
+    """
+
+    scaled = np.asarray(weights, dtype=float) * 10 ** WEIGHT_DECIMALS
+    integers = np.rint(scaled)
+    if not np.allclose(scaled, integers, rtol=0, atol=1e-6):
+        raise ValueError(f"Automation component weights must be multiples of {10 ** -WEIGHT_DECIMALS:g}")
+    integers = integers.astype(np.int64)
+    return integers // max(int(np.gcd.reduce(integers)), 1)
+
+
+def effort_frontier(efforts, weights):
+    """Minimum effort to reach every total weight and the choice table to rebuild each set.
+
+    Returns ``(min_effort, took)`` where ``min_effort[w]`` is the least effort
+    whose components sum to weight ``w`` (inf if unreachable) and ``took[i, w]``
+    records whether component ``i`` is in that set.
+    """
+
+    efforts = np.asarray(efforts, dtype=float)
+    weights = np.asarray(weights, dtype=np.int64)
+    capacity = int(weights.sum())
+
+    min_effort = np.full(capacity + 1, np.inf)
+    min_effort[0] = 0.0
+    took = np.zeros((len(weights), capacity + 1), dtype=bool)
+
+    for i, (effort, weight) in enumerate(zip(efforts, weights)):
+        candidate = np.full(capacity + 1, np.inf)
+        candidate[weight:] = min_effort[:capacity + 1 - weight] + effort
+        better = candidate < min_effort
+        took[i] = better
+        min_effort = np.where(better, candidate, min_effort)
+
+    return min_effort, took
+
+
+def _rebuild(took, weights, total_weight):
+    selected = np.zeros(len(weights), dtype=bool)
+    remaining = total_weight
+    for i in range(len(weights) - 1, -1, -1):
+        if took[i, remaining]:
+            selected[i] = True
+            remaining -= weights[i]
+    return selected
+
+
+def optimize_automation(automation_components, effort_budget, plan, objective='automation_maturity',
+                        config_params=None, locked=(), excluded=()):
+    """Pick the automation components to enable within ``effort_budget`` hours.
+
+    ``objective`` is ``'automation_maturity'`` (most enabled weight) or
+    ``'fte_reduction'`` (fewest FTE at the plan's target scale, then least
+    effort). ``locked`` components are kept and treated as already built, so
+    their effort does not count; ``excluded`` components are never picked.
+    """
+
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'; expected one of {', '.join(OBJECTIVES)}")
+    if not effort_budget >= 0:  # Also rejects NaN
+        raise ValueError(f"Effort budget must be at least 0 hours, got {effort_budget}")
+
+    names = list(automation_components)
+    locked = set(locked)
+    excluded = set(excluded) - locked
+    candidates = [name for name in names if name not in locked and name not in excluded]
+
+    all_weights = _integer_weights([automation_components[name]['weight'] for name in names])
+    weight_of = dict(zip(names, all_weights))
+    total_weight = int(all_weights.sum())
+    locked_weight = sum(weight_of[name] for name in locked)
+
+    weights = np.array([weight_of[name] for name in candidates], dtype=np.int64)
+    efforts = np.array([automation_components[name]['effort'] for name in candidates], dtype=float)
+    min_effort, took = effort_frontier(efforts, weights)
+
+    # Every reachable total weight within budget, as maturity and FTE at the target scale
+    reachable = np.flatnonzero(min_effort <= effort_budget)
+    maturity = (reachable + locked_weight) / total_weight * 100 if total_weight else np.zeros(len(reachable))
+    skills = skills_requirements_array(plan['target_clusters'], maturity, plan['support_24x7'], config_params)
+    total_fte = sum(skills.values())
+
+    if objective == 'automation_maturity':
+        best = len(reachable) - 1
+    else:
+        # Lowest FTE, then least effort, then most maturity
+        best = np.lexsort((-maturity, min_effort[reachable], total_fte))[0]
+
+    chosen_weight = int(reachable[best])
+    selected = set(locked) | {name for name, pick in zip(candidates, _rebuild(took, weights, chosen_weight)) if pick}
+    selected_names = [name for name in names if name in selected]
+
+    baseline_skills = skills_requirements_array(plan['target_clusters'], 0, plan['support_24x7'], config_params)
+    baseline_fte = int(sum(baseline_skills.values()))
+    enabled = [automation_components[name] for name in selected_names]
+    enabled_weight = sum(comp['weight'] for comp in enabled)
+
+    return {
+        'objective': objective,
+        'selected': selected_names,
+        'total_effort': float(min_effort[chosen_weight]),
+        'effort_budget': effort_budget,
+        'automation_maturity': float(maturity[best]),
+        'workforce_reduction_potential': (
+            sum(comp['workforce_reduction'] * comp['weight'] / enabled_weight for comp in enabled)
+            if enabled_weight else 0
+        ),
+        'total_fte': int(total_fte[best]),
+        'fte_reduction': baseline_fte - int(total_fte[best]),
+        'frontier': budget_frontier(min_effort, locked_weight, total_weight),
+    }
+
+
+def budget_frontier(min_effort, locked_weight, total_weight):
+    """Effort vs achievable maturity: each row is the cheapest way to reach a higher maturity"""
+
+    reachable = np.flatnonzero(np.isfinite(min_effort))
+    efforts = min_effort[reachable]
+    # Keep a weight only if no larger weight is reachable for the same or less effort
+    suffix_min = np.minimum.accumulate(efforts[::-1])[::-1]
+    keep = efforts <= suffix_min
+    keep[:-1] &= efforts[:-1] < suffix_min[1:]
+    return pd.DataFrame({
+        'effort_hours': efforts[keep],
+        'automation_maturity': (reachable[keep] + locked_weight) / total_weight * 100 if total_weight else 0.0,
+    })
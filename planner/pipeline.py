@@ -0,0 +1,280 @@
+"""Incremental planning pipeline as an explicit dependency graph.
+
+Each stage (automation maturity, metrics, TCO scenarios, forecast, ...) is a
+node with declared inputs: other nodes, named sources, and the plan keys it
+reads. A node's key is a hash of its source values, its plan keys and its
+upstream nodes' keys, so a rerun recomputes only nodes whose inputs changed
+and reuses the previous output for the rest. Changing ``rto_minutes``, which
+no engine stage reads, recomputes nothing.
+
+Nodes receive their inputs as keyword arguments; ``plan`` is passed as a dict
+holding only the declared keys, so an undeclared read fails loudly instead of
+going stale. Keys cover a node's inputs, not its code: after replacing a
+node's function on a graph with cached outputs, call ``clear``.
+"""
+
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from .engine import (
+    TCO_PLAN_KEYS,
+    cached_total_cost_of_ownership,
+    calculate_automation_maturity,
+    calculate_enterprise_metrics,
+    calculate_governance_maturity,
+    calculate_monthly_forecast,
+    calculate_sql_server_licensing_aws,
+)
+from .portfolio import cached_portfolio_costs, calculate_portfolio_licensing, calculate_portfolio_tco
+from .tracing import span, traced
+
+# Plan keys read by calculate_total_cost_of_ownership (directly or through plan.get)
+TCO_INPUT_KEYS = TCO_PLAN_KEYS + ('region', 'storage_iops', 'storage_throughput_mbps')
+METRICS_KEYS = ('current_clusters', 'target_clusters', 'ec2_per_cluster', 'support_24x7')
+FORECAST_KEYS = ('current_clusters', 'target_clusters', 'timeframe', 'support_24x7')
+LICENSING_KEYS = ('deployment_type', 'instance_type', 'target_clusters', 'sql_edition', 'licensing_model', 'region')
+SIMULATION_KEYS = TCO_INPUT_KEYS + ('current_clusters', 'target_clusters', 'timeframe')
+
+
+def fingerprint(value):
+    """Hashable token for a node input; equal inputs give equal tokens"""
+
+    if hasattr(value, 'fingerprint'):  # PriceIndex
+        return ('fingerprint', value.fingerprint)
+    if isinstance(value, dict):
+        return ('dict', tuple((key, fingerprint(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(fingerprint(item) for item in value))
+    if isinstance(value, np.ndarray):
+        return ('array', value.dtype.str, value.shape, hashlib.blake2b(value.tobytes(), digest_size=16).hexdigest())
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ('pandas', tuple(map(str, value.columns if isinstance(value, pd.DataFrame) else [value.name])),
+                int(pd.util.hash_pandas_object(value, index=True).sum()))
+    return value
+
+
+class Node:
+    """One pipeline stage: ``func(**inputs)`` with its declared dependencies"""
+
+    def __init__(self, name, func, inputs=(), plan_keys=()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.plan_keys = tuple(plan_keys)
+
+
+class PipelineGraph:
+    """Dependency graph that keeps the last output of every node and recomputes only stale ones.
+
+    ``outputs`` is the store for cached node outputs; pass a persistent dict
+    (e.g. one kept in a session) to reuse outputs across graph instances.
+    """
+
+    def __init__(self, nodes=(), outputs=None):
+        self.nodes = {}
+        self._outputs = {} if outputs is None else outputs  # node name -> (key, output)
+        self.last_run = {'recomputed': [], 'reused': [], 'timings': {}}
+        for node in nodes:
+            self.add(node.name, node.func, node.inputs, node.plan_keys)
+
+    def add(self, name, func, inputs=(), plan_keys=()):
+        """Register a node; inputs may be node names or source names"""
+
+        self.nodes[name] = Node(name, func, inputs, plan_keys)
+        return func
+
+    def node(self, name, inputs=(), plan_keys=()):
+        """Decorator form of ``add``"""
+
+        return lambda func: self.add(name, func, inputs, plan_keys)
+
+    def _order(self, targets):
+        """Nodes needed for ``targets`` in dependency order"""
+
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline cycle through '{name}'")
+            state[name] = 'visiting'
+            for dependency in self.nodes[name].inputs:
+                if dependency in self.nodes:
+                    visit(dependency)
+            state[name] = 'done'
+            order.append(name)
+
+        for target in targets:
+            if target not in self.nodes:
+                raise KeyError(f"Unknown pipeline node '{target}'")
+            visit(target)
+        return order
+
+    def _key(self, name, sources, keys):
+        """Cache key of one node and the plan projection it receives"""
+
+        node = self.nodes[name]
+        missing = [item for item in node.inputs if item not in self.nodes and item not in sources]
+        if missing:
+            raise KeyError(f"Pipeline node '{name}' needs missing sources: {', '.join(missing)}")
+
+        plan = sources.get('plan', {})
+        node_plan = {key: plan[key] for key in node.plan_keys if key in plan}
+        token = (
+            name,
+            tuple(keys[item] if item in self.nodes else fingerprint(sources[item]) for item in node.inputs),
+            fingerprint(node_plan),
+        )
+        return hashlib.blake2b(repr(token).encode(), digest_size=16).hexdigest(), node_plan
+
+    @traced
+    def evaluate(self, sources, targets=None):
+        """Results for ``targets`` (default: every node), recomputing only invalidated nodes.
+
+        ``sources`` maps source names (including ``plan``) to values.
+        ``last_run`` records which nodes were recomputed or reused and how long
+        each recomputation took.
+        """
+
+        keys, results = {}, {}
+        recomputed, reused, timings = [], [], {}
+
+        for name in self._order(targets or list(self.nodes)):
+            node = self.nodes[name]
+            key, node_plan = self._key(name, sources, keys)
+
+            cached = self._outputs.get(name)
+            if cached is not None and cached[0] == key:
+                output = cached[1]
+                reused.append(name)
+            else:
+                kwargs = {item: results[item] if item in self.nodes else sources[item] for item in node.inputs}
+                if node.plan_keys:
+                    kwargs['plan'] = node_plan
+                started = time.perf_counter()
+                with span(f'node:{name}'):
+                    output = node.func(**kwargs)
+                timings[name] = time.perf_counter() - started
+                self._outputs[name] = (key, output)
+                recomputed.append(name)
+
+            keys[name] = key
+            results[name] = output
+
+        self.last_run = {'recomputed': recomputed, 'reused': reused, 'timings': timings}
+        return results
+
+    def seed(self, sources, results):
+        """Store known node outputs (e.g. results read back from a scenario store) as if evaluated from ``sources``"""
+
+        keys = {}
+        for name in self._order([name for name in results if name in self.nodes]):
+            keys[name] = self._key(name, sources, keys)[0]
+            if name in results:
+                self._outputs[name] = (keys[name], results[name])
+
+    def clear(self):
+        """Forget every cached output"""
+
+        self._outputs.clear()
+
+
+def planning_graph(outputs=None):
+    """The engine pipeline of ``evaluate_plan`` as graph nodes.
+
+    Sources: ``plan``, ``prices``, ``automation_components``,
+    ``itil_practices``, ``governance_framework``, ``current_skills`` and
+    ``config_params``.
+    """
+
+    graph = PipelineGraph(outputs=outputs)
+
+    graph.add('automation_maturity', calculate_automation_maturity, inputs=('automation_components',))
+
+    @graph.node('metrics', inputs=('automation_components', 'itil_practices', 'current_skills', 'config_params'),
+                plan_keys=METRICS_KEYS)
+    def metrics(plan, automation_components, itil_practices, current_skills, config_params):
+        return calculate_enterprise_metrics(plan, automation_components, itil_practices, current_skills, config_params)
+
+    def tco_node(clusters_key):
+        def tco(plan, automation_maturity, prices, config_params):
+            return cached_total_cost_of_ownership(plan[clusters_key], automation_maturity, plan['timeframe'], plan,
+                                                  prices, config_params)
+        return tco
+
+    tco_keys = (*TCO_INPUT_KEYS, 'timeframe')
+    tco_inputs = ('automation_maturity', 'prices', 'config_params')
+    graph.add('current_tco', tco_node('current_clusters'), tco_inputs, (*tco_keys, 'current_clusters'))
+    graph.add('target_tco', tco_node('target_clusters'), tco_inputs, (*tco_keys, 'target_clusters'))
+
+    @graph.node('baseline_tco', inputs=('prices', 'config_params'), plan_keys=(*tco_keys, 'target_clusters'))
+    def baseline_tco(plan, prices, config_params):
+        return cached_total_cost_of_ownership(plan['target_clusters'], 0, plan['timeframe'], plan, prices,
+                                              config_params)
+
+    @graph.node('forecast', inputs=('automation_maturity', 'current_skills', 'config_params'), plan_keys=FORECAST_KEYS)
+    def forecast(plan, automation_maturity, current_skills, config_params):
+        return calculate_monthly_forecast(plan, automation_maturity, current_skills, config_params)
+
+    @graph.node('licensing', inputs=('prices',), plan_keys=LICENSING_KEYS)
+    def licensing(plan, prices):
+        return calculate_sql_server_licensing_aws(plan['deployment_type'], plan['instance_type'],
+                                                  plan['target_clusters'], plan['sql_edition'],
+                                                  plan['licensing_model'], prices, plan.get('region'))
+
+    graph.add('governance_maturity', calculate_governance_maturity, inputs=('governance_framework',))
+    return graph
+
+
+def portfolio_planning_graph(outputs=None):
+    """``planning_graph`` with TCO, metrics and licensing rolled up from cluster groups.
+
+    Adds a ``portfolio`` source: one row per cluster group with the
+    ``portfolio.PORTFOLIO_COLUMNS`` (``clusters`` is the target count) and a
+    ``current_clusters`` count. ``plan['current_clusters']`` and
+    ``plan['target_clusters']`` should hold the portfolio totals; the
+    forecast and skills follow them while costs come from the groups.
+    """
+
+    graph = planning_graph(outputs)
+
+    @graph.node('portfolio_costs', inputs=('portfolio', 'prices'))
+    def portfolio_costs(portfolio, prices):
+        return {
+            'current': cached_portfolio_costs(portfolio.assign(clusters=portfolio['current_clusters']), prices),
+            'target': cached_portfolio_costs(portfolio, prices),
+        }
+
+    def tco_node(footprint):
+        def tco(plan, portfolio_costs, automation_maturity, config_params):
+            return calculate_portfolio_tco(portfolio_costs[footprint], automation_maturity, plan['timeframe'],
+                                           plan['support_24x7'], config_params)
+        return tco
+
+    tco_keys = ('timeframe', 'support_24x7')
+    tco_inputs = ('portfolio_costs', 'automation_maturity', 'config_params')
+    graph.add('current_tco', tco_node('current'), tco_inputs, tco_keys)
+    graph.add('target_tco', tco_node('target'), tco_inputs, tco_keys)
+
+    @graph.node('baseline_tco', inputs=('portfolio_costs', 'config_params'), plan_keys=tco_keys)
+    def baseline_tco(plan, portfolio_costs, config_params):
+        return calculate_portfolio_tco(portfolio_costs['target'], 0, plan['timeframe'], plan['support_24x7'],
+                                       config_params)
+
+    @graph.node('metrics', inputs=('automation_components', 'itil_practices', 'current_skills', 'config_params',
+                                   'portfolio_costs'), plan_keys=METRICS_KEYS)
+    def metrics(plan, automation_components, itil_practices, current_skills, config_params, portfolio_costs):
+        result = calculate_enterprise_metrics(plan, automation_components, itil_practices, current_skills,
+                                              config_params)
+        # Instance counts come from each group's own instances per cluster
+        result['current_ec2_instances'] = int(portfolio_costs['current']['total_instances'].sum())
+        result['target_ec2_instances'] = int(portfolio_costs['target']['total_instances'].sum())
+        return result
+
+    graph.add('licensing', lambda portfolio_costs: calculate_portfolio_licensing(portfolio_costs['target']),
+              inputs=('portfolio_costs',))
+    return graph
@@ -0,0 +1,297 @@
+"""Batch infrastructure costing for a portfolio of heterogeneous cluster groups.
+
+One row per cluster group (e.g. an AlwaysOn group shape); every price lookup
+is done column-wise so thousands of groups cost in a few milliseconds. The
+per-row maths mirrors ``engine.calculate_infrastructure_costs``, including the
+performance-aware storage model for groups with IOPS or throughput requirements.
+
+``cached_portfolio_costs`` keeps one-cluster costs per group shape so an
+edited portfolio only prices the rows whose configuration changed, and
+``calculate_portfolio_tco`` / ``calculate_portfolio_licensing`` roll priced
+groups up into the shapes of the engine's single-fleet results.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .defaults import ALWAYSON_CLUSTER, BYOL, DEFAULT_PLAN, STANDALONE_SQL_SERVER
+from .engine import (
+    calculate_skills_requirements,
+    calculate_workforce_requirements,
+    data_transfer_rate,
+    estimate_byol_annual_cost,
+)
+from .price_index import as_price_index
+from .storage import size_sql_storage
+from .tracing import traced
+
+# Portfolio columns and the defaults used when a column is omitted
+PORTFOLIO_COLUMNS = {
+    'clusters': None,
+    'instance_type': None,
+    'ec2_per_cluster': DEFAULT_PLAN['ec2_per_cluster'],
+    'storage_tb': DEFAULT_PLAN['current_storage_tb'],
+    'ebs_volume_type': DEFAULT_PLAN['ebs_volume_type'],
+    'storage_iops': DEFAULT_PLAN['storage_iops'],
+    'storage_throughput_mbps': DEFAULT_PLAN['storage_throughput_mbps'],
+    'enable_ssm_patching': DEFAULT_PLAN['enable_ssm_patching'],
+    'sql_edition': DEFAULT_PLAN['sql_edition'],
+    'licensing_model': DEFAULT_PLAN['licensing_model'],
+    'enable_datadog': DEFAULT_PLAN['enable_datadog'],
+    'deployment_type': DEFAULT_PLAN['deployment_type'],
+}
+
+COST_COLUMNS = [
+    'ec2_compute_monthly', 'sql_licensing_monthly', 'ebs_monthly', 'ssm_monthly',
+    'datadog_monthly', 'data_transfer_monthly', 'total_monthly'
+]
+
+# Columns a group's per-cluster costs depend on; every cost is linear in 'clusters'
+PRICED_COLUMNS = [column for column in PORTFOLIO_COLUMNS if column != 'clusters']
+GROUP_COST_COLUMNS = ['total_instances'] + COST_COLUMNS
+
+
+def normalize_portfolio(groups):
+    """Return a DataFrame with every portfolio column present and typed.
+
+    Accepts a pandas DataFrame, a pyarrow Table or anything ``pd.DataFrame``
+    accepts (list of dicts, dict of columns).
+    """
+
+    if hasattr(groups, 'to_pandas') and not isinstance(groups, pd.DataFrame):
+        groups = groups.to_pandas()
+    frame = pd.DataFrame(groups).reset_index(drop=True)
+
+    missing = [column for column, default in PORTFOLIO_COLUMNS.items() if default is None and column not in frame]
+    if missing:
+        raise ValueError(f"Portfolio is missing required columns: {', '.join(missing)}")
+
+    for column, default in PORTFOLIO_COLUMNS.items():
+        if column not in frame:
+            frame[column] = default
+
+    frame['clusters'] = frame['clusters'].astype(np.int64)
+    frame['storage_tb'] = frame['storage_tb'].astype(float)
+    frame['storage_iops'] = frame['storage_iops'].fillna(0).astype(float)
+    frame['storage_throughput_mbps'] = frame['storage_throughput_mbps'].fillna(0).astype(float)
+    frame['enable_ssm_patching'] = frame['enable_ssm_patching'].astype(bool)
+    frame['enable_datadog'] = frame['enable_datadog'].astype(bool)
+
+    # Standalone deployments always run a single instance per group member
+    alwayson = (frame['deployment_type'] == ALWAYSON_CLUSTER).to_numpy()
+    frame['ec2_per_cluster'] = np.where(alwayson, frame['ec2_per_cluster'].astype(np.int64), 1)
+    return frame
+
+
+@traced
+def calculate_portfolio_costs(groups, pricing_data=None):
+    """Price every cluster group and return one row of monthly costs per group.
+
+    ``pricing_data`` may be a compiled ``PriceIndex`` or a pricing dict; any
+    group whose price is not in the index raises ``MissingPriceError``. An
+    optional ``region`` column prices each group in its own region.
+    """
+
+    prices = as_price_index(pricing_data)
+    frame = normalize_portfolio(groups)
+    size = len(frame)
+    regions = frame['region'].to_numpy() if 'region' in frame else None
+
+    instance_type = frame['instance_type'].to_numpy()
+    windows_rate = prices.ec2_rates_for(instance_type, np.full(size, 'Windows', dtype=object), regions)
+
+    # License-Included rate per edition; BYOL groups only pay the Windows rate
+    byol = (frame['licensing_model'] == BYOL).to_numpy()
+    sql_rate = windows_rate.copy()
+    if (~byol).any():
+        sql_rate[~byol] = prices.ec2_rates_for(instance_type[~byol], frame['sql_edition'].to_numpy()[~byol],
+                                               None if regions is None else regions[~byol])
+
+    hourly_rate = np.where(byol, windows_rate, sql_rate)
+    licensing_component = np.where(byol, 0.0, sql_rate - windows_rate)
+
+    clusters = frame['clusters'].to_numpy()
+    total_instances = clusters * frame['ec2_per_cluster'].to_numpy()
+
+    ebs_rate_per_gb = prices.ebs_rates_for(frame['ebs_volume_type'].to_numpy(), regions)
+    storage_gb = frame['storage_tb'].to_numpy() * 1024
+    ebs_per_instance = ebs_rate_per_gb * storage_gb
+
+    # Groups with IOPS / throughput requirements get data, log and tempdb volumes on their cheapest types
+    iops = frame['storage_iops'].to_numpy()
+    throughput = frame['storage_throughput_mbps'].to_numpy()
+    performance = (iops > 0) | (throughput > 0)
+    if performance.any():
+        ebs_per_instance[performance] = size_sql_storage(
+            storage_gb[performance], iops[performance], throughput[performance], prices,
+            None if regions is None else regions[performance]
+        )['storage_monthly'].to_numpy()
+
+    monthly_ec2_cost = hourly_rate * 24 * 30 * total_instances
+    monthly_ebs_cost = ebs_per_instance * total_instances
+    monthly_ssm_cost = np.where(
+        frame['enable_ssm_patching'].to_numpy(),
+        prices.ssm_rates_for(regions, size) * 24 * 30 * total_instances, 0.0
+    )
+    monthly_datadog_cost = np.where(
+        frame['enable_datadog'].to_numpy(),
+        (prices.datadog_annual_per_instance / 12) * total_instances, 0.0
+    )
+    transfer_rate = np.where((frame['deployment_type'] == ALWAYSON_CLUSTER).to_numpy(),
+                             data_transfer_rate(ALWAYSON_CLUSTER), data_transfer_rate(STANDALONE_SQL_SERVER))
+    monthly_data_transfer = clusters * transfer_rate
+
+    costs = frame.copy()
+    costs['total_instances'] = total_instances
+    costs['ec2_compute_monthly'] = windows_rate * 24 * 30 * total_instances
+    costs['sql_licensing_monthly'] = licensing_component * 24 * 30 * total_instances
+    costs['ebs_monthly'] = monthly_ebs_cost
+    costs['ssm_monthly'] = monthly_ssm_cost
+    costs['datadog_monthly'] = monthly_datadog_cost
+    costs['data_transfer_monthly'] = monthly_data_transfer.astype(float)
+    costs['total_monthly'] = (monthly_ec2_cost + monthly_ebs_cost + monthly_ssm_cost
+                              + monthly_datadog_cost + monthly_data_transfer)
+    return costs
+
+
+# One-cluster costs per group shape and price index, shared by every session in the process
+PORTFOLIO_UNIT_COSTS = LRUCache()
+
+
+@traced
+def cached_portfolio_costs(groups, pricing_data=None, cache=PORTFOLIO_UNIT_COSTS):
+    """``calculate_portfolio_costs`` that prices each distinct group shape once.
+
+    A group's costs are its one-cluster costs times ``clusters``, so only
+    shapes (the ``PRICED_COLUMNS`` values) not yet in ``cache`` for this
+    price index are priced, together in one batch: changing a group's count
+    reprices nothing and editing one row reprices that row. The number of
+    shapes priced is in ``costs.attrs['repriced_groups']``.
+    """
+
+    prices = as_price_index(pricing_data)
+    frame = normalize_portfolio(groups)
+    columns = PRICED_COLUMNS + (['region'] if 'region' in frame else [])
+    shapes = pd.util.hash_pandas_object(frame[columns], index=False).to_numpy()
+
+    units = [cache.get((prices.fingerprint, shape)) for shape in shapes.tolist()]
+    stale = np.array([position for position, unit in enumerate(units) if unit is None], dtype=np.int64)
+    repriced = 0
+    if len(stale):
+        stale_shapes, first = np.unique(shapes[stale], return_index=True)
+        priced = calculate_portfolio_costs(frame.iloc[stale[first]].assign(clusters=1), prices)
+        fresh = dict(zip(stale_shapes.tolist(), priced[GROUP_COST_COLUMNS].to_numpy(dtype=float)))
+        for shape, unit in fresh.items():
+            cache.put((prices.fingerprint, shape), unit)
+        for position in stale.tolist():
+            units[position] = fresh[shapes[position].item()]
+        repriced = len(fresh)
+
+    unit_costs = np.vstack(units) if units else np.empty((0, len(GROUP_COST_COLUMNS)))
+    group_costs = pd.DataFrame(unit_costs * frame['clusters'].to_numpy()[:, None], columns=GROUP_COST_COLUMNS,
+                               index=frame.index)
+    group_costs['total_instances'] = group_costs['total_instances'].round().astype(np.int64)
+    costs = pd.concat([frame, group_costs], axis=1)
+    costs.attrs['repriced_groups'] = repriced
+    return costs
+
+
+def _single_value(column, mixed='Mixed'):
+    values = column.unique()
+    return values[0] if len(values) == 1 else mixed
+
+
+@traced
+def calculate_portfolio_tco(costs, automation_level, timeframe_months, support_24x7, config_params=None):
+    """``calculate_total_cost_of_ownership`` result for priced portfolio groups.
+
+    Infrastructure is the sum of the groups' costs; the workforce is sized
+    for the portfolio's total clusters. ``licensing_model`` and
+    ``sql_edition`` read 'Mixed' when the groups differ.
+    """
+
+    totals = portfolio_totals(costs)
+    infra_costs = {column: totals[column] for column in COST_COLUMNS}
+    infra_costs.update(total_instances=totals['total_instances'],
+                       licensing_model=_single_value(costs['licensing_model']),
+                       sql_edition=_single_value(costs['sql_edition']))
+
+    skills_needed = calculate_skills_requirements(totals['total_clusters'], automation_level, support_24x7,
+                                                  config_params)
+
+    tco_breakdown = {
+        'EC2 Compute': infra_costs['ec2_compute_monthly'] * timeframe_months,
+        'EBS Storage': infra_costs['ebs_monthly'] * timeframe_months,
+        'SSM Patching': infra_costs['ssm_monthly'] * timeframe_months,
+        'Data Transfer': infra_costs['data_transfer_monthly'] * timeframe_months,
+    }
+    byol = (costs['licensing_model'] == BYOL).to_numpy()
+    if byol.any():
+        tco_breakdown['BYOL Licensing'] = 0  # Customer provides licenses
+    if not byol.all():
+        tco_breakdown['SQL Licensing (AWS)'] = infra_costs['sql_licensing_monthly'] * timeframe_months
+    if costs['enable_datadog'].any():
+        tco_breakdown['Datadog Monitoring'] = infra_costs['datadog_monthly'] * timeframe_months
+
+    return {
+        'infrastructure': infra_costs,
+        'workforce_requirements': calculate_workforce_requirements(skills_needed),
+        'skills_required': skills_needed,
+        'total_infrastructure_cost': infra_costs['total_monthly'] * timeframe_months,
+        'tco_breakdown': tco_breakdown
+    }
+
+
+@traced
+def calculate_portfolio_licensing(costs):
+    """SQL Server licensing across priced portfolio groups, shaped like ``calculate_sql_server_licensing_aws``.
+
+    Hourly rates are averages over the portfolio's instances; ``by_edition``
+    lists the monthly AWS licensing and estimated external BYOL spend per
+    edition and licensing model.
+    """
+
+    by_edition = portfolio_rollup(costs, ['sql_edition', 'licensing_model'])
+    byol = (by_edition['licensing_model'] == BYOL).to_numpy()
+    by_edition['estimated_byol_annual'] = [
+        estimate_byol_annual_cost(edition, instances) if is_byol else 0.0
+        for edition, instances, is_byol in zip(by_edition['sql_edition'], by_edition['total_instances'], byol)
+    ]
+
+    instances = int(costs['total_instances'].sum())
+    byol_instances = int(by_edition['total_instances'][byol].sum())
+    instance_hours = max(instances, 1) * 24 * 30
+    monthly_cost = float(costs['sql_licensing_monthly'].sum())
+    licensing_model = _single_value(costs['licensing_model'])
+
+    return {
+        "monthly_cost": monthly_cost,
+        "annual_cost": monthly_cost * 12,
+        "licensing_model": {BYOL: "🆕 BYOL (Customer Licenses)"}.get(licensing_model, licensing_model),
+        "edition": _single_value(costs['sql_edition']),
+        "hourly_rate_per_instance": monthly_cost / instance_hours,
+        "total_hourly_rate": (float(costs['ec2_compute_monthly'].sum()) + monthly_cost) / instance_hours,
+        "estimated_byol_annual_per_instance": (
+            float(by_edition['estimated_byol_annual'].sum()) / byol_instances if byol_instances else 0
+        ),
+        "notes": f"Portfolio of {len(costs)} cluster groups; hourly rates are averages over {instances} instances",
+        "by_edition": by_edition[['sql_edition', 'licensing_model', 'total_instances', 'sql_licensing_monthly',
+                                  'estimated_byol_annual']].to_dict('records'),
+    }
+
+
+def portfolio_totals(costs):
+    """Roll per-group costs up into portfolio monthly totals"""
+
+    totals = {column: float(costs[column].sum()) for column in COST_COLUMNS}
+    totals['total_instances'] = int(costs['total_instances'].sum())
+    totals['total_clusters'] = int(costs['clusters'].sum())
+    totals['groups'] = len(costs)
+    return totals
+
+
+def portfolio_rollup(costs, by):
+    """Monthly cost subtotals grouped by one or more portfolio columns"""
+
+    return costs.groupby(by, sort=True)[COST_COLUMNS + ['total_instances', 'clusters']].sum().reset_index()
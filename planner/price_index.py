@@ -0,0 +1,283 @@
+"""Compiled, array-backed price index.
+
+Pricing tables are compiled once into a dense float matrix over
+instance type x OS/edition x region x purchase option, plus integer code
+tables for each axis. Single lookups are two dict hits and one array index;
+batch lookups encode whole columns and gather in one NumPy call. Prices that
+are not offered are stored as NaN and raise ``MissingPriceError`` instead of
+silently falling back to a placeholder rate.
+"""
+
+import hashlib
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from .defaults import BYOL
+from .pricing import DEFAULT_PRICING
+
+DEFAULT_REGION = 'us-east-1'
+ON_DEMAND = 'OnDemand'
+
+# OS/edition axis: "Windows" is the license-free base rate paid under BYOL
+EDITIONS = ('Windows', 'Web', 'Standard', 'Enterprise')
+EDITION_TABLES = {
+    'Windows': 'ec2_windows',
+    'Web': 'ec2_sql_web',
+    'Standard': 'ec2_sql_standard',
+    'Enterprise': 'ec2_sql_enterprise',
+}
+
+
+class MissingPriceError(LookupError):
+    """Raised when a requested price is not in the compiled index"""
+
+
+def priced_edition(sql_edition, licensing_model):
+    """OS/edition axis value billed by AWS for a SQL edition and licensing model"""
+
+    return 'Windows' if licensing_model == BYOL else sql_edition
+
+
+class PriceIndex:
+    """Dense price matrix with integer code tables for every axis"""
+
+    def __init__(self, instance_types, regions, purchase_options, ec2_rates, ebs_volume_types, ebs_rates,
+                 ssm_rates, datadog_annual_per_instance, last_updated=None, ebs_tiers=None):
+        self.instance_types = tuple(instance_types)
+        self.regions = tuple(regions)
+        self.purchase_options = tuple(purchase_options)
+        self.ebs_volume_types = tuple(ebs_volume_types)
+
+        self.instance_codes = {name: code for code, name in enumerate(self.instance_types)}
+        self.edition_codes = {name: code for code, name in enumerate(EDITIONS)}
+        self.region_codes = {name: code for code, name in enumerate(self.regions)}
+        self.option_codes = {name: code for code, name in enumerate(self.purchase_options)}
+        self.ebs_codes = {name: code for code, name in enumerate(self.ebs_volume_types)}
+        self._axes = {
+            'instance_type': pd.Index(self.instance_types),
+            'edition': pd.Index(EDITIONS),
+            'region': pd.Index(self.regions),
+            'purchase_option': pd.Index(self.purchase_options),
+            'ebs_volume_type': pd.Index(self.ebs_volume_types),
+        }
+
+        self.ec2_rates = ec2_rates  # (instance, edition, region, purchase option), NaN = not offered
+        self.ebs_rates = ebs_rates  # (volume type, region) USD per GB-month
+        self.ssm_rates = ssm_rates  # (region,) USD per instance-hour
+        self.datadog_annual_per_instance = datadog_annual_per_instance
+        self.ebs_tiers = ebs_tiers or {}  # region -> catalog EBS price tiers (pricing_data['ebs_tiers'])
+        self.default_region = self.regions[0]
+        self.last_updated = last_updated
+
+    # -- construction -----------------------------------------------------
+
+    @classmethod
+    def from_regional_pricing(cls, regional_pricing, purchase_option=ON_DEMAND):
+        """Compile ``{region: pricing_data}`` dicts (``DEFAULT_PRICING`` shape) into one index"""
+
+        regions = list(regional_pricing)
+        instance_types = sorted({
+            instance_type
+            for pricing in regional_pricing.values()
+            for table in EDITION_TABLES.values()
+            for instance_type in pricing.get(table, {})
+        })
+        volume_types = sorted({volume for pricing in regional_pricing.values() for volume in pricing['ebs']})
+
+        instance_codes = {name: code for code, name in enumerate(instance_types)}
+        volume_codes = {name: code for code, name in enumerate(volume_types)}
+
+        ec2_rates = np.full((len(instance_types), len(EDITIONS), len(regions), 1), np.nan)
+        ebs_rates = np.full((len(volume_types), len(regions)), np.nan)
+        ssm_rates = np.empty(len(regions))
+
+        for region_code, pricing in enumerate(regional_pricing.values()):
+            for edition_code, edition in enumerate(EDITIONS):
+                for instance_type, rate in pricing.get(EDITION_TABLES[edition], {}).items():
+                    ec2_rates[instance_codes[instance_type], edition_code, region_code, 0] = rate
+            for volume_type, rate in pricing['ebs'].items():
+                ebs_rates[volume_codes[volume_type], region_code] = rate
+            ssm_rates[region_code] = pricing['ssm']['patch_manager']
+
+        first = next(iter(regional_pricing.values()))
+        ebs_tiers = {region: pricing['ebs_tiers'] for region, pricing in regional_pricing.items()
+                     if pricing.get('ebs_tiers')}
+        return cls(instance_types, regions, [purchase_option], ec2_rates, volume_types, ebs_rates, ssm_rates,
+                   first['datadog']['annual_per_instance'], first.get('last_updated'), ebs_tiers)
+
+    @classmethod
+    def from_pricing(cls, pricing_data, region=None):
+        """Compile a single-region ``pricing_data`` dict"""
+
+        region = region or pricing_data.get('region', DEFAULT_REGION)
+        return cls.from_regional_pricing({region: pricing_data}, pricing_data.get('purchase_option', ON_DEMAND))
+
+    @classmethod
+    def from_catalog(cls, catalog_path, regions=None):
+        """Compile every region and purchase option in a SQLite price catalog"""
+
+        from .catalog import connect_catalog, load_catalog_pricing
+
+        connection = connect_catalog(catalog_path)
+        try:
+            if regions is None:
+                regions = [row[0] for row in connection.execute("SELECT DISTINCT region FROM ec2_prices ORDER BY region")]
+            frame = pd.read_sql_query(
+                "SELECT instance_type, edition, region, purchase_option, price_per_hour FROM ec2_prices "
+                "WHERE license_model = 'License-Included'", connection
+            )
+        finally:
+            connection.close()
+
+        if not regions:
+            raise LookupError(f"No EC2 prices in {catalog_path}")
+        frame = frame[frame['region'].isin(regions)]
+        regional_pricing = {region: load_catalog_pricing(catalog_path, region) for region in regions}
+        base = cls.from_regional_pricing(regional_pricing)
+
+        options = [ON_DEMAND] + sorted(set(frame['purchase_option']) - {ON_DEMAND})
+        instance_types = sorted(set(frame['instance_type']))
+        ec2_rates = np.full((len(instance_types), len(EDITIONS), len(regions), len(options)), np.nan)
+        ec2_rates[
+            pd.Index(instance_types).get_indexer(frame['instance_type']),
+            pd.Index(EDITIONS).get_indexer(frame['edition']),
+            pd.Index(regions).get_indexer(frame['region']),
+            pd.Index(options).get_indexer(frame['purchase_option']),
+        ] = frame['price_per_hour'].to_numpy()
+
+        return cls(instance_types, regions, options, ec2_rates, base.ebs_volume_types, base.ebs_rates,
+                   base.ssm_rates, base.datadog_annual_per_instance, base.last_updated, base.ebs_tiers)
+
+    @cached_property
+    def fingerprint(self):
+        """Content hash of every axis and rate, used to key cached results"""
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((self.instance_types, self.regions, self.purchase_options, self.ebs_volume_types,
+                            self.datadog_annual_per_instance, self.ebs_tiers)).encode())
+        for rates in (self.ec2_rates, self.ebs_rates, self.ssm_rates):
+            digest.update(np.ascontiguousarray(rates).tobytes())
+        return digest.hexdigest()
+
+    # -- code tables ------------------------------------------------------
+
+    def _code(self, codes, axis, value):
+        try:
+            return codes[value]
+        except KeyError:
+            raise MissingPriceError(f"No {axis} '{value}' in the price index") from None
+
+    def encode(self, axis, values):
+        """Vectorized code lookup for one axis; raises on unknown values"""
+
+        values = np.asarray(values, dtype=object)
+        codes = self._axes[axis].get_indexer(values)
+        if (codes < 0).any():
+            unknown = sorted({str(value) for value, code in zip(values, codes) if code < 0})
+            raise MissingPriceError(f"No {axis} {', '.join(unknown)} in the price index")
+        return codes
+
+    # -- scalar lookups ---------------------------------------------------
+
+    def ec2_rate(self, instance_type, edition, region=None, purchase_option=ON_DEMAND):
+        """Hourly rate for one instance type / OS edition"""
+
+        rate = self.ec2_rates.item(
+            self._code(self.instance_codes, 'instance type', instance_type),
+            self._code(self.edition_codes, 'edition', edition),
+            self._code(self.region_codes, 'region', region or self.default_region),
+            self._code(self.option_codes, 'purchase option', purchase_option),
+        )
+        if rate != rate:  # NaN: not offered
+            raise MissingPriceError(
+                f"{instance_type} {edition} is not priced in {region or self.default_region} ({purchase_option})"
+            )
+        return rate
+
+    def ebs_rate(self, volume_type, region=None):
+        """USD per GB-month for one EBS volume type"""
+
+        rate = self.ebs_rates.item(
+            self._code(self.ebs_codes, 'EBS volume type', volume_type),
+            self._code(self.region_codes, 'region', region or self.default_region),
+        )
+        if rate != rate:
+            raise MissingPriceError(f"EBS {volume_type} is not priced in {region or self.default_region}")
+        return rate
+
+    def ssm_rate(self, region=None):
+        """Systems Manager patching USD per instance-hour"""
+
+        return self.ssm_rates.item(self._code(self.region_codes, 'region', region or self.default_region))
+
+    # -- vectorized gathers -----------------------------------------------
+
+    def _region_codes(self, regions, size):
+        if regions is None:
+            return np.full(size, self.region_codes[self.default_region])
+        return self.encode('region', regions)
+
+    def ec2_rates_for(self, instance_types, editions, regions=None, purchase_options=None):
+        """Gather hourly rates for whole columns; raises if any combination is not offered"""
+
+        instance_codes = self.encode('instance_type', instance_types)
+        edition_codes = self.encode('edition', editions)
+        region_codes = self._region_codes(regions, len(instance_codes))
+        if purchase_options is None:
+            option_codes = np.zeros(len(instance_codes), dtype=np.intp)
+        else:
+            option_codes = self.encode('purchase_option', purchase_options)
+
+        rates = self.ec2_rates[instance_codes, edition_codes, region_codes, option_codes]
+        missing = np.isnan(rates)
+        if missing.any():
+            combos = sorted({
+                f"{self.instance_types[i]} {EDITIONS[e]} {self.regions[r]} {self.purchase_options[o]}"
+                for i, e, r, o in zip(instance_codes[missing], edition_codes[missing],
+                                      region_codes[missing], option_codes[missing])
+            })
+            raise MissingPriceError(f"Not priced: {'; '.join(combos[:10])}")
+        return rates
+
+    def ebs_rates_for(self, volume_types, regions=None):
+        """Gather EBS USD per GB-month for whole columns"""
+
+        volume_codes = self.encode('ebs_volume_type', volume_types)
+        rates = self.ebs_rates[volume_codes, self._region_codes(regions, len(volume_codes))]
+        if np.isnan(rates).any():
+            raise MissingPriceError("EBS volume type not priced in every requested region")
+        return rates
+
+    def ssm_rates_for(self, regions=None, size=1):
+        """Gather Systems Manager hourly rates for whole columns"""
+
+        return self.ssm_rates[self._region_codes(regions, size)]
+
+    # -- catalog helpers --------------------------------------------------
+
+    def priced_instance_types(self, region=None, purchase_option=ON_DEMAND):
+        """Instance types with a Windows rate and at least one SQL Server edition"""
+
+        rates = self.ec2_rates[:, :, self.region_codes[region or self.default_region],
+                               self.option_codes[purchase_option]]
+        offered = ~np.isnan(rates[:, 0]) & (~np.isnan(rates[:, 1:])).any(axis=1)
+        return [name for name, ok in zip(self.instance_types, offered) if ok]
+
+
+_default_index = None
+
+
+def as_price_index(pricing=None):
+    """Return a PriceIndex for a PriceIndex, a pricing_data dict or None (representative defaults)"""
+
+    global _default_index
+
+    if isinstance(pricing, PriceIndex):
+        return pricing
+    if pricing is None or pricing is DEFAULT_PRICING:
+        if _default_index is None:
+            _default_index = PriceIndex.from_pricing(DEFAULT_PRICING)
+        return _default_index
+    return PriceIndex.from_pricing(pricing)
@@ -0,0 +1,97 @@
+"""Representative 2025 AWS pricing tables used by the planning engine."""
+
+import copy
+
+# Hourly on-demand rates (USD) for Windows and SQL Server License-Included AMIs
+DEFAULT_PRICING = {
+    'ec2_windows': {
+        # Updated Windows EC2 pricing for 2025 (more realistic rates)
+        'm5.xlarge': 0.456, 'm5.2xlarge': 0.912, 'm5.4xlarge': 1.824, 'm5.8xlarge': 3.648,
+        'm5.12xlarge': 5.472, 'm5.16xlarge': 7.296, 'r5.xlarge': 0.584, 'r5.2xlarge': 1.168,
+        'r5.4xlarge': 2.336, 'r5.8xlarge': 4.672, 'r5.12xlarge': 7.008, 'r5.16xlarge': 9.344
+    },
+    'ec2_sql_web': {
+        # SQL Web edition with realistic markup
+        'm5.xlarge': 0.504, 'm5.2xlarge': 1.008, 'm5.4xlarge': 2.016, 'm5.8xlarge': 4.032,
+        'm5.12xlarge': 6.048, 'm5.16xlarge': 8.064, 'r5.xlarge': 0.632, 'r5.2xlarge': 1.264,
+        'r5.4xlarge': 2.528, 'r5.8xlarge': 5.056, 'r5.12xlarge': 7.584, 'r5.16xlarge': 10.112
+    },
+    'ec2_sql_standard': {
+        # SQL Standard edition with current AWS pricing
+        'm5.xlarge': 0.832, 'm5.2xlarge': 1.664, 'm5.4xlarge': 3.328, 'm5.8xlarge': 6.656,
+        'm5.12xlarge': 9.984, 'm5.16xlarge': 13.312, 'r5.xlarge': 1.096, 'r5.2xlarge': 2.192,
+        'r5.4xlarge': 4.384, 'r5.8xlarge': 8.768, 'r5.12xlarge': 13.152, 'r5.16xlarge': 17.536
+    },
+    'ec2_sql_enterprise': {
+        # SQL Enterprise edition with premium pricing
+        'm5.xlarge': 1.456, 'm5.2xlarge': 2.912, 'm5.4xlarge': 5.824, 'm5.8xlarge': 11.648,
+        'm5.12xlarge': 17.472, 'm5.16xlarge': 23.296, 'r5.xlarge': 1.728, 'r5.2xlarge': 3.456,
+        'r5.4xlarge': 6.912, 'r5.8xlarge': 13.824, 'r5.12xlarge': 20.736, 'r5.16xlarge': 27.648
+    },
+    'ebs': {'gp3': 0.08, 'gp2': 0.096, 'io2': 0.125, 'io1': 0.125},  # Updated EBS pricing
+    'ssm': {'patch_manager': 0.00972},
+    'datadog': {'annual_per_instance': 1000},  # Datadog pricing
+    'last_updated': 'Updated Practical 2025 Pricing Data with BYOL & Datadog Support'
+}
+
+# Current-generation families: representative us-east-1 Linux rate per vCPU-hour. Windows adds
+# WINDOWS_PER_VCPU and License-Included SQL Server adds the same per-vCPU uplift as the m5 rows above.
+CURRENT_GENERATION_LINUX_PER_VCPU = {'m6i': 0.048, 'm7i': 0.0504, 'r6i': 0.063, 'r7i': 0.06615, 'x2iedn': 0.2084}
+CURRENT_GENERATION_SIZES = {
+    'm6i': ('xlarge', '2xlarge', '4xlarge', '8xlarge', '12xlarge', '16xlarge', '24xlarge', '32xlarge'),
+    'r6i': ('xlarge', '2xlarge', '4xlarge', '8xlarge', '12xlarge', '16xlarge', '24xlarge', '32xlarge'),
+    'm7i': ('xlarge', '2xlarge', '4xlarge', '8xlarge', '12xlarge', '16xlarge', '24xlarge', '48xlarge'),
+    'r7i': ('xlarge', '2xlarge', '4xlarge', '8xlarge', '12xlarge', '16xlarge', '24xlarge', '48xlarge'),
+    'x2iedn': ('xlarge', '2xlarge', '4xlarge', '8xlarge', '16xlarge', '24xlarge', '32xlarge'),
+}
+SIZE_VCPUS = {'xlarge': 4, '2xlarge': 8, '4xlarge': 16, '8xlarge': 32, '12xlarge': 48, '16xlarge': 64,
+              '24xlarge': 96, '32xlarge': 128, '48xlarge': 192}
+WINDOWS_PER_VCPU = 0.046
+SQL_LICENSE_PER_VCPU = {'ec2_sql_web': 0.012, 'ec2_sql_standard': 0.094, 'ec2_sql_enterprise': 0.25}
+
+
+def _add_current_generation(pricing):
+    for family, linux_per_vcpu in CURRENT_GENERATION_LINUX_PER_VCPU.items():
+        for size in CURRENT_GENERATION_SIZES[family]:
+            instance_type = f"{family}.{size}"
+            vcpus = SIZE_VCPUS[size]
+            windows = (linux_per_vcpu + WINDOWS_PER_VCPU) * vcpus
+            pricing['ec2_windows'][instance_type] = round(windows, 4)
+            for table, uplift in SQL_LICENSE_PER_VCPU.items():
+                pricing[table][instance_type] = round(windows + uplift * vcpus, 4)
+
+
+_add_current_generation(DEFAULT_PRICING)
+
+# EBS performance pricing on top of the per-GB rate, as (from, to, USD per unit-month) tiers over the
+# provisioned amount: IOPS-month and MB/s-month. gp3 includes 3,000 IOPS and 125 MB/s; gp2 has no
+# performance charge (IOPS scale with size), io1/io2 bill every provisioned IOPS.
+EBS_PERFORMANCE_PRICING = {
+    'gp3': {'iops': [(3000, None, 0.005)], 'throughput': [(125, None, 0.04)]},
+    'gp2': {'iops': [], 'throughput': []},
+    'io1': {'iops': [(0, None, 0.065)], 'throughput': []},
+    'io2': {'iops': [(0, 32000, 0.065), (32000, 64000, 0.0455), (64000, None, 0.03185)], 'throughput': []},
+}
+
+# SQL Server edition -> pricing table key
+EDITION_KEY_MAP = {
+    "Web": "ec2_sql_web",
+    "Standard": "ec2_sql_standard",
+    "Enterprise": "ec2_sql_enterprise"
+}
+
+# Approximate external SQL Server licence cost per core per year (BYOL reference only)
+BYOL_ANNUAL_PER_CORE = {
+    "Enterprise": 14256,
+    "Standard": 3717,
+    "Web": 1435
+}
+
+
+def default_pricing(last_updated=None):
+    """Return a private copy of the representative pricing tables"""
+
+    pricing = copy.deepcopy(DEFAULT_PRICING)
+    if last_updated is not None:
+        pricing['last_updated'] = last_updated
+    return pricing
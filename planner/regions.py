@@ -0,0 +1,157 @@
+"""Lazy, per-region pricing with parallel loading.
+
+Each region's price tables are loaded on first use through a pluggable
+loader (the local catalog, the live Pricing API or the representative
+defaults) and cached for the life of the ``RegionalPricing`` object. Loads run
+on a small thread pool so comparing several regions fetches them in parallel,
+while a single-region session only ever loads the region it prices.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from .catalog import DEFAULT_CATALOG_PATH, fetch_region_pricing, load_catalog_pricing
+from .engine import calculate_total_cost_of_ownership
+from .price_index import DEFAULT_REGION, ON_DEMAND, MissingPriceError, PriceIndex
+from .pricing import default_pricing
+from .tracing import traced
+
+MAX_REGION_WORKERS = 6
+
+
+def catalog_loader(catalog_path=DEFAULT_CATALOG_PATH, purchase_option=ON_DEMAND):
+    """Loader reading one region at a time from the SQLite price catalog"""
+
+    def load(region):
+        return load_catalog_pricing(catalog_path, region, purchase_option)
+
+    return load
+
+
+def pricing_api_loader(client, purchase_option=ON_DEMAND):
+    """Loader fetching one region at a time from the AWS Pricing API"""
+
+    def load(region):
+        return fetch_region_pricing(client, region, purchase_option)
+
+    return load
+
+
+def representative_loader(region):
+    """Loader for the representative tables, which are us-east-1 rates"""
+
+    if region != DEFAULT_REGION:
+        raise MissingPriceError(f"Representative pricing only covers {DEFAULT_REGION}, not {region}")
+    pricing = default_pricing()
+    pricing['region'] = region
+    return pricing
+
+
+class RegionalPricing:
+    """Per-region pricing cache that loads regions lazily on a thread pool"""
+
+    def __init__(self, loader, max_workers=MAX_REGION_WORKERS):
+        self._loader = loader
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='region-pricing')
+        self._lock = threading.RLock()
+        self._futures = {}
+        self._indexes = {}
+
+    def _submit(self, region):
+        with self._lock:
+            future = self._futures.get(region)
+            if future is None:
+                future = self._executor.submit(self._loader, region)
+                self._futures[region] = future
+                future.add_done_callback(lambda done: self._forget_failure(region, done))
+            return future
+
+    def _forget_failure(self, region, future):
+        # Failed loads are not cached so a later call can retry (e.g. after a re-ingest)
+        if future.exception() is not None:
+            with self._lock:
+                if self._futures.get(region) is future:
+                    del self._futures[region]
+
+    def pricing(self, region):
+        """Pricing dict for one region, loading it on first use"""
+
+        return self._submit(region).result()
+
+    def prefetch(self, regions):
+        """Start loading several regions in parallel and wait for all of them"""
+
+        wait([self._submit(region) for region in regions])
+
+    @traced
+    def index(self, region):
+        """Compiled single-region ``PriceIndex``, cached per region"""
+
+        with self._lock:
+            index = self._indexes.get(region)
+        if index is None:
+            index = PriceIndex.from_pricing(self.pricing(region), region)
+            with self._lock:
+                index = self._indexes.setdefault(region, index)
+        return index
+
+    @traced
+    def combined_index(self, regions):
+        """One ``PriceIndex`` spanning several regions, loading any missing ones in parallel"""
+
+        regions = list(regions)
+        self.prefetch(regions)
+        return PriceIndex.from_regional_pricing({region: self.pricing(region) for region in regions})
+
+    @property
+    def loaded_regions(self):
+        """Regions whose pricing has finished loading successfully"""
+
+        with self._lock:
+            futures = dict(self._futures)
+        return sorted(region for region, future in futures.items()
+                      if future.done() and future.exception() is None)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def compare_regions(plan, regions, regional_pricing, automation_level, config_params=None):
+    """Price the target plan in each region and return one row per region.
+
+    Regions that cannot be loaded or do not offer the plan's instance type
+    are kept with NaN costs and the reason in ``note``.
+    """
+
+    regional_pricing.prefetch(regions)
+
+    rows = []
+    for region in regions:
+        row = {'region': region, 'note': ''}
+        try:
+            tco = calculate_total_cost_of_ownership(
+                plan['target_clusters'], automation_level, plan['timeframe'], {**plan, 'region': region},
+                regional_pricing.index(region), config_params
+            )
+        except LookupError as e:
+            row.update({'total_monthly': float('nan'), 'total_infrastructure_cost': float('nan'), 'note': str(e)})
+        else:
+            infra = tco['infrastructure']
+            row.update({
+                'ec2_compute_monthly': infra['ec2_compute_monthly'],
+                'sql_licensing_monthly': infra['sql_licensing_monthly'],
+                'ebs_monthly': infra['ebs_monthly'],
+                'ssm_monthly': infra['ssm_monthly'],
+                'datadog_monthly': infra['datadog_monthly'],
+                'data_transfer_monthly': infra['data_transfer_monthly'],
+                'total_monthly': infra['total_monthly'],
+                'total_infrastructure_cost': tco['total_infrastructure_cost'],
+            })
+        rows.append(row)
+
+    comparison = pd.DataFrame(rows)
+    baseline = comparison['total_monthly'].min()
+    comparison['vs_cheapest_pct'] = (comparison['total_monthly'] / baseline - 1) * 100
+    return comparison.sort_values('total_monthly', na_position='last').reset_index(drop=True)
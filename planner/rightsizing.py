@@ -0,0 +1,180 @@
+"""Instance right-sizing against an indexed vCPU / memory / network / EBS spec table.
+
+Every spec dimension is reduced to its sorted distinct levels, and a dense
+table over those levels holds the cheapest priced instance meeting each
+combination of minimums (a suffix minimum along every axis). A query is one
+``searchsorted`` per dimension plus one array gather, so a batch of
+thousands of servers is sized without scanning the spec table per server.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .defaults import DEFAULT_PLAN
+from .price_index import ON_DEMAND, as_price_index, priced_edition
+
+SPEC_COLUMNS = ('vcpu', 'memory_gib', 'network_gbps', 'ebs_bandwidth_mbps')
+
+# Representative specs: instance type -> (vCPU, memory GiB, network Gbps, EBS bandwidth Mbps).
+# Burstable "up to" network and EBS figures are listed at their burst ceiling.
+INSTANCE_SPECS = {
+    'm5.xlarge': (4, 16, 10, 4750), 'm5.2xlarge': (8, 32, 10, 4750), 'm5.4xlarge': (16, 64, 10, 4750),
+    'm5.8xlarge': (32, 128, 10, 6800), 'm5.12xlarge': (48, 192, 10, 9500), 'm5.16xlarge': (64, 256, 20, 13600),
+    'm5.24xlarge': (96, 384, 25, 19000),
+    'r5.xlarge': (4, 32, 10, 4750), 'r5.2xlarge': (8, 64, 10, 4750), 'r5.4xlarge': (16, 128, 10, 4750),
+    'r5.8xlarge': (32, 256, 10, 6800), 'r5.12xlarge': (48, 384, 10, 9500), 'r5.16xlarge': (64, 512, 20, 13600),
+    'r5.24xlarge': (96, 768, 25, 19000),
+    'm6i.xlarge': (4, 16, 12.5, 10000), 'm6i.2xlarge': (8, 32, 12.5, 10000), 'm6i.4xlarge': (16, 64, 12.5, 10000),
+    'm6i.8xlarge': (32, 128, 12.5, 10000), 'm6i.12xlarge': (48, 192, 18.75, 15000),
+    'm6i.16xlarge': (64, 256, 25, 20000), 'm6i.24xlarge': (96, 384, 37.5, 30000),
+    'm6i.32xlarge': (128, 512, 50, 40000),
+    'r6i.xlarge': (4, 32, 12.5, 10000), 'r6i.2xlarge': (8, 64, 12.5, 10000), 'r6i.4xlarge': (16, 128, 12.5, 10000),
+    'r6i.8xlarge': (32, 256, 12.5, 10000), 'r6i.12xlarge': (48, 384, 18.75, 15000),
+    'r6i.16xlarge': (64, 512, 25, 20000), 'r6i.24xlarge': (96, 768, 37.5, 30000),
+    'r6i.32xlarge': (128, 1024, 50, 40000),
+    'm7i.xlarge': (4, 16, 12.5, 10000), 'm7i.2xlarge': (8, 32, 12.5, 10000), 'm7i.4xlarge': (16, 64, 12.5, 10000),
+    'm7i.8xlarge': (32, 128, 12.5, 10000), 'm7i.12xlarge': (48, 192, 18.75, 15000),
+    'm7i.16xlarge': (64, 256, 25, 20000), 'm7i.24xlarge': (96, 384, 37.5, 30000),
+    'm7i.48xlarge': (192, 768, 50, 40000),
+    'r7i.xlarge': (4, 32, 12.5, 10000), 'r7i.2xlarge': (8, 64, 12.5, 10000), 'r7i.4xlarge': (16, 128, 12.5, 10000),
+    'r7i.8xlarge': (32, 256, 12.5, 10000), 'r7i.12xlarge': (48, 384, 18.75, 15000),
+    'r7i.16xlarge': (64, 512, 25, 20000), 'r7i.24xlarge': (96, 768, 37.5, 30000),
+    'r7i.48xlarge': (192, 1536, 50, 40000),
+    'x2iedn.xlarge': (4, 128, 25, 20000), 'x2iedn.2xlarge': (8, 256, 25, 20000),
+    'x2iedn.4xlarge': (16, 512, 25, 20000), 'x2iedn.8xlarge': (32, 1024, 25, 20000),
+    'x2iedn.16xlarge': (64, 2048, 50, 40000), 'x2iedn.24xlarge': (96, 3072, 75, 60000),
+    'x2iedn.32xlarge': (128, 4096, 100, 80000),
+}
+
+
+def default_instance_specs():
+    """The representative spec table as a DataFrame indexed by instance type"""
+
+    specs = pd.DataFrame.from_dict(INSTANCE_SPECS, orient='index', columns=list(SPEC_COLUMNS), dtype=float)
+    specs.index.name = 'instance_type'
+    return specs
+
+
+def merge_instance_specs(*tables):
+    """Combine spec tables; later tables override earlier ones row by row"""
+
+    frames = [table[list(SPEC_COLUMNS)].astype(float) for table in tables if table is not None and len(table)]
+    merged = pd.concat(frames)
+    return merged[~merged.index.duplicated(keep='last')].sort_index()
+
+
+class InstanceSizer:
+    """Cheapest-instance lookup over the spec table for one priced edition, region and purchase option"""
+
+    def __init__(self, specs, rates):
+        """``specs`` is a spec DataFrame and ``rates`` a Series of hourly rates on the same index"""
+
+        rates = rates.reindex(specs.index)
+        priced = rates.notna().to_numpy()
+        specs = specs.loc[priced, list(SPEC_COLUMNS)].fillna(0.0)
+        rates = rates[priced]
+
+        # Cheapest first (ties by name) so a smaller rank always means a cheaper instance
+        order = np.lexsort((specs.index.to_numpy(dtype=str), rates.to_numpy()))
+        self.instance_types = specs.index.to_numpy()[order]
+        self.hourly_rates = rates.to_numpy()[order]
+        self.specs = specs.to_numpy()[order]
+
+        self.levels = [np.unique(self.specs[:, axis]) for axis in range(len(SPEC_COLUMNS))]
+        level_codes = tuple(np.searchsorted(levels, self.specs[:, axis])
+                            for axis, levels in enumerate(self.levels))
+
+        # best[i, j, k, l]: rank of the cheapest instance with every spec at or above those levels;
+        # the extra trailing slice on each axis holds "nothing qualifies"
+        none = len(self.instance_types)
+        best = np.full(tuple(len(levels) + 1 for levels in self.levels), none, dtype=np.int32)
+        np.minimum.at(best, level_codes, np.arange(none, dtype=np.int32))
+        for axis in range(best.ndim):
+            best = np.flip(np.minimum.accumulate(np.flip(best, axis), axis=axis), axis)
+        self._best = best
+
+    @classmethod
+    def for_edition(cls, specs, prices=None, edition='Standard', region=None, purchase_option=ON_DEMAND):
+        """Sizer over every instance in ``specs`` priced for one OS/edition column of a price index"""
+
+        prices = as_price_index(prices)
+        rates = prices.ec2_rates[:, prices.edition_codes[edition],
+                                 prices.region_codes[region or prices.default_region],
+                                 prices.option_codes[purchase_option]]
+        return cls(specs, pd.Series(rates, index=pd.Index(prices.instance_types)))
+
+    def _ranks(self, requirements):
+        codes = tuple(np.searchsorted(levels, np.asarray(requirements[axis], dtype=float), side='left')
+                      for axis, levels in enumerate(self.levels))
+        return self._best[codes]
+
+    def cheapest(self, vcpu, memory_gib, network_gbps=0.0, ebs_bandwidth_mbps=0.0):
+        """Cheapest instance type meeting every minimum, or None"""
+
+        rank = int(self._ranks((vcpu, memory_gib, network_gbps, ebs_bandwidth_mbps)))
+        return self.instance_types[rank] if rank < len(self.instance_types) else None
+
+    def cheapest_many(self, vcpu, memory_gib, network_gbps=0.0, ebs_bandwidth_mbps=0.0):
+        """Vectorized ``cheapest``: (instance types, hourly rates) with None / NaN where nothing qualifies"""
+
+        vcpu = np.asarray(vcpu, dtype=float)
+        requirements = [np.broadcast_to(np.asarray(value, dtype=float), vcpu.shape)
+                        for value in (vcpu, memory_gib, network_gbps, ebs_bandwidth_mbps)]
+        ranks = self._ranks(requirements)
+        found = ranks < len(self.instance_types)
+        instance_types = np.where(found, self.instance_types[np.minimum(ranks, len(self.instance_types) - 1)], None)
+        hourly_rates = np.where(found, self.hourly_rates[np.minimum(ranks, len(self.hourly_rates) - 1)], np.nan)
+        return instance_types, hourly_rates
+
+    def options(self, vcpu, memory_gib, network_gbps=0.0, ebs_bandwidth_mbps=0.0, limit=5):
+        """The ``limit`` cheapest qualifying instances with their specs and hourly rate"""
+
+        fits = (self.specs >= np.array([vcpu, memory_gib, network_gbps, ebs_bandwidth_mbps], dtype=float)).all(axis=1)
+        chosen = np.flatnonzero(fits)[:limit]
+        frame = pd.DataFrame(self.specs[chosen], columns=list(SPEC_COLUMNS))
+        frame.insert(0, 'instance_type', self.instance_types[chosen])
+        frame['hourly_rate'] = self.hourly_rates[chosen]
+        return frame
+
+
+def rightsize_servers(servers, prices=None, specs=None, headroom=0.0, purchase_option=ON_DEMAND):
+    """Recommend the cheapest instance for every server row.
+
+    ``servers`` needs ``vcpu`` and ``memory_gib`` columns; ``network_gbps``,
+    ``ebs_bandwidth_mbps``, ``sql_edition``, ``licensing_model`` and
+    ``region`` are optional. ``headroom`` inflates every requirement (0.2 =
+    20% spare). Adds ``recommended_instance_type``, ``hourly_rate`` and
+    ``monthly_cost`` (None / NaN where no instance qualifies).
+    """
+
+    prices = as_price_index(prices)
+    specs = default_instance_specs() if specs is None else specs
+    frame = pd.DataFrame(servers).reset_index(drop=True)
+
+    requirements = {
+        column: frame[column].astype(float).to_numpy() * (1 + headroom) if column in frame else np.zeros(len(frame))
+        for column in SPEC_COLUMNS
+    }
+    editions = np.array([
+        priced_edition(edition, model) for edition, model in zip(
+            frame['sql_edition'] if 'sql_edition' in frame else [DEFAULT_PLAN['sql_edition']] * len(frame),
+            frame['licensing_model'] if 'licensing_model' in frame else [DEFAULT_PLAN['licensing_model']] * len(frame),
+        )
+    ], dtype=object)
+    regions = (frame['region'].fillna(prices.default_region).to_numpy(dtype=object) if 'region' in frame
+               else np.full(len(frame), prices.default_region, dtype=object))
+
+    recommended = np.full(len(frame), None, dtype=object)
+    hourly_rates = np.full(len(frame), np.nan)
+    keys = pd.MultiIndex.from_arrays([editions, regions])
+    for (edition, region), rows in pd.Series(np.arange(len(frame))).groupby(keys):
+        rows = rows.to_numpy()
+        sizer = InstanceSizer.for_edition(specs, prices, edition, region, purchase_option)
+        recommended[rows], hourly_rates[rows] = sizer.cheapest_many(
+            *(requirements[column][rows] for column in SPEC_COLUMNS)
+        )
+
+    frame['recommended_instance_type'] = recommended
+    frame['hourly_rate'] = hourly_rates
+    frame['monthly_cost'] = hourly_rates * 24 * 30
+    return frame
@@ -0,0 +1,290 @@
+"""Saved planning scenarios in a local SQLite store.
+
+A scenario is the full plan (the sidebar configuration) plus the automation,
+ITIL, governance, staffing and configuration state. It is stored under the
+hash of that content together with its computed TCO, forecast and metric
+results, so saving identical content twice keeps one row and reopening a
+scenario is a primary-key read instead of a recompute. Names are labels on a
+content hash; several names may point at the same scenario.
+
+    python -m planner.scenarios list --store scenarios.sqlite
+    python -m planner.scenarios show "Q3 baseline" --store scenarios.sqlite
+    python -m planner.scenarios delete "Q3 baseline" --store scenarios.sqlite
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .engine import evaluate_plan
+from .price_index import as_price_index
+
+DEFAULT_SCENARIO_STORE_PATH = os.environ.get('SQLAO_SCENARIO_STORE', 'scenarios.sqlite')
+
+# Session state saved with every scenario alongside the plan
+SCENARIO_STATE_KEYS = ('automation_components', 'itil_practices', 'governance_framework', 'current_skills',
+                       'config_params')
+
+# evaluate_plan results kept with the scenario
+RESULT_KEYS = ('metrics', 'current_tco', 'target_tco', 'baseline_tco', 'forecast', 'licensing',
+               'governance_maturity')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    content_hash TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    price_fingerprint TEXT,
+    scenario TEXT NOT NULL,
+    results BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenario_names (
+    name TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL REFERENCES scenarios (content_hash),
+    saved_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scenario_names_by_hash ON scenario_names (content_hash);
+CREATE INDEX IF NOT EXISTS scenario_names_by_saved_at ON scenario_names (saved_at);
+"""
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot store {type(value).__name__} in a scenario")
+
+
+def canonical_json(value, allow_nan=True):
+    """Stable JSON text: sorted keys, no whitespace, NumPy values as plain numbers"""
+
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default, allow_nan=allow_nan)
+
+
+def scenario_content(plan, state):
+    """The stored scenario: the plan plus the saved session state keys"""
+
+    return {'plan': dict(plan), 'state': {key: state[key] for key in SCENARIO_STATE_KEYS if key in state}}
+
+
+def scenario_hash(plan, state):
+    """Content hash identifying a scenario; equal plans and state give equal hashes"""
+
+    return hashlib.sha256(canonical_json(scenario_content(plan, state)).encode()).hexdigest()
+
+
+def encode_results(results):
+    return zlib.compress(canonical_json({key: results[key] for key in RESULT_KEYS if key in results}).encode())
+
+
+def decode_results(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+def connect_store(path=DEFAULT_SCENARIO_STORE_PATH):
+    """Open (and create if needed) the scenario store"""
+
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _now():
+    # Microseconds keep saves made within the same second in save order; older
+    # second-resolution stamps still sort before them
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f UTC")
+
+
+def save_scenario(name, plan, state, results=None, prices=None, store_path=DEFAULT_SCENARIO_STORE_PATH):
+    """Store a scenario under ``name`` and return its content hash.
+
+    ``results`` are the ``evaluate_plan`` results for the scenario; they are
+    computed with ``prices`` when omitted. Saving content that is already
+    stored refreshes its results and just moves the name onto it.
+    """
+
+    prices = as_price_index(prices)
+    content = scenario_content(plan, state)
+    content_hash = scenario_hash(plan, state)
+    if results is None:
+        results = evaluate_plan(content['plan'], state['automation_components'], state['itil_practices'],
+                                state['governance_framework'], state['current_skills'],
+                                state.get('config_params'), prices)
+
+    connection = connect_store(store_path)
+    try:
+        with connection:
+            now = _now()
+            previous = connection.execute(
+                "SELECT content_hash FROM scenario_names WHERE name = ?", (name,)
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO scenarios (content_hash, created_at, price_fingerprint, scenario, results) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (content_hash) DO UPDATE SET "
+                "price_fingerprint = excluded.price_fingerprint, results = excluded.results",
+                (content_hash, now, prices.fingerprint, canonical_json(content), encode_results(results))
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO scenario_names (name, content_hash, saved_at) VALUES (?, ?, ?)",
+                (name, content_hash, now)
+            )
+            if previous is not None and previous[0] != content_hash:
+                _drop_unnamed(connection, previous[0])
+    finally:
+        connection.close()
+    return content_hash
+
+
+def _drop_unnamed(connection, content_hash):
+    connection.execute(
+        "DELETE FROM scenarios WHERE content_hash = ? AND NOT EXISTS "
+        "(SELECT 1 FROM scenario_names WHERE content_hash = ?)", (content_hash, content_hash)
+    )
+
+
+def _scenario_row(connection, content_hash):
+    row = connection.execute(
+        "SELECT content_hash, created_at, price_fingerprint, scenario, results FROM scenarios "
+        "WHERE content_hash = ?", (content_hash,)
+    ).fetchone()
+    if row is None:
+        return None
+    content = json.loads(row[3])
+    return {
+        'content_hash': row[0],
+        'created_at': row[1],
+        'price_fingerprint': row[2],
+        'plan': content['plan'],
+        'state': content['state'],
+        'results': decode_results(row[4]),
+    }
+
+
+def load_scenario(name, store_path=DEFAULT_SCENARIO_STORE_PATH):
+    """A named scenario with its plan, state and stored results, or None"""
+
+    connection = connect_store(store_path)
+    try:
+        row = connection.execute(
+            "SELECT content_hash, saved_at FROM scenario_names WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        scenario = _scenario_row(connection, row[0])
+        return {'name': name, 'saved_at': row[1], **scenario}
+    finally:
+        connection.close()
+
+
+def load_scenarios(names, store_path=DEFAULT_SCENARIO_STORE_PATH):
+    """Several named scenarios in ``names`` order through one connection; unknown names raise ``KeyError``"""
+
+    connection = connect_store(store_path)
+    try:
+        saved = dict(connection.execute(
+            f"SELECT name, content_hash FROM scenario_names WHERE name IN ({', '.join('?' for _ in names)})",
+            list(names)
+        ))
+        missing = [name for name in names if name not in saved]
+        if missing:
+            raise KeyError(f"No saved scenario named {', '.join(map(repr, missing))}")
+        return [{'name': name, **_scenario_row(connection, saved[name])} for name in names]
+    finally:
+        connection.close()
+
+
+def stored_results(content_hash, price_fingerprint=None, store_path=DEFAULT_SCENARIO_STORE_PATH):
+    """Stored results for a content hash, or None; with ``price_fingerprint``, only results priced the same way"""
+
+    if not os.path.exists(store_path):
+        return None
+    connection = connect_store(store_path)
+    try:
+        row = connection.execute(
+            "SELECT price_fingerprint, results FROM scenarios WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+    finally:
+        connection.close()
+    if row is None or (price_fingerprint is not None and row[0] != price_fingerprint):
+        return None
+    return decode_results(row[1])
+
+
+def list_scenarios(store_path=DEFAULT_SCENARIO_STORE_PATH, limit=None):
+    """Saved scenario names, most recently saved first, with their content hash and save time"""
+
+    if not os.path.exists(store_path):
+        return []
+    connection = connect_store(store_path)
+    try:
+        rows = connection.execute(
+            "SELECT name, content_hash, saved_at FROM scenario_names ORDER BY saved_at DESC, name "
+            "LIMIT ?", (-1 if limit is None else limit,)
+        ).fetchall()
+    finally:
+        connection.close()
+    return [{'name': name, 'content_hash': content_hash, 'saved_at': saved_at}
+            for name, content_hash, saved_at in rows]
+
+
+def delete_scenario(name, store_path=DEFAULT_SCENARIO_STORE_PATH):
+    """Remove a name; the scenario itself goes once no name points at it. Returns whether the name existed"""
+
+    connection = connect_store(store_path)
+    try:
+        with connection:
+            row = connection.execute("SELECT content_hash FROM scenario_names WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return False
+            connection.execute("DELETE FROM scenario_names WHERE name = ?", (name,))
+            _drop_unnamed(connection, row[0])
+        return True
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List, show and delete saved planning scenarios")
+    parser.add_argument('--store', default=DEFAULT_SCENARIO_STORE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Saved scenarios, most recent first")
+    show = commands.add_parser('show', help="Plan and headline results of one scenario")
+    show.add_argument('name')
+    delete = commands.add_parser('delete', help="Remove a saved scenario name")
+    delete.add_argument('name')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        print(json.dumps(list_scenarios(args.store), indent=2))
+        return 0
+
+    if args.command == 'delete':
+        if not delete_scenario(args.name, args.store):
+            parser.error(f"No saved scenario named '{args.name}'")
+        return 0
+
+    scenario = load_scenario(args.name, args.store)
+    if scenario is None:
+        parser.error(f"No saved scenario named '{args.name}'")
+    results = scenario['results']
+    print(json.dumps({
+        'name': scenario['name'],
+        'content_hash': scenario['content_hash'],
+        'saved_at': scenario['saved_at'],
+        'plan': scenario['plan'],
+        'target_infrastructure_cost': results['target_tco']['total_infrastructure_cost'],
+        'target_fte': results['target_tco']['workforce_requirements']['total_fte'],
+        'automation_maturity': results['metrics']['automation_maturity'],
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
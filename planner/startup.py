@@ -0,0 +1,123 @@
+"""Cold-start profiling for the planning page.
+
+With ``SQLAO_PROFILE_STARTUP=1`` the page times its phases (imports, pricing
+setup, pipeline evaluation, rendering) on every run and shows them against
+``STARTUP_BUDGET_MS`` in a sidebar panel. The first run in a fresh process
+is the cold start; later runs find their modules already imported.
+
+``python -m planner.startup`` measures a cold start in a fresh interpreter
+(Streamlit import, then the first script run through Streamlit's app
+test harness) and exits non-zero when a phase is over budget, so the
+numbers can be tracked between releases:
+
+    python -m planner.startup --runs 3 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROFILE_ENV = 'SQLAO_PROFILE_STARTUP'
+PROFILE_STARTUP = os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes')
+DEFAULT_APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_app.py')
+
+# Cold-start targets in milliseconds; ``first_render`` is the whole first script run, imports included
+STARTUP_BUDGET_MS = {
+    'streamlit_import': 1000,
+    'imports': 1000,
+    'first_render': 3000,
+}
+
+
+class StartupProfile:
+    """Phase timings for one script run, measured from ``started`` (a ``time.perf_counter`` value)"""
+
+    def __init__(self, started, modules_at_start, cold):
+        self.started = started
+        self.modules_at_start = modules_at_start
+        self.cold = cold
+        self.phases = {}
+        self._last = started
+
+    def mark(self, phase):
+        """Close ``phase``: the time since the previous mark (or the start)"""
+
+        now = time.perf_counter()
+        self.phases[phase] = (now - self._last) * 1000
+        self._last = now
+
+    def report(self, budget=None):
+        """Phase and total timings with each budgeted total's status"""
+
+        budget = STARTUP_BUDGET_MS if budget is None else budget
+        totals = {'imports': self.phases.get('imports', 0.0), 'first_render': (self._last - self.started) * 1000}
+        return {
+            'cold': self.cold,
+            'modules_loaded': len(sys.modules) - self.modules_at_start,
+            'phases': dict(self.phases),
+            'totals': totals,
+            'budget': {name: budget[name] for name in totals if name in budget},
+            'over_budget': sorted(name for name, value in totals.items() if name in budget and value > budget[name]),
+        }
+
+
+# Run in a fresh interpreter: the Streamlit import as a server would pay it, then one script run
+_MEASURE_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+import streamlit
+streamlit_import = (time.perf_counter() - started) * 1000
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+app.run()
+if app.exception:
+    raise SystemExit(f"App raised: {app.exception[0].message}")
+report = app.session_state['startup_profile']
+report['totals'] = {'streamlit_import': streamlit_import, **report['totals']}
+print(json.dumps(report))
+"""
+
+
+def measure_cold_start(app_path=DEFAULT_APP_PATH):
+    """Startup profile report of one cold start of the page, in a fresh interpreter"""
+
+    env = {**os.environ, PROFILE_ENV: '1'}
+    result = subprocess.run([sys.executable, '-c', _MEASURE_SCRIPT, app_path], capture_output=True, text=True,
+                            env=env, cwd=os.path.dirname(os.path.abspath(app_path)))
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start measurement failed:\n{result.stderr.strip() or result.stdout.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the planning page's cold start against its time budget")
+    parser.add_argument('--app', default=DEFAULT_APP_PATH)
+    parser.add_argument('--runs', type=int, default=1, help="Cold starts to measure; the median of each phase counts")
+    parser.add_argument('--json', action='store_true', help="Print the full reports as JSON")
+    for name, limit in STARTUP_BUDGET_MS.items():
+        parser.add_argument(f"--budget-{name.replace('_', '-')}", type=float, default=limit, dest=name,
+                            help=f"Budget for {name} in ms (default: {limit})")
+    args = parser.parse_args(argv)
+
+    reports = [measure_cold_start(args.app) for _ in range(max(1, args.runs))]
+    budget = {name: getattr(args, name) for name in STARTUP_BUDGET_MS}
+    totals = {name: sorted(report['totals'][name] for report in reports)[len(reports) // 2] for name in budget}
+    phases = {phase: sorted(report['phases'][phase] for report in reports)[len(reports) // 2]
+              for phase in reports[0]['phases']}
+    over_budget = [name for name, value in totals.items() if value > budget[name]]
+
+    if args.json:
+        print(json.dumps({'totals': totals, 'phases': phases, 'budget': budget, 'over_budget': over_budget,
+                          'runs': reports}, indent=2))
+    else:
+        for name, value in totals.items():
+            print(f"{name:<18} {value:8.0f} ms  (budget {budget[name]:.0f} ms){'  OVER' if name in over_budget else ''}")
+        print("phases: " + ", ".join(f"{phase} {value:.0f} ms" for phase, value in phases.items()))
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Performance-aware EBS storage model for SQL Server data, log and tempdb volumes.
+
+Each volume is sized from its capacity, IOPS and throughput requirement on
+every EBS volume type: gp3 pays for IOPS and MB/s above its baseline, gp2
+buys IOPS and throughput with capacity, io1/io2 bill provisioned IOPS (io2 in
+tiers). Requirements beyond one volume's limits are striped across equal
+volumes. Every step is a NumPy column operation, so a whole fleet of volumes
+is priced and the cheapest type picked per volume in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .defaults import EBS_VOLUME_TYPES
+from .price_index import as_price_index
+from .pricing import EBS_PERFORMANCE_PRICING
+
+# Per-volume limits: capacity (GiB), IOPS and MB/s, plus how IOPS and throughput relate to capacity
+EBS_VOLUME_LIMITS = {
+    'gp3': {'min_gb': 1, 'max_gb': 16384, 'max_iops': 16000, 'max_throughput': 1000,
+            'iops_per_gb': 500, 'throughput_per_iops': 0.25, 'baseline_iops': 3000, 'baseline_throughput': 125},
+    'gp2': {'min_gb': 1, 'max_gb': 16384, 'max_iops': 16000, 'max_throughput': 250,
+            'iops_per_gb': 3, 'min_iops': 100, 'full_throughput_gb': 334, 'small_volume_throughput': 128},
+    'io1': {'min_gb': 4, 'max_gb': 16384, 'max_iops': 64000, 'max_throughput': 1000,
+            'iops_per_gb': 50, 'throughput_per_iops': 0.25, 'min_iops': 100},
+    'io2': {'min_gb': 4, 'max_gb': 65536, 'max_iops': 256000, 'max_throughput': 4000,
+            'iops_per_gb': 1000, 'throughput_per_iops': 0.25, 'min_iops': 100},
+}
+
+# Share of an instance's capacity, IOPS and throughput that lands on each SQL Server volume
+STORAGE_LAYOUT = {
+    'data': {'size': 0.75, 'iops': 0.60, 'throughput': 0.50},
+    'log': {'size': 0.15, 'iops': 0.25, 'throughput': 0.20},
+    'tempdb': {'size': 0.10, 'iops': 0.15, 'throughput': 0.30},
+}
+
+
+def _tier_rates(default_tiers, catalog_rows):
+    """Default tier breakpoints with rates from the catalog when it lists the same number of tiers"""
+
+    if len(catalog_rows) != len(default_tiers):
+        return default_tiers
+    return [(begin, end, rate) for (begin, end, _), rate in zip(default_tiers, catalog_rows)]
+
+
+def ebs_performance_rates(prices=None, region=None):
+    """IOPS / throughput tiers per volume type, from the price index's catalog tiers where present"""
+
+    prices = as_price_index(prices)
+    catalog = prices.ebs_tiers.get(region or prices.default_region, {})
+    rates = {}
+    for volume_type, default in EBS_PERFORMANCE_PRICING.items():
+        dimensions = catalog.get(volume_type, {})
+        iops_rows = [price for name in sorted(dimensions) if name.startswith('iops')
+                     for _, _, price, _ in dimensions[name]]
+        throughput_rows = [price / 1024 if 'GiB' in unit else price
+                           for name in sorted(dimensions) if name.startswith('throughput')
+                           for _, _, price, unit in dimensions[name]]
+        rates[volume_type] = {
+            'iops': _tier_rates(default['iops'], iops_rows),
+            'throughput': _tier_rates(default['throughput'], throughput_rows),
+        }
+    return rates
+
+
+def _tiered_cost(amount, tiers):
+    cost = np.zeros_like(amount, dtype=float)
+    for begin, end, rate in tiers:
+        upper = np.inf if end is None else end
+        cost += rate * np.clip(np.minimum(amount, upper) - begin, 0, None)
+    return cost
+
+
+def price_volumes(volume_type, size_gb, iops, throughput_mbps, gb_rate, performance_rates):
+    """Cheapest configuration of one volume type for every requirement row.
+
+    Returns a dict of columns: ``volumes`` (stripe count), per-volume
+    ``size_gb`` / ``iops`` / ``throughput_mbps`` as provisioned, and
+    ``monthly`` for all stripes together.
+    """
+
+    limits = EBS_VOLUME_LIMITS[volume_type]
+    size_gb = np.asarray(size_gb, dtype=float)
+    iops = np.asarray(iops, dtype=float)
+    throughput_mbps = np.asarray(throughput_mbps, dtype=float)
+
+    volumes = np.maximum.reduce([
+        np.ones_like(size_gb),
+        np.ceil(size_gb / limits['max_gb']),
+        np.ceil(iops / limits['max_iops']),
+        np.ceil(throughput_mbps / limits['max_throughput']),
+    ])
+    size, need_iops, need_throughput = size_gb / volumes, iops / volumes, throughput_mbps / volumes
+
+    if volume_type == 'gp2':
+        # IOPS come from capacity (3 per GiB); full throughput needs a large enough volume
+        size = np.maximum.reduce([size, np.full_like(size, limits['min_gb']), need_iops / limits['iops_per_gb'],
+                                  np.where(need_throughput > limits['small_volume_throughput'],
+                                           limits['full_throughput_gb'], 0)])
+        provisioned_iops = np.clip(np.ceil(size) * limits['iops_per_gb'], limits['min_iops'], limits['max_iops'])
+        provisioned_throughput = np.where(size >= limits['full_throughput_gb'], limits['max_throughput'],
+                                          limits['small_volume_throughput'])
+    else:
+        floor_iops = limits.get('baseline_iops', limits.get('min_iops', 0))
+        provisioned_iops = np.ceil(np.maximum.reduce([
+            need_iops, np.full_like(need_iops, floor_iops), need_throughput / limits['throughput_per_iops']
+        ]))
+        provisioned_throughput = np.maximum(need_throughput, limits.get('baseline_throughput', 0))
+        size = np.maximum.reduce([size, np.full_like(size, limits['min_gb']),
+                                  provisioned_iops / limits['iops_per_gb']])
+        if volume_type != 'gp3':
+            provisioned_throughput = np.minimum(provisioned_iops * limits['throughput_per_iops'],
+                                                limits['max_throughput'])
+
+    size = np.ceil(size)
+    per_volume = size * gb_rate
+    per_volume = per_volume + _tiered_cost(provisioned_iops, performance_rates['iops'])
+    if volume_type == 'gp3':
+        per_volume = per_volume + _tiered_cost(provisioned_throughput, performance_rates['throughput'])
+
+    return {
+        'volumes': volumes.astype(np.int64),
+        'size_gb': size,
+        'iops': provisioned_iops,
+        'throughput_mbps': provisioned_throughput,
+        'monthly': per_volume * volumes,
+    }
+
+
+def cheapest_volumes(size_gb, iops, throughput_mbps, prices=None, regions=None, volume_types=EBS_VOLUME_TYPES):
+    """Cheapest volume type and configuration for every requirement row (one row per volume)"""
+
+    prices = as_price_index(prices)
+    size_gb, iops, throughput_mbps = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float))
+                                                         for value in (size_gb, iops, throughput_mbps)))
+    rows = len(size_gb)
+    regions = np.full(rows, prices.default_region, dtype=object) if regions is None else \
+        np.broadcast_to(np.asarray(regions, dtype=object), size_gb.shape)
+
+    columns = ('volumes', 'size_gb', 'iops', 'throughput_mbps', 'monthly')
+    options = {column: np.empty((len(volume_types), rows)) for column in columns}
+    for region in pd.unique(regions):
+        in_region = regions == region
+        performance = ebs_performance_rates(prices, region)
+        for position, volume_type in enumerate(volume_types):
+            priced = price_volumes(volume_type, size_gb[in_region], iops[in_region], throughput_mbps[in_region],
+                                   prices.ebs_rate(volume_type, region), performance[volume_type])
+            for column in columns:
+                options[column][position, in_region] = priced[column]
+
+    best = options['monthly'].argmin(axis=0)
+    pick = (best, np.arange(rows))
+    result = pd.DataFrame({column: options[column][pick] for column in columns})
+    result.insert(0, 'volume_type', np.asarray(volume_types, dtype=object)[best])
+    result['volumes'] = result['volumes'].astype(np.int64)
+    return result
+
+
+def size_sql_storage(storage_gb, iops, throughput_mbps, prices=None, regions=None, layout=None,
+                     volume_types=EBS_VOLUME_TYPES):
+    """Split each instance's requirement into data / log / tempdb volumes and price the cheapest of each.
+
+    Inputs are per-instance columns (or scalars). Returns one row per instance
+    with ``{volume}_type``, ``{volume}_volumes``, ``{volume}_size_gb``,
+    ``{volume}_iops``, ``{volume}_throughput_mbps`` and ``{volume}_monthly``
+    per SQL Server volume, plus ``storage_monthly``.
+    """
+
+    layout = layout or STORAGE_LAYOUT
+    storage_gb, iops, throughput_mbps = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float))
+                                                            for value in (storage_gb, iops, throughput_mbps)))
+    rows = len(storage_gb)
+    if regions is not None:
+        regions = np.broadcast_to(np.asarray(regions, dtype=object), storage_gb.shape)
+
+    # All volumes of every instance priced together: (volume role, instance) flattened
+    shares = np.array([[share['size'], share['iops'], share['throughput']] for share in layout.values()])
+    sized = cheapest_volumes(
+        (shares[:, 0:1] * storage_gb).ravel(), (shares[:, 1:2] * iops).ravel(),
+        (shares[:, 2:3] * throughput_mbps).ravel(), prices,
+        None if regions is None else np.tile(regions, len(layout)), volume_types
+    )
+
+    result = pd.DataFrame(index=range(rows))
+    for position, volume in enumerate(layout):
+        part = sized.iloc[position * rows:(position + 1) * rows].reset_index(drop=True)
+        result[f'{volume}_type'] = part['volume_type']
+        for column in ('volumes', 'size_gb', 'iops', 'throughput_mbps', 'monthly'):
+            result[f'{volume}_{column}'] = part[column]
+    result['storage_monthly'] = sum(result[f'{volume}_monthly'] for volume in layout)
+    return result
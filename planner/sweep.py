@@ -0,0 +1,201 @@
+"""Configuration sweep with a cost / FTE / availability Pareto frontier.
+
+The sweep enumerates every combination of the sidebar's infrastructure
+choices for the target footprint and prices them with the vectorized
+portfolio costing. Large grids are split into chunks and evaluated on a
+process pool; the compiled price index is shipped to each worker once.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .defaults import ALWAYSON_CLUSTER, BYOL, EBS_VOLUME_TYPES, LICENSING_MODELS, SQL_EDITIONS
+from .forecast import skills_requirements_array
+from .portfolio import calculate_portfolio_costs
+from .price_index import as_price_index
+from .pricing import BYOL_ANNUAL_PER_CORE
+
+# Availability model: EC2 instance-level SLA per replica with a beta-factor common-cause share
+# (failures that take every replica down together), so extra replicas have diminishing returns.
+# Monitoring and 24x7 coverage shorten detection and repair, so they scale the remaining downtime.
+INSTANCE_AVAILABILITY_PCT = 99.5
+COMMON_CAUSE_FRACTION = 0.02
+DATADOG_DOWNTIME_FACTOR = 0.8
+SUPPORT_24X7_DOWNTIME_FACTOR = 0.6
+BYOL_CORES_PER_INSTANCE = 4
+
+# Measured on the default AlwaysOn grid (19,584 rows): about 4 us per row in-process, and about
+# 0.12 s to fork a pool and ship the price index to it (more where workers are spawned). The pool
+# only pays off once the rows it takes off this process save more than its startup.
+ROW_SECONDS = 4e-6
+POOL_STARTUP_SECONDS = 0.12
+CHUNK_SIZE = 10_000
+
+SWEEP_AXES = ('instance_type', 'sql_edition', 'licensing_model', 'ebs_volume_type', 'ec2_per_cluster',
+              'enable_datadog', 'support_24x7')
+
+
+def default_sweep_axes(plan, prices=None):
+    """Every sidebar choice for the plan's deployment type and region"""
+
+    prices = as_price_index(prices)
+    alwayson = plan['deployment_type'] == ALWAYSON_CLUSTER
+    # With IOPS / throughput requirements the storage model picks each volume's type itself
+    sized_storage = bool(plan.get('storage_iops') or plan.get('storage_throughput_mbps'))
+    return {
+        'instance_type': prices.priced_instance_types(plan.get('region')),
+        'sql_edition': SQL_EDITIONS,
+        'licensing_model': LICENSING_MODELS,
+        'ebs_volume_type': [plan['ebs_volume_type']] if sized_storage else EBS_VOLUME_TYPES,
+        'ec2_per_cluster': [2, 3, 4, 5] if alwayson else [1],
+        'enable_datadog': [False, True],
+        'support_24x7': [False, True],
+    }
+
+
+def configuration_grid(axes):
+    """Cartesian product of the sweep axes as a DataFrame (one row per configuration)"""
+
+    columns = [axis for axis in SWEEP_AXES if axis in axes]
+    return pd.DataFrame(list(itertools.product(*(axes[axis] for axis in columns))), columns=columns)
+
+
+def estimate_availability(ec2_per_cluster, deployment_type, enable_datadog, support_24x7):
+    """Estimated service availability (%) for whole columns of configurations"""
+
+    replicas = np.where(np.asarray(deployment_type) == ALWAYSON_CLUSTER, np.asarray(ec2_per_cluster), 1)
+    instance_downtime = 1 - INSTANCE_AVAILABILITY_PCT / 100
+    downtime = np.where(
+        replicas > 1,
+        COMMON_CAUSE_FRACTION * instance_downtime + (1 - COMMON_CAUSE_FRACTION) * instance_downtime ** replicas,
+        instance_downtime
+    )
+    downtime = downtime * np.where(np.asarray(enable_datadog, dtype=bool), DATADOG_DOWNTIME_FACTOR, 1.0)
+    downtime = downtime * np.where(np.asarray(support_24x7, dtype=bool), SUPPORT_24X7_DOWNTIME_FACTOR, 1.0)
+    return 100 * (1 - downtime)
+
+
+def evaluate_configurations(grid, plan, automation_level, pricing_data=None, config_params=None,
+                            include_byol_estimate=True):
+    """Monthly cost, TCO, FTE and availability for every configuration row"""
+
+    prices = as_price_index(pricing_data)
+    groups = grid.assign(
+        clusters=plan['target_clusters'],
+        storage_tb=plan['current_storage_tb'],
+        storage_iops=plan.get('storage_iops') or 0,
+        storage_throughput_mbps=plan.get('storage_throughput_mbps') or 0,
+        enable_ssm_patching=plan['enable_ssm_patching'],
+        deployment_type=plan['deployment_type'],
+        region=plan.get('region') or prices.default_region,
+    )
+    results = calculate_portfolio_costs(groups, prices)
+
+    # External BYOL licences are not on the AWS bill but decide whether BYOL is actually cheaper
+    byol_monthly = np.zeros(len(results))
+    if include_byol_estimate:
+        byol = (results['licensing_model'] == BYOL).to_numpy()
+        per_core = results['sql_edition'].map(BYOL_ANNUAL_PER_CORE).fillna(BYOL_ANNUAL_PER_CORE['Web']).to_numpy()
+        byol_monthly = np.where(byol, per_core * BYOL_CORES_PER_INSTANCE * results['total_instances'] / 12, 0.0)
+    results['byol_license_monthly'] = byol_monthly
+    results['effective_monthly'] = results['total_monthly'] + byol_monthly
+    results['total_cost'] = results['effective_monthly'] * plan['timeframe']
+
+    skills = skills_requirements_array(plan['target_clusters'], automation_level,
+                                       results['support_24x7'].to_numpy(), config_params)
+    results['total_fte'] = sum(skills.values())
+    results['availability_pct'] = estimate_availability(
+        results['ec2_per_cluster'], results['deployment_type'], results['enable_datadog'], results['support_24x7']
+    )
+    return results
+
+
+_worker_state = {}
+
+
+def _init_worker(plan, automation_level, prices, config_params, include_byol_estimate):
+    _worker_state.update(plan=plan, automation_level=automation_level, prices=prices,
+                         config_params=config_params, include_byol_estimate=include_byol_estimate)
+
+
+def parallel_threshold(workers):
+    """Smallest grid that ``workers`` processes evaluate faster than one (about 60k rows for 2)"""
+
+    if workers < 2:
+        return np.inf
+    return int(POOL_STARTUP_SECONDS / (ROW_SECONDS * (1 - 1 / workers))) + 1
+
+
+def _evaluate_chunk(chunk):
+    state = _worker_state
+    return evaluate_configurations(chunk, state['plan'], state['automation_level'], state['prices'],
+                                   state['config_params'], state['include_byol_estimate'])
+
+
+def sweep_configurations(plan, automation_level, pricing_data=None, config_params=None, axes=None,
+                         workers=None, chunk_size=CHUNK_SIZE, include_byol_estimate=True):
+    """Evaluate the full configuration grid and flag the Pareto frontier.
+
+    ``axes`` overrides entries of ``default_sweep_axes``. ``workers`` defaults
+    to the CPU count; grids below ``parallel_threshold(workers)`` rows, which
+    includes the default grids, run in-process.
+    """
+
+    prices = as_price_index(pricing_data)
+    grid = configuration_grid({**default_sweep_axes(plan, prices), **(axes or {})})
+    workers = workers or os.cpu_count() or 1
+
+    if len(grid) >= parallel_threshold(workers):
+        chunks = [grid.iloc[start:start + chunk_size] for start in range(0, len(grid), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(plan, automation_level, prices, config_params,
+                                           include_byol_estimate)) as pool:
+            results = pd.concat(pool.map(_evaluate_chunk, chunks), ignore_index=True)
+    else:
+        results = evaluate_configurations(grid, plan, automation_level, prices, config_params,
+                                          include_byol_estimate)
+
+    results['pareto'] = pareto_frontier(results['total_cost'], results['total_fte'], results['availability_pct'])
+    results['meets_target'] = results['availability_pct'] >= plan['availability_target']
+    return results
+
+
+def pareto_frontier(cost, fte, availability):
+    """Mask of configurations not dominated on (lower cost, lower FTE, higher availability).
+
+    FTE and availability take few distinct values across a grid, so dominance
+    is decided per distinct (FTE, availability) pair: a configuration is
+    dominated when a pair at least as good on both has a cheaper option, or a
+    strictly better pair has one at the same cost.
+    """
+
+    cost = np.asarray(cost, dtype=float)
+    pairs, inverse = np.unique(np.column_stack([fte, availability]).astype(float), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    pair_min_cost = np.full(len(pairs), np.inf)
+    np.minimum.at(pair_min_cost, inverse, cost)
+
+    # weakly_better[i, j]: pair j has no more FTE and no less availability than pair i
+    weakly_better = (pairs[None, :, 0] <= pairs[:, None, 0]) & (pairs[None, :, 1] >= pairs[:, None, 1])
+    strictly_better = weakly_better & ~np.eye(len(pairs), dtype=bool)
+    cheapest_weak = np.where(weakly_better, pair_min_cost[None, :], np.inf).min(axis=1)
+    cheapest_strict = np.where(strictly_better, pair_min_cost[None, :], np.inf).min(axis=1)
+
+    dominated = (cheapest_weak[inverse] < cost) | (cheapest_strict[inverse] <= cost)
+    return ~dominated
+
+
+def cheapest_meeting_target(results, availability_target=None):
+    """Cheapest configuration whose estimated availability meets the target, or None"""
+
+    feasible = results[results['meets_target']] if availability_target is None else \
+        results[results['availability_pct'] >= availability_target]
+    if feasible.empty:
+        return None
+    return feasible.sort_values(['total_cost', 'total_fte', 'availability_pct'],
+                                ascending=[True, True, False]).iloc[0]
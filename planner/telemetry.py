@@ -0,0 +1,317 @@
+"""Streaming workload telemetry ingestion for right-sizing.
+
+Perfmon / DMV exports (one row per server per sample) are read in chunks and
+folded into per-server quantile sketches, so memory depends on the number of
+servers and the value range, never on the number of rows. Each sketch is a
+DDSketch-style histogram over logarithmic buckets: every quantile it reports
+is within ``relative_accuracy`` of the exact value, and sketches from
+different files simply add.
+
+    python -m planner.telemetry perfmon_2025_*.csv --out server_stats.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .defaults import STANDALONE_SQL_SERVER
+from .portfolio import COST_COLUMNS, calculate_portfolio_costs, portfolio_rollup
+from .price_index import as_price_index
+from .rightsizing import rightsize_servers
+
+TELEMETRY_METRICS = ('cpu_pct', 'memory_gb', 'iops', 'throughput_mbps')
+QUANTILES = {'p95': 0.95, 'p99': 0.99}
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_TRACKED_VALUE = 1e-2  # smaller samples are counted as zero
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+class QuantileSketches:
+    """Log-bucket quantile sketches for many streams (servers) of one metric"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+
+        self.offset = 0  # bucket key of column 0
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.zero_counts = np.zeros(0, dtype=np.int64)
+        self.totals = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0)
+        self.maxima = np.zeros(0)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def _resize(self, streams, low_key, high_key):
+        """Grow to ``streams`` rows and a bucket range covering ``low_key..high_key``"""
+
+        width = self.counts.shape[1]
+        if width:
+            low_key, high_key = min(low_key, self.offset), max(high_key, self.offset + width - 1)
+        new_width = high_key - low_key + 1
+        grow = streams - len(self)
+        if grow <= 0 and low_key == self.offset and new_width == width:
+            return
+
+        counts = np.zeros((max(streams, len(self)), new_width), dtype=np.int64)
+        start = self.offset - low_key
+        counts[:len(self), start:start + width] = self.counts
+        self.counts = counts
+        self.offset = low_key
+        if grow > 0:
+            self.zero_counts = np.concatenate([self.zero_counts, np.zeros(grow, dtype=np.int64)])
+            self.totals = np.concatenate([self.totals, np.zeros(grow, dtype=np.int64)])
+            self.sums = np.concatenate([self.sums, np.zeros(grow)])
+            self.maxima = np.concatenate([self.maxima, np.full(grow, -np.inf)])
+
+    def add(self, streams, values):
+        """Fold ``values`` into the sketches of the matching ``streams`` codes; NaNs are skipped"""
+
+        streams = np.asarray(streams, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values)
+        streams, values = streams[keep], values[keep]
+        if not len(values):
+            return
+
+        tracked = values >= MIN_TRACKED_VALUE
+        keys = np.ceil(np.log(values[tracked]) / self._log_gamma).astype(np.int64)
+        if len(keys):
+            self._resize(int(streams.max()) + 1, int(keys.min()), int(keys.max()))
+        else:
+            self._resize(int(streams.max()) + 1, self.offset, self.offset + max(self.counts.shape[1], 1) - 1)
+
+        rows, width = self.counts.shape
+        flat = streams[tracked] * width + (keys - self.offset)
+        self.counts += np.bincount(flat, minlength=rows * width).reshape(rows, width)
+        self.zero_counts += np.bincount(streams[~tracked], minlength=rows)
+        self.totals += np.bincount(streams, minlength=rows)
+        self.sums += np.bincount(streams, weights=values, minlength=rows)
+        np.maximum.at(self.maxima, streams, values)
+
+    def merge(self, other):
+        """Add another sketch set with the same accuracy and stream codes"""
+
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not len(other):
+            return
+        other_width = max(other.counts.shape[1], 1)
+        self._resize(len(other), other.offset, other.offset + other_width - 1)
+        start = other.offset - self.offset
+        self.counts[:len(other), start:start + other.counts.shape[1]] += other.counts
+        self.zero_counts[:len(other)] += other.zero_counts
+        self.totals[:len(other)] += other.totals
+        self.sums[:len(other)] += other.sums
+        self.maxima[:len(other)] = np.maximum(self.maxima[:len(other)], other.maxima)
+
+    def quantiles(self, quantiles):
+        """(streams, len(quantiles)) array of estimated quantiles; NaN for empty streams"""
+
+        quantiles = np.asarray(quantiles, dtype=float)
+        cumulative = np.cumsum(self.counts, axis=1) + self.zero_counts[:, None]
+        ranks = quantiles[None, :] * (self.totals[:, None] - 1)
+
+        result = np.empty((len(self), len(quantiles)))
+        for column, rank in enumerate(ranks.T):
+            bucket = (cumulative > rank[:, None]).argmax(axis=1)
+            # Bucket midpoint in relative terms: within relative_accuracy of every value in the bucket
+            estimate = 2 * self.gamma ** (bucket + self.offset) / (self.gamma + 1)
+            estimate = np.where(rank < self.zero_counts, 0.0, np.minimum(estimate, self.maxima))
+            result[:, column] = np.where(self.totals > 0, estimate, np.nan)
+        return result
+
+    def means(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.totals > 0, self.sums / self.totals, np.nan)
+
+    def peaks(self):
+        return np.where(self.totals > 0, self.maxima, np.nan)
+
+
+class TelemetryAggregator:
+    """Per-server P95 / P99 / peak / mean for every telemetry metric, fed one chunk at a time"""
+
+    def __init__(self, metrics=TELEMETRY_METRICS, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.metrics = tuple(metrics)
+        self.sketches = {metric: QuantileSketches(relative_accuracy) for metric in self.metrics}
+        self.servers = pd.Index([], dtype=object)
+        self.vcpu = np.zeros(0)
+        self.rows = 0
+
+    def _server_codes(self, servers):
+        # Factorize the chunk first so only its distinct names hit the global index
+        local_codes, names = pd.factorize(servers.astype(str))
+        names = pd.Index(names)
+        new = names.difference(self.servers)
+        if len(new):
+            self.servers = self.servers.append(new)
+            self.vcpu = np.concatenate([self.vcpu, np.full(len(new), np.nan)])
+        return self.servers.get_indexer(names)[local_codes]
+
+    def add_chunk(self, frame):
+        """Fold one DataFrame chunk with a ``server`` column and any of the metric columns"""
+
+        if 'server' not in frame:
+            raise ValueError("Telemetry needs a 'server' column")
+        codes = self._server_codes(frame['server'])
+        for metric in self.metrics:
+            if metric in frame:
+                self.sketches[metric].add(codes, pd.to_numeric(frame[metric], errors='coerce').to_numpy(dtype=float))
+        if 'vcpu' in frame:
+            # Provisioned vCPU per server; the largest value seen wins
+            vcpu = pd.to_numeric(frame['vcpu'], errors='coerce').to_numpy(dtype=float)
+            np.fmax.at(self.vcpu, codes, vcpu)
+        self.rows += len(frame)
+
+    def statistics(self):
+        """DataFrame indexed by server with sample count, provisioned vCPU and per-metric statistics"""
+
+        stats = pd.DataFrame(index=pd.Index(self.servers, name='server'))
+        stats['vcpu'] = self.vcpu
+        for metric, sketch in self.sketches.items():
+            if not len(sketch):
+                continue
+            size = len(self.servers)
+            pad = size - len(sketch)
+            quantiles = np.vstack([sketch.quantiles(list(QUANTILES.values())), np.full((pad, len(QUANTILES)), np.nan)])
+            for column, name in enumerate(QUANTILES):
+                stats[f'{metric}_{name}'] = quantiles[:, column]
+            stats[f'{metric}_peak'] = np.concatenate([sketch.peaks(), np.full(pad, np.nan)])
+            stats[f'{metric}_mean'] = np.concatenate([sketch.means(), np.full(pad, np.nan)])
+            stats[f'{metric}_samples'] = np.concatenate([sketch.totals, np.zeros(pad, dtype=np.int64)])
+        return stats
+
+
+def iter_telemetry_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS, column_map=None):
+    """Yield DataFrame chunks from a CSV or Parquet path (or an uploaded file object).
+
+    ``column_map`` renames source columns to ``server`` / ``vcpu`` / the
+    metric names. Parquet needs pyarrow.
+    """
+
+    name = getattr(source, 'name', source)
+    if str(name).lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas().rename(columns=column_map or {})
+    else:
+        for chunk in pd.read_csv(source, chunksize=chunk_rows):
+            yield chunk.rename(columns=column_map or {})
+
+
+def ingest_telemetry(sources, chunk_rows=DEFAULT_CHUNK_ROWS, column_map=None,
+                     relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Stream every source through one aggregator and return the per-server statistics"""
+
+    aggregator = TelemetryAggregator(relative_accuracy=relative_accuracy)
+    for source in sources:
+        for chunk in iter_telemetry_chunks(source, chunk_rows, column_map):
+            aggregator.add_chunk(chunk)
+    return aggregator.statistics()
+
+
+def sizing_requirements(stats, statistic='p95', default_vcpu=None):
+    """Per-server sizing requirements from telemetry statistics.
+
+    CPU need is the provisioned vCPU (the ``vcpu`` column, else
+    ``default_vcpu``) times the ``statistic`` CPU utilization. Throughput in
+    MB/s becomes EBS bandwidth in Mbps; IOPS and MB/s are carried along for
+    the storage model.
+    """
+
+    vcpu = stats['vcpu'] if 'vcpu' in stats else pd.Series(np.nan, index=stats.index)
+    if default_vcpu is not None:
+        vcpu = vcpu.fillna(default_vcpu)
+    if vcpu.isna().any():
+        missing = ', '.join(map(str, vcpu.index[vcpu.isna()][:5]))
+        raise ValueError(f"Provisioned vCPU unknown for {missing}; add a 'vcpu' column or pass default_vcpu")
+
+    def column(metric):
+        name = f'{metric}_{statistic}'
+        return stats[name].fillna(0.0) if name in stats else pd.Series(0.0, index=stats.index)
+
+    return pd.DataFrame({
+        'vcpu': np.maximum(1, np.ceil(vcpu * column('cpu_pct') / 100)),
+        'memory_gib': column('memory_gb'),
+        'ebs_bandwidth_mbps': column('throughput_mbps') * 8,
+        'iops': column('iops'),
+        'throughput_mbps': column('throughput_mbps'),
+    }, index=stats.index)
+
+
+def rightsize_from_telemetry(stats, plan, prices=None, statistic='p95', headroom=0.2, default_vcpu=None, specs=None):
+    """Size every server in ``stats`` for the plan's SQL edition, licensing model and region"""
+
+    requirements = sizing_requirements(stats, statistic, default_vcpu).assign(
+        sql_edition=plan['sql_edition'], licensing_model=plan['licensing_model'], region=plan.get('region'),
+    )
+    requirements[['iops', 'throughput_mbps']] *= 1 + headroom
+    sized = rightsize_servers(requirements.reset_index(), prices, specs, headroom)
+    return sized.set_index('server')
+
+
+def estate_infrastructure_costs(sized, plan, pricing_data=None):
+    """Monthly infrastructure cost of a right-sized estate, one instance per server.
+
+    Each server is priced as a standalone instance on its recommended type,
+    with data, log and tempdb volumes sized from its own IOPS and throughput,
+    then rolled up by instance type. Servers with no qualifying instance are
+    counted in the ``unsized`` row.
+    """
+
+    prices = as_price_index(pricing_data)
+    placed = sized[sized['recommended_instance_type'].notna()]
+    estate = pd.DataFrame(columns=['instance_type', 'servers', *COST_COLUMNS, 'total_instances'])
+    if len(placed):
+        servers = pd.DataFrame({
+            'clusters': 1,
+            'instance_type': placed['recommended_instance_type'].to_numpy(),
+            'storage_tb': plan['current_storage_tb'],
+            'ebs_volume_type': plan['ebs_volume_type'],
+            'storage_iops': placed['iops'].to_numpy(),
+            'storage_throughput_mbps': placed['throughput_mbps'].to_numpy(),
+            'enable_ssm_patching': plan['enable_ssm_patching'],
+            'sql_edition': plan['sql_edition'],
+            'licensing_model': plan['licensing_model'],
+            'enable_datadog': plan['enable_datadog'],
+            'deployment_type': STANDALONE_SQL_SERVER,
+            'region': plan.get('region') or prices.default_region,
+        })
+        costs = calculate_portfolio_costs(servers, prices)
+        estate = portfolio_rollup(costs, 'instance_type').rename(columns={'clusters': 'servers'})
+        estate = estate[['instance_type', 'servers', *COST_COLUMNS, 'total_instances']]
+
+    unsized = int(sized['recommended_instance_type'].isna().sum())
+    if unsized:
+        estate.loc[len(estate)] = {'instance_type': 'unsized', 'servers': unsized}
+    return estate.sort_values('total_monthly', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize workload telemetry into per-server sizing statistics")
+    parser.add_argument('sources', nargs='+', help="CSV or Parquet telemetry files")
+    parser.add_argument('--out', required=True, help="CSV file for the per-server statistics")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--relative-accuracy', type=float, default=DEFAULT_RELATIVE_ACCURACY)
+    args = parser.parse_args(argv)
+
+    missing = [source for source in args.sources if not os.path.exists(source)]
+    if missing:
+        parser.error(f"Telemetry file not found: {', '.join(missing)}")
+
+    stats = ingest_telemetry(args.sources, args.chunk_rows, relative_accuracy=args.relative_accuracy)
+    stats.to_csv(args.out)
+    print(f"{len(stats)} servers written to {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
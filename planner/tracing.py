@@ -0,0 +1,217 @@
+"""Timing spans for the planning engine and the page.
+
+``start_recording`` activates a ``SpanRecorder`` for the current context.
+While it is active, every ``@traced`` function (the engine's ``calculate_*``
+functions, price index loads, pipeline nodes) records a span under the
+span that called it, so one page rerun yields a tree of timings. The page
+also marks its rendered sections with ``section``. With no recorder active a
+traced call costs one context variable lookup.
+
+Recorded spans export as plain JSON records (``span_records``) or as
+OpenTelemetry OTLP/JSON ``resourceSpans`` (``otlp_json``) for log pipelines.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+
+SERVICE_NAME = 'sqlao-planner'
+TRACE_LOG_PATH = os.environ.get('SQLAO_TRACE_LOG')  # JSON lines of OTLP spans, one rerun per line
+
+_active = contextvars.ContextVar('planner_span_recorder', default=None)
+
+
+def _new_id(size):
+    return os.urandom(size).hex()
+
+
+class SpanRecorder:
+    """Spans of one trace (e.g. one page rerun) under a root span named ``name``"""
+
+    def __init__(self, name='rerun', **attributes):
+        self.trace_id = _new_id(16)
+        self.root = self._open(name, None, attributes)
+        self.spans = []
+        self._stack = [self.root]
+        self._section = None
+
+    def _open(self, name, parent, attributes):
+        return {
+            'name': name,
+            'span_id': _new_id(8),
+            'parent_id': parent['span_id'] if parent else None,
+            'start_ns': time.time_ns(),
+            'attributes': attributes,
+            '_started': time.perf_counter_ns(),
+        }
+
+    def _close(self, span):
+        span['duration_ns'] = time.perf_counter_ns() - span.pop('_started')
+        span['end_ns'] = span['start_ns'] + span['duration_ns']
+        self.spans.append(span)
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """Record the enclosed block as a child of the innermost open span"""
+
+        span = self._open(name, self._stack[-1], attributes)
+        self._stack.append(span)
+        try:
+            yield span
+        finally:
+            self._stack.remove(span)
+            self._close(span)
+
+    def section(self, name):
+        """Close the open section and open ``name``; sections are consecutive spans under the root"""
+
+        self.end_section()
+        self._section = self._open(name, self.root, {'section': True})
+        self._stack.insert(1, self._section)
+
+    def end_section(self):
+        if self._section is not None:
+            self._stack.remove(self._section)
+            self._close(self._section)
+            self._section = None
+
+    def finish(self):
+        """Close the open section and the root span"""
+
+        self.end_section()
+        if '_started' in self.root:
+            self._stack.remove(self.root)
+            self._close(self.root)
+        return self
+
+    @property
+    def duration_ms(self):
+        return self.root.get('duration_ns', 0) / 1e6
+
+
+def start_recording(name='rerun', **attributes):
+    """Activate a new recorder for the current context and return it"""
+
+    recorder = SpanRecorder(name, **attributes)
+    _active.set(recorder)
+    return recorder
+
+
+def stop_recording():
+    """Finish and deactivate the current recorder; returns it, or None when none was active"""
+
+    recorder = _active.get()
+    _active.set(None)
+    return recorder.finish() if recorder is not None else None
+
+
+def span(name, **attributes):
+    """Context manager recording a span when a recorder is active, otherwise doing nothing"""
+
+    recorder = _active.get()
+    return recorder.span(name, **attributes) if recorder is not None else contextlib.nullcontext()
+
+
+def section(name):
+    """Start the page section ``name`` on the active recorder, if any"""
+
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.section(name)
+
+
+def traced(func=None, *, name=None):
+    """Decorator recording each call of ``func`` as a span named after it while a recorder is active"""
+
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _active.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def _in_order(recorder):
+    """Root first, then by start time"""
+
+    return sorted(recorder.spans, key=lambda item: (item is not recorder.root, item['start_ns']))
+
+
+def span_records(recorder):
+    """Plain JSON-ready span records, root first, then in start order"""
+
+    return [{
+        'trace_id': recorder.trace_id,
+        'span_id': item['span_id'],
+        'parent_id': item['parent_id'],
+        'name': item['name'],
+        'start_ns': item['start_ns'],
+        'duration_ms': item['duration_ns'] / 1e6,
+        'attributes': item['attributes'],
+    } for item in _in_order(recorder)]
+
+
+def span_summary(recorder):
+    """Per span name: calls, total and self time in ms (self excludes child spans), slowest first"""
+
+    children = {}
+    for item in recorder.spans:
+        children[item['parent_id']] = children.get(item['parent_id'], 0) + item['duration_ns']
+
+    summary = {}
+    for item in recorder.spans:
+        entry = summary.setdefault(item['name'], {'name': item['name'], 'calls': 0, 'total_ms': 0.0, 'self_ms': 0.0})
+        entry['calls'] += 1
+        entry['total_ms'] += item['duration_ns'] / 1e6
+        entry['self_ms'] += (item['duration_ns'] - children.get(item['span_id'], 0)) / 1e6
+    return sorted(summary.values(), key=lambda entry: entry['total_ms'], reverse=True)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def otlp_json(recorders, service_name=SERVICE_NAME):
+    """OTLP/JSON ``resourceSpans`` document for one or more recorders"""
+
+    if isinstance(recorders, SpanRecorder):
+        recorders = [recorders]
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+        'scopeSpans': [{
+            'scope': {'name': __name__},
+            'spans': [{
+                'traceId': recorder.trace_id,
+                'spanId': item['span_id'],
+                **({'parentSpanId': item['parent_id']} if item['parent_id'] else {}),
+                'name': item['name'],
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(item['start_ns']),
+                'endTimeUnixNano': str(item['end_ns']),
+                'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in item['attributes'].items()],
+            } for recorder in recorders for item in _in_order(recorder)],
+        }],
+    }]}
+
+
+def append_trace_log(recorder, path=TRACE_LOG_PATH):
+    """Append the recorder's OTLP document as one JSON line"""
+
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(json.dumps(otlp_json(recorder), separators=(',', ':')) + '\n')
@@ -1,20 +1,85 @@
+import sys
+import time
+
+# Cold-start profiling starts before any heavy import (see planner.startup)
+script_started = time.perf_counter()
+modules_at_start = len(sys.modules)
+cold_start = 'planner' not in sys.modules
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime, timedelta
-import math
+import json
+import os
+import sqlite3
+
+from planner import (
+    OPERATIONS_ROLES,
+    calculate_enterprise_metrics,
+    calculate_governance_maturity,
+    calculate_skills_requirements,
+    calculate_sql_server_licensing_aws,
+    default_pricing,
+    default_state,
+    estimate_byol_annual_cost,
+)
+from planner.defaults import (
+    CONFIG_RANGES,
+    DEFAULT_PLAN,
+    DEFAULT_PORTFOLIO,
+    DEPLOYMENT_TYPES,
+    EBS_VOLUME_TYPES,
+    LICENSING_MODELS,
+    PLAN_RANGES,
+    SQL_EDITIONS,
+)
+from planner.comparison import MAX_COMPARED_SCENARIOS, compare_scenarios
+from planner.catalog import DEFAULT_CATALOG_PATH, catalog_regions, load_instance_specs
+from planner.charts import figure_payload, optimize_figure
+from planner.engine import data_transfer_rate
+from planner.export import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_bytes, export_chunks
+from planner.price_index import DEFAULT_REGION, MissingPriceError, PriceIndex, priced_edition
+from planner.pricing import BYOL_ANNUAL_PER_CORE
+from planner.optimizer import optimize_automation
+from planner.pipeline import SIMULATION_KEYS, planning_graph, portfolio_planning_graph
+from planner.portfolio import PORTFOLIO_COLUMNS, normalize_portfolio
+from planner.regions import RegionalPricing, catalog_loader, compare_regions, representative_loader
+from planner.rightsizing import InstanceSizer, default_instance_specs, merge_instance_specs
+from planner.scenarios import (
+    DEFAULT_SCENARIO_STORE_PATH,
+    SCENARIO_STATE_KEYS,
+    list_scenarios,
+    load_scenario,
+    load_scenarios,
+    save_scenario,
+    scenario_content,
+    scenario_hash,
+)
+from planner.simulation import DEFAULT_DISTRIBUTIONS, DEFAULT_SAMPLES, simulate_tco
+from planner.startup import PROFILE_STARTUP, STARTUP_BUDGET_MS, StartupProfile
+from planner.storage import STORAGE_LAYOUT
+from planner.sweep import cheapest_meeting_target, sweep_configurations
+from planner.telemetry import QUANTILES, estate_infrastructure_costs, ingest_telemetry, rightsize_from_telemetry
+from planner.tracing import (
+    TRACE_LOG_PATH,
+    append_trace_log,
+    otlp_json,
+    section,
+    span_records,
+    span_summary,
+    start_recording,
+    stop_recording,
+)
 
-# Optional AWS integration - gracefully handle if boto3 not installed
-try:
-    import boto3
-    import json
-    from decimal import Decimal
-    BOTO3_AVAILABLE = True
-except ImportError:
-    BOTO3_AVAILABLE = False
+startup_profile = StartupProfile(script_started, modules_at_start, cold_start)
+startup_profile.mark('imports')
+
+# Timing spans for the opt-in performance panel (and SQLAO_TRACE_LOG): one trace per rerun,
+# page sections as consecutive spans with the engine's calculate_* calls inside them
+stop_recording()  # A rerun cut short by st.stop() or an error leaves its recorder active
+if st.session_state.get('performance_panel') or TRACE_LOG_PATH:
+    start_recording('rerun')
+section("page setup")
 
 # Page configuration
 st.set_page_config(
@@ -162,294 +227,93 @@ New Features: BYOL Support | Datadog Monitoring ($1K/instance/year) | Enhanced C
 </div>
 ''', unsafe_allow_html=True)
 
-# Show AWS integration status
-if not BOTO3_AVAILABLE:
-    st.info("Real-time AWS pricing integration unavailable. Using current representative pricing data. To enable live pricing updates, install boto3 package and configure AWS credentials.")
-
-# AWS Pricing API Integration with Updated 2025 Pricing
-@st.cache_data(ttl=3600)
-def get_aws_pricing():
-    """Fetch real-time AWS pricing with current 2025 pricing data"""
-    
-    if not BOTO3_AVAILABLE:
-        return {
-            'ec2_windows': {
-                # Updated Windows EC2 pricing for 2025 (more realistic rates)
-                'm5.xlarge': 0.456, 'm5.2xlarge': 0.912, 'm5.4xlarge': 1.824, 'm5.8xlarge': 3.648,
-                'm5.12xlarge': 5.472, 'm5.16xlarge': 7.296, 'r5.xlarge': 0.584, 'r5.2xlarge': 1.168,
-                'r5.4xlarge': 2.336, 'r5.8xlarge': 4.672, 'r5.12xlarge': 7.008, 'r5.16xlarge': 9.344
-            },
-            'ec2_sql_web': {
-                # SQL Web edition with realistic markup
-                'm5.xlarge': 0.504, 'm5.2xlarge': 1.008, 'm5.4xlarge': 2.016, 'm5.8xlarge': 4.032,
-                'm5.12xlarge': 6.048, 'm5.16xlarge': 8.064, 'r5.xlarge': 0.632, 'r5.2xlarge': 1.264,
-                'r5.4xlarge': 2.528, 'r5.8xlarge': 5.056, 'r5.12xlarge': 7.584, 'r5.16xlarge': 10.112
-            },
-            'ec2_sql_standard': {
-                # SQL Standard edition with current AWS pricing
-                'm5.xlarge': 0.832, 'm5.2xlarge': 1.664, 'm5.4xlarge': 3.328, 'm5.8xlarge': 6.656,
-                'm5.12xlarge': 9.984, 'm5.16xlarge': 13.312, 'r5.xlarge': 1.096, 'r5.2xlarge': 2.192,
-                'r5.4xlarge': 4.384, 'r5.8xlarge': 8.768, 'r5.12xlarge': 13.152, 'r5.16xlarge': 17.536
-            },
-            'ec2_sql_enterprise': {
-                # SQL Enterprise edition with premium pricing
-                'm5.xlarge': 1.456, 'm5.2xlarge': 2.912, 'm5.4xlarge': 5.824, 'm5.8xlarge': 11.648,
-                'm5.12xlarge': 17.472, 'm5.16xlarge': 23.296, 'r5.xlarge': 1.728, 'r5.2xlarge': 3.456,
-                'r5.4xlarge': 6.912, 'r5.8xlarge': 13.824, 'r5.12xlarge': 20.736, 'r5.16xlarge': 27.648
-            },
-            'ebs': {'gp3': 0.08, 'gp2': 0.096, 'io2': 0.125, 'io1': 0.125},  # Updated EBS pricing
-            'ssm': {'patch_manager': 0.00972},
-            'datadog': {'annual_per_instance': 1000},  # NEW: Datadog pricing
-            'last_updated': 'Updated Practical 2025 Pricing Data with BYOL & Datadog Support'
-        }
+# AWS pricing from the local price catalog (built offline from the AWS Pricing API)
+@st.cache_resource
+def get_regional_pricing(catalog_path, catalog_mtime):
+    """Per-region pricing shared by every session; regions load lazily and the mtime argument re-keys the cache after a re-ingest"""
+    
+    if catalog_mtime is None:
+        return RegionalPricing(representative_loader)
+    return RegionalPricing(catalog_loader(catalog_path))
+
+@st.cache_data
+def get_pricing_regions(catalog_path, catalog_mtime):
+    """Regions available in the catalog (only the representative region without one)"""
     
-    # If boto3 available, use real-time pricing (keeping original logic)
+    if catalog_mtime is None:
+        return [DEFAULT_REGION]
     try:
-        if "aws" not in st.secrets:
-            raise Exception("AWS secrets not configured")
-            
-        session = boto3.Session(
-            aws_access_key_id=st.secrets["aws"]["access_key_id"],
-            aws_secret_access_key=st.secrets["aws"]["secret_access_key"],
-            region_name=st.secrets["aws"].get("region", "us-east-1")
-        )
-        
-        pricing_client = session.client('pricing', region_name='us-east-1')
-        
-        # For now, return the fallback data with updated pricing
-        # Real-time pricing implementation would go here if needed
-        return {
-            'ec2_windows': {
-                'm5.xlarge': 0.456, 'm5.2xlarge': 0.912, 'm5.4xlarge': 1.824, 'm5.8xlarge': 3.648,
-                'm5.12xlarge': 5.472, 'm5.16xlarge': 7.296, 'r5.xlarge': 0.584, 'r5.2xlarge': 1.168,
-                'r5.4xlarge': 2.336, 'r5.8xlarge': 4.672, 'r5.12xlarge': 7.008, 'r5.16xlarge': 9.344
-            },
-            'ec2_sql_web': {
-                'm5.xlarge': 0.504, 'm5.2xlarge': 1.008, 'm5.4xlarge': 2.016, 'm5.8xlarge': 4.032,
-                'm5.12xlarge': 6.048, 'm5.16xlarge': 8.064, 'r5.xlarge': 0.632, 'r5.2xlarge': 1.264,
-                'r5.4xlarge': 2.528, 'r5.8xlarge': 5.056, 'r5.12xlarge': 7.584, 'r5.16xlarge': 10.112
-            },
-            'ec2_sql_standard': {
-                'm5.xlarge': 0.832, 'm5.2xlarge': 1.664, 'm5.4xlarge': 3.328, 'm5.8xlarge': 6.656,
-                'm5.12xlarge': 9.984, 'm5.16xlarge': 13.312, 'r5.xlarge': 1.096, 'r5.2xlarge': 2.192,
-                'r5.4xlarge': 4.384, 'r5.8xlarge': 8.768, 'r5.12xlarge': 13.152, 'r5.16xlarge': 17.536
-            },
-            'ec2_sql_enterprise': {
-                'm5.xlarge': 1.456, 'm5.2xlarge': 2.912, 'm5.4xlarge': 5.824, 'm5.8xlarge': 11.648,
-                'm5.12xlarge': 17.472, 'm5.16xlarge': 23.296, 'r5.xlarge': 1.728, 'r5.2xlarge': 3.456,
-                'r5.4xlarge': 6.912, 'r5.8xlarge': 13.824, 'r5.12xlarge': 20.736, 'r5.16xlarge': 27.648
-            },
-            'ebs': {'gp3': 0.08, 'gp2': 0.096, 'io2': 0.125, 'io1': 0.125},
-            'ssm': {'patch_manager': 0.00972},
-            'datadog': {'annual_per_instance': 1000},
-            'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-    except Exception as e:
-        # Return fallback data instead of recursive call
-        return {
-            'ec2_windows': {
-                'm5.xlarge': 0.456, 'm5.2xlarge': 0.912, 'm5.4xlarge': 1.824, 'm5.8xlarge': 3.648,
-                'm5.12xlarge': 5.472, 'm5.16xlarge': 7.296, 'r5.xlarge': 0.584, 'r5.2xlarge': 1.168,
-                'r5.4xlarge': 2.336, 'r5.8xlarge': 4.672, 'r5.12xlarge': 7.008, 'r5.16xlarge': 9.344
-            },
-            'ec2_sql_web': {
-                'm5.xlarge': 0.504, 'm5.2xlarge': 1.008, 'm5.4xlarge': 2.016, 'm5.8xlarge': 4.032,
-                'm5.12xlarge': 6.048, 'm5.16xlarge': 8.064, 'r5.xlarge': 0.632, 'r5.2xlarge': 1.264,
-                'r5.4xlarge': 2.528, 'r5.8xlarge': 5.056, 'r5.12xlarge': 7.584, 'r5.16xlarge': 10.112
-            },
-            'ec2_sql_standard': {
-                'm5.xlarge': 0.832, 'm5.2xlarge': 1.664, 'm5.4xlarge': 3.328, 'm5.8xlarge': 6.656,
-                'm5.12xlarge': 9.984, 'm5.16xlarge': 13.312, 'r5.xlarge': 1.096, 'r5.2xlarge': 2.192,
-                'r5.4xlarge': 4.384, 'r5.8xlarge': 8.768, 'r5.12xlarge': 13.152, 'r5.16xlarge': 17.536
-            },
-            'ec2_sql_enterprise': {
-                'm5.xlarge': 1.456, 'm5.2xlarge': 2.912, 'm5.4xlarge': 5.824, 'm5.8xlarge': 11.648,
-                'm5.12xlarge': 17.472, 'm5.16xlarge': 23.296, 'r5.xlarge': 1.728, 'r5.2xlarge': 3.456,
-                'r5.4xlarge': 6.912, 'r5.8xlarge': 13.824, 'r5.12xlarge': 20.736, 'r5.16xlarge': 27.648
-            },
-            'ebs': {'gp3': 0.08, 'gp2': 0.096, 'io2': 0.125, 'io1': 0.125},
-            'ssm': {'patch_manager': 0.00972},
-            'datadog': {'annual_per_instance': 1000},
-            'last_updated': f'Fallback Data (Exception: {str(e)})'
-        }
+        return catalog_regions(catalog_path) or [DEFAULT_REGION]
+    except sqlite3.Error:
+        return [DEFAULT_REGION]
+
+def get_price_index(regional_pricing, region):
+    """Compiled price index for the selected region, falling back to representative data if the catalog is unusable"""
+    
+    try:
+        return regional_pricing.index(region)
+    except (LookupError, sqlite3.Error) as e:
+        return PriceIndex.from_pricing(default_pricing(last_updated=f'Fallback Data (Exception: {str(e)})'), region)
+
+@st.cache_resource
+def get_instance_sizer(_price_index, price_fingerprint, edition, catalog_path, catalog_mtime):
+    """Right-sizing index for one priced edition; catalog specs override the representative spec table"""
+    
+    specs = default_instance_specs()
+    if catalog_mtime is not None:
+        try:
+            specs = merge_instance_specs(specs, load_instance_specs(catalog_path).dropna(subset=['vcpu', 'memory_gib']))
+        except sqlite3.Error:
+            pass
+    return InstanceSizer.for_edition(specs, _price_index, edition)
+
+def get_default_region():
+    """Region from the ``[aws]`` secrets section, if configured"""
+    
+    try:
+        return st.secrets["aws"].get("region", DEFAULT_REGION)
+    except Exception:
+        return DEFAULT_REGION
 
 # Load AWS pricing
-pricing_data = get_aws_pricing()
+catalog_mtime = os.path.getmtime(DEFAULT_CATALOG_PATH) if os.path.exists(DEFAULT_CATALOG_PATH) else None
+regional_pricing = get_regional_pricing(DEFAULT_CATALOG_PATH, catalog_mtime)
+pricing_regions = get_pricing_regions(DEFAULT_CATALOG_PATH, catalog_mtime)
+
+# Show AWS pricing source
+if catalog_mtime is None:
+    st.info("AWS price catalog not found. Using current representative pricing data. To use live AWS prices, run `python -m planner.catalog ingest` with AWS credentials configured.")
 
 # Initialize comprehensive enterprise state with practical parameters
 def initialize_enterprise_state():
-    # Practical Configuration Parameters
+    defaults = default_state()
+    
     if 'config_params' not in st.session_state:
         st.session_state.config_params = {}
     
-    # More realistic enterprise defaults
-    default_config = {
-        # Workforce parameters (conservative, practical ratios)
-        'dba_ratio': 20,  # Reduced from 25 - more realistic for complex environments
-        'automation_ratio': 30,  # Reduced from 35 - automation tooling requires more attention
-        'itil_ratio': 50,  # Reduced from 60 - service management is intensive
-        'max_automation_maturity': 65,  # Keep at 65% as requested
-        'max_workforce_reduction': 55,  # Reduced from 65 - more realistic maximum
-        'support_24x7_multiplier': 1.6,  # Increased from 1.4 - true 24x7 support is expensive
-        
-        # Realistic industry benchmarks
-        'benchmark_availability_avg': 99.2,  # Reduced from 99.5 - more typical enterprise
-        'benchmark_availability_leader': 99.95,  # Reduced from 99.99 - achievable leader performance
-        'benchmark_automation_avg': 35,  # Reduced from 45 - typical enterprise automation
-        'benchmark_automation_leader': 75,  # Reduced from 85 - realistic leadership
-        'benchmark_itil_avg': 55,  # Reduced from 60 - typical ITIL maturity
-        'benchmark_itil_leader': 85,  # Reduced from 90 - achievable ITIL leadership
-        'benchmark_rto_avg': 360,  # Increased from 240 - more realistic average
-        'benchmark_rto_leader': 90  # Increased from 60 - achievable but excellent
-    }
-    
     # Initialize missing keys
-    for key, default_value in default_config.items():
+    for key, default_value in defaults['config_params'].items():
         if key not in st.session_state.config_params:
             st.session_state.config_params[key] = default_value
     
-    if 'current_skills' not in st.session_state:
-        st.session_state.current_skills = {
-            'SQL Server DBA Expert': 2,  # More conservative starting point
-            'Infrastructure Automation': 1,
-            'ITIL Service Manager': 1
-        }
-    
-    if 'itil_practices' not in st.session_state:
-        st.session_state.itil_practices = {
-            'Strategy Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'High'},
-            'Service Design': {'implemented': True, 'maturity': 'Managed', 'priority': 'High'},
-            'Change Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'Critical'},
-            'Incident Management': {'implemented': True, 'maturity': 'Defined', 'priority': 'Critical'},
-            'Problem Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'High'},
-            'Service Level Management': {'implemented': True, 'maturity': 'Managed', 'priority': 'High'},
-            'Capacity Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'High'},
-            'Availability Management': {'implemented': True, 'maturity': 'Defined', 'priority': 'Critical'},
-            'Continuity Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'Medium'},
-            'Service Validation & Testing': {'implemented': False, 'maturity': 'Initial', 'priority': 'Medium'},
-            'Release Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'High'},
-            'Configuration Management': {'implemented': False, 'maturity': 'Initial', 'priority': 'High'}
-        }
-    
-    if 'governance_framework' not in st.session_state:
-        st.session_state.governance_framework = {
-            'change_approval_board': False,
-            'architecture_review_board': False,
-            'risk_management_committee': False,
-            'security_steering_committee': False,
-            'business_continuity_plan': False
-        }
+    for key in ('current_skills', 'itil_practices', 'governance_framework', 'automation_components'):
+        if key not in st.session_state:
+            st.session_state[key] = defaults[key]
 
 initialize_enterprise_state()
 
-# Enhanced automation components with realistic effort and workforce reduction
-if 'automation_components' not in st.session_state:
-    st.session_state.automation_components = {
-        # Infrastructure & Cloud (Realistic estimates)
-        'Infrastructure as Code': {
-            'enabled': False, 'weight': 8, 'effort': 200, 'category': 'Infrastructure',
-            'description': 'Terraform for VPC, subnets, security groups, EC2 instances',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 15
-        },
-        'Multi-AZ High Availability': {
-            'enabled': False, 'weight': 9, 'effort': 160, 'category': 'Infrastructure',
-            'description': 'Automated failover across availability zones',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 12
-        },
-        'Auto Scaling & Load Balancing': {
-            'enabled': False, 'weight': 7, 'effort': 140, 'category': 'Infrastructure',
-            'description': 'Dynamic resource scaling based on demand',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 20
-        },
-        'Network Security Automation': {
-            'enabled': False, 'weight': 8, 'effort': 120, 'category': 'Infrastructure',
-            'description': 'Automated security group and NACLs management',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 18
-        },
-        
-        # Database & Performance (Updated estimates)
-        'SQL AlwaysOn Automation': {
-            'enabled': False, 'weight': 10, 'effort': 300, 'category': 'Database',
-            'description': 'Automated SQL Server AlwaysOn configuration and management',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 25
-        },
-        'Performance Optimization Engine': {
-            'enabled': False, 'weight': 6, 'effort': 160, 'category': 'Database',
-            'description': 'AI-driven query optimization and index management',
-            'business_impact': 'Medium', 'technical_complexity': 'High', 'workforce_reduction': 18
-        },
-        'Database Lifecycle Management': {
-            'enabled': False, 'weight': 7, 'effort': 180, 'category': 'Database',
-            'description': 'Automated provisioning, scaling, and decommissioning',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 22
-        },
-        
-        # Security & Compliance (Realistic expectations)
-        'Zero-Trust Security Model': {
-            'enabled': False, 'weight': 9, 'effort': 240, 'category': 'Security',
-            'description': 'Identity-based access controls with continuous verification',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 12
-        },
-        'Automated Patch Management': {
-            'enabled': False, 'weight': 8, 'effort': 180, 'category': 'Security',
-            'description': 'Orchestrated patching with rollback capabilities',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 30
-        },
-        'Compliance Monitoring': {
-            'enabled': False, 'weight': 7, 'effort': 130, 'category': 'Security',
-            'description': 'Continuous compliance validation and reporting',
-            'business_impact': 'Critical', 'technical_complexity': 'Medium', 'workforce_reduction': 20
-        },
-        'Data Loss Prevention': {
-            'enabled': False, 'weight': 8, 'effort': 150, 'category': 'Security',
-            'description': 'Automated data classification and protection',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 16
-        },
-        
-        # Operations & Monitoring (Conservative estimates)
-        'AI-Powered Monitoring': {
-            'enabled': False, 'weight': 8, 'effort': 200, 'category': 'Operations',
-            'description': 'Machine learning-based anomaly detection and prediction',
-            'business_impact': 'High', 'technical_complexity': 'High', 'workforce_reduction': 30
-        },
-        'Automated Incident Response': {
-            'enabled': False, 'weight': 9, 'effort': 220, 'category': 'Operations',
-            'description': 'Self-healing systems with escalation workflows',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 35
-        },
-        'Service Orchestration': {
-            'enabled': False, 'weight': 6, 'effort': 130, 'category': 'Operations',
-            'description': 'Workflow automation across enterprise systems',
-            'business_impact': 'Medium', 'technical_complexity': 'Medium', 'workforce_reduction': 20
-        },
-        
-        # Backup & Recovery (Practical estimates)
-        'Cross-Region DR Automation': {
-            'enabled': False, 'weight': 9, 'effort': 280, 'category': 'Backup',
-            'description': 'Automated disaster recovery across geographic regions',
-            'business_impact': 'Critical', 'technical_complexity': 'High', 'workforce_reduction': 18
-        },
-        'Point-in-Time Recovery': {
-            'enabled': False, 'weight': 7, 'effort': 150, 'category': 'Backup',
-            'description': 'Granular recovery with minimal data loss',
-            'business_impact': 'High', 'technical_complexity': 'Medium', 'workforce_reduction': 14
-        },
-        
-        # Integration & Portal (Updated)
-        'Enterprise Service Bus': {
-            'enabled': False, 'weight': 6, 'effort': 220, 'category': 'Integration',
-            'description': 'API gateway and service mesh integration',
-            'business_impact': 'Medium', 'technical_complexity': 'High', 'workforce_reduction': 10
-        },
-        'Self-Service Portal': {
-            'enabled': False, 'weight': 5, 'effort': 180, 'category': 'Portal',
-            'description': 'Enterprise portal with RBAC and workflow approval',
-            'business_impact': 'Medium', 'technical_complexity': 'Medium', 'workforce_reduction': 25
-        }
-    }
+# Sidebar plan widgets are keyed plan_<field>; an opened saved scenario supplies their defaults
+scenario_plan = st.session_state.get('scenario_plan', {})
+
+def plan_default(field, default):
+    return scenario_plan.get(field, default)
+
+def plan_index(options, field, default=0):
+    value = scenario_plan.get(field)
+    return options.index(value) if value in options else default
 
 # Sidebar configuration with updated parameters
+section("sidebar")
 st.sidebar.header("Configuration Panel v7.0")
 st.sidebar.markdown("**NEW: BYOL & Datadog Support**")
 
@@ -457,19 +321,19 @@ st.sidebar.subheader("Dynamic Parameters")
 with st.sidebar.expander("Workforce Ratios"):
     st.session_state.config_params['dba_ratio'] = st.number_input(
         "Clusters per SQL Server DBA", 
-        min_value=15, max_value=40, 
+        *CONFIG_RANGES['dba_ratio'], 
         value=st.session_state.config_params['dba_ratio'],
         help="Practical range: 15-25 clusters per experienced DBA (reduced for realism)"
     )
     st.session_state.config_params['automation_ratio'] = st.number_input(
         "Clusters per Infrastructure Automation Engineer", 
-        min_value=20, max_value=60, 
+        *CONFIG_RANGES['automation_ratio'], 
         value=st.session_state.config_params['automation_ratio'],
         help="Practical range: 25-40 clusters per automation engineer (reduced for complexity)"
     )
     st.session_state.config_params['itil_ratio'] = st.number_input(
         "Clusters per ITIL Service Manager", 
-        min_value=30, max_value=80, 
+        *CONFIG_RANGES['itil_ratio'], 
         value=st.session_state.config_params['itil_ratio'],
         help="Practical range: 40-60 clusters per service manager (reduced for coordination)"
     )
@@ -477,14 +341,14 @@ with st.sidebar.expander("Workforce Ratios"):
     st.markdown("#### Automation Constraints")
     st.session_state.config_params['max_automation_maturity'] = st.slider(
         "Maximum Automation Level (%)", 
-        50, 75, 
+        *CONFIG_RANGES['max_automation_maturity'], 
         st.session_state.config_params['max_automation_maturity'], 
         5,
         help="65% maximum maintained as requested - realistic for enterprise constraints"
     )
     st.session_state.config_params['max_workforce_reduction'] = st.slider(
         "Maximum Workforce Reduction at Full Automation (%)", 
-        35, 65, 
+        *CONFIG_RANGES['max_workforce_reduction'], 
         st.session_state.config_params['max_workforce_reduction'], 
         5,
         help="Maximum workforce reduction with mature automation (reduced to 55% for realism)"
@@ -495,7 +359,7 @@ with st.sidebar.expander("Workforce Ratios"):
 with st.sidebar.expander("Service Coverage"):
     st.session_state.config_params['support_24x7_multiplier'] = st.number_input(
         "24x7 Support Coverage Multiplier", 
-        min_value=1.3, max_value=2.2, 
+        *CONFIG_RANGES['support_24x7_multiplier'], 
         value=st.session_state.config_params['support_24x7_multiplier'], 
         step=0.1,
         help="Increased multiplier (1.6x) for true continuous operations coverage"
@@ -506,54 +370,167 @@ st.sidebar.subheader("Architecture Configuration")
 deployment_type = st.sidebar.selectbox(
     "Deployment Architecture",
     ["AlwaysOn Cluster", "Standalone SQL Server"],
+    index=plan_index(["AlwaysOn Cluster", "Standalone SQL Server"], 'deployment_type'),
+    key='plan_deployment_type',
     help="Select between SQL Server AlwaysOn high availability clusters or standalone instances"
 )
+portfolio_mode = st.sidebar.toggle(
+    "Heterogeneous Portfolio",
+    key='portfolio_mode',
+    help="Model the estate as cluster groups edited on the page, each with its own deployment, instance shape, "
+         "edition, licensing and monitoring"
+)
+if portfolio_mode:
+    st.sidebar.caption("Cluster counts and per-group settings come from the portfolio grid. The compute, licensing, "
+                       "storage and monitoring settings below still drive the single-fleet tools (configuration "
+                       "sweep, Monte Carlo simulation, region comparison).")
 
 # Current State Configuration
 st.sidebar.subheader("Current Infrastructure Assessment")
-current_clusters = st.sidebar.number_input(
-    f"Current {'Clusters' if deployment_type == 'AlwaysOn Cluster' else 'Instances'}", 
-    min_value=1, max_value=1000, value=5
+if not portfolio_mode:  # Portfolio totals are set from the groups below
+    current_clusters = st.sidebar.number_input(
+        f"Current {'Clusters' if deployment_type == 'AlwaysOn Cluster' else 'Instances'}", 
+        *PLAN_RANGES['current_clusters'], value=plan_default('current_clusters', 5), key='plan_current_clusters'
+    )
+current_resources = st.sidebar.number_input("Current Team Size", *PLAN_RANGES['current_resources'],
+                                            value=plan_default('current_resources', 4), key='plan_current_resources')
+
+# Region selection: only the selected region's prices are loaded
+default_region = get_default_region()
+region = st.sidebar.selectbox(
+    "AWS Region",
+    pricing_regions,
+    index=plan_index(pricing_regions, 'region',
+                     pricing_regions.index(default_region) if default_region in pricing_regions else 0),
+    key='plan_region',
+    help="Region used for EC2, EBS and Systems Manager prices"
 )
-current_resources = st.sidebar.number_input("Current Team Size", min_value=1, max_value=50, value=4)
+price_index = get_price_index(regional_pricing, region)
+startup_profile.mark('page_setup')
 
 # Instance Configuration with practical defaults
 st.sidebar.subheader("Compute Configuration")
-available_instances = list(set(
-    list(pricing_data['ec2_windows'].keys()) + 
-    list(pricing_data['ec2_sql_standard'].keys())
-))
-available_instances.sort()
+available_instances = price_index.priced_instance_types()
+
+# Heterogeneous portfolio: one editable row per cluster group ('clusters' is the target count)
+PORTFOLIO_EDITOR_COLUMNS = ['group', 'deployment_type', 'current_clusters', 'clusters', 'instance_type',
+                            'ec2_per_cluster', 'storage_tb', 'ebs_volume_type', 'storage_iops',
+                            'storage_throughput_mbps', 'sql_edition', 'licensing_model', 'enable_ssm_patching',
+                            'enable_datadog']
+
+def read_portfolio_upload(uploaded):
+    """Cluster groups from an uploaded CSV or Parquet file; optional columns take the portfolio defaults"""
+    
+    frame = pd.read_parquet(uploaded) if uploaded.name.lower().endswith('.parquet') else pd.read_csv(uploaded)
+    if 'clusters' not in frame and 'target_clusters' in frame:
+        frame = frame.rename(columns={'target_clusters': 'clusters'})
+    groups = normalize_portfolio(frame)
+    if 'group' not in groups:
+        groups['group'] = [f"Group {position + 1}" for position in range(len(groups))]
+    if 'current_clusters' not in groups:
+        groups['current_clusters'] = groups['clusters']
+    
+    allowed = {'instance_type': available_instances, 'deployment_type': DEPLOYMENT_TYPES,
+               'sql_edition': SQL_EDITIONS, 'licensing_model': LICENSING_MODELS, 'ebs_volume_type': EBS_VOLUME_TYPES}
+    for column, options in allowed.items():
+        unknown = sorted(set(groups[column]) - set(options))
+        if unknown:
+            raise ValueError(f"Unknown {column.replace('_', ' ')} values: {', '.join(map(str, unknown))}")
+    return groups[PORTFOLIO_EDITOR_COLUMNS]
+
+if portfolio_mode:
+    with st.expander("🧩 Cluster Group Portfolio", expanded=True):
+        st.caption("One row per cluster group. Every dashboard figure rolls up from these rows, and an edit only "
+                   "reprices the groups whose configuration changed.")
+        uploaded_portfolio = st.file_uploader(
+            "Load groups from CSV or Parquet", type=['csv', 'parquet'], key='portfolio_upload',
+            help="Columns as in the grid below; clusters and instance_type are required, the rest take defaults"
+        )
+        upload_id = uploaded_portfolio and f"{uploaded_portfolio.name}:{uploaded_portfolio.size}"
+        if upload_id and st.session_state.get('portfolio_upload_id') != upload_id:
+            st.session_state.portfolio_upload_id = upload_id
+            try:
+                st.session_state.portfolio_groups = read_portfolio_upload(uploaded_portfolio)
+            except (ValueError, KeyError) as e:
+                st.error(f"Could not load {uploaded_portfolio.name}: {e}")
+            else:
+                # A new editor key drops the edits made on top of the previous groups
+                st.session_state.portfolio_editor_version = st.session_state.get('portfolio_editor_version', 0) + 1
+        
+        edited_groups = st.data_editor(
+            st.session_state.setdefault('portfolio_groups', pd.DataFrame(DEFAULT_PORTFOLIO)[PORTFOLIO_EDITOR_COLUMNS]),
+            key=f"portfolio_editor_{st.session_state.get('portfolio_editor_version', 0)}",
+            num_rows='dynamic',
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'group': st.column_config.TextColumn("Group", required=True),
+                'deployment_type': st.column_config.SelectboxColumn("Deployment", options=DEPLOYMENT_TYPES),
+                'current_clusters': st.column_config.NumberColumn("Current Clusters", min_value=0, step=1),
+                'clusters': st.column_config.NumberColumn("Target Clusters", min_value=0, step=1),
+                'instance_type': st.column_config.SelectboxColumn("Instance Type", options=available_instances),
+                'ec2_per_cluster': st.column_config.NumberColumn(
+                    "Instances/Cluster", min_value=1, max_value=10, step=1, help="Standalone groups always use 1"
+                ),
+                'storage_tb': st.column_config.NumberColumn("Storage (TB)", min_value=0.0, step=0.5),
+                'ebs_volume_type': st.column_config.SelectboxColumn("EBS", options=EBS_VOLUME_TYPES),
+                'storage_iops': st.column_config.NumberColumn("IOPS", min_value=0, step=1000),
+                'storage_throughput_mbps': st.column_config.NumberColumn("MB/s", min_value=0, step=50),
+                'sql_edition': st.column_config.SelectboxColumn("Edition", options=SQL_EDITIONS),
+                'licensing_model': st.column_config.SelectboxColumn("Licensing", options=LICENSING_MODELS),
+                'enable_ssm_patching': st.column_config.CheckboxColumn("SSM Patching"),
+                'enable_datadog': st.column_config.CheckboxColumn("Datadog"),
+            },
+        )
+        portfolio_results_panel = st.container()
+    
+    # Rows added in the grid start empty: fill them with the portfolio defaults
+    new_group_defaults = {column: default for column, default in PORTFOLIO_COLUMNS.items() if default is not None}
+    new_group_defaults.update(group="New group", current_clusters=0, clusters=0, instance_type=(
+        DEFAULT_PLAN['instance_type'] if DEFAULT_PLAN['instance_type'] in available_instances else available_instances[0]
+    ))
+    portfolio_groups = edited_groups.fillna(new_group_defaults).astype({'current_clusters': 'int64', 'clusters': 'int64'})
+    current_clusters = int(portfolio_groups['current_clusters'].sum())
+    if current_clusters < 1 or portfolio_groups['clusters'].sum() < 1:
+        st.error("The portfolio needs at least one current and one target cluster.")
+        st.stop()
 
 instance_type = st.sidebar.selectbox(
     "EC2 Instance Type",
     available_instances,
+    index=plan_index(available_instances, 'instance_type'),
+    key='plan_instance_type',
     help="Select EC2 instance type optimized for SQL Server workloads"
 )
 
 # More practical default specifications
 current_cpu_cores = st.sidebar.number_input(
     "CPU Cores per Instance", 
-    min_value=4, max_value=128, 
-    value=16,  # Reduced from 32
+    *PLAN_RANGES['current_cpu_cores'], 
+    value=plan_default('current_cpu_cores', 16),  # Reduced from 32
+    key='plan_current_cpu_cores',
     help="Typical enterprise SQL Server: 8-16 cores for standard workloads"
 )
 current_memory_gb = st.sidebar.number_input(
     "Memory (GB) per Instance", 
-    min_value=32, max_value=1024, 
-    value=128,  # Reduced from 256
+    *PLAN_RANGES['current_memory_gb'], 
+    value=plan_default('current_memory_gb', 128),  # Reduced from 256
+    key='plan_current_memory_gb',
     help="Standard enterprise SQL Server: 64-256 GB depending on workload"
 )
 current_storage_tb = st.sidebar.number_input(
     "Storage (TB) per Instance", 
-    min_value=0.5, max_value=100.0, 
-    value=3.0,  # Reduced from 10
+    *PLAN_RANGES['current_storage_tb'], 
+    value=plan_default('current_storage_tb', 3.0),  # Reduced from 10
+    key='plan_current_storage_tb',
     step=0.5,
     help="Typical enterprise database size: 1-10 TB"
 )
 
 if deployment_type == "AlwaysOn Cluster":
-    ec2_per_cluster = st.sidebar.number_input("EC2 Instances per Cluster", min_value=2, max_value=10, value=3)
+    ec2_per_cluster = st.sidebar.number_input("EC2 Instances per Cluster", 2, PLAN_RANGES['ec2_per_cluster'][1],
+                                              value=max(plan_default('ec2_per_cluster', 3), 2),
+                                              key='plan_ec2_per_cluster')
 else:
     ec2_per_cluster = 1
 
@@ -562,30 +539,63 @@ st.sidebar.subheader("🆕 SQL Server Licensing")
 licensing_model = st.sidebar.radio(
     "Licensing Model",
     ["License-Included", "BYOL (Bring Your Own License)"],
+    index=plan_index(["License-Included", "BYOL (Bring Your Own License)"], 'licensing_model'),
+    key='plan_licensing_model',
     help="NEW: Choose between AWS License-Included or bring your own SQL Server licenses"
 )
 
 sql_edition = st.sidebar.selectbox(
     "SQL Server Edition",
     ["Standard", "Enterprise", "Web"],
+    index=plan_index(["Standard", "Enterprise", "Web"], 'sql_edition'),
+    key='plan_sql_edition',
     help="Select SQL Server edition for licensing and cost calculations"
 )
 
 if licensing_model == "BYOL (Bring Your Own License)":
     st.sidebar.info("💡 BYOL: You provide SQL Server licenses, pay only for Windows compute")
 
+# Cheapest instance that covers the per-instance CPU and memory entered above
+instance_sizer = get_instance_sizer(price_index, price_index.fingerprint, priced_edition(sql_edition, licensing_model),
+                                    DEFAULT_CATALOG_PATH, catalog_mtime)
+right_sized_types, right_sized_rates = instance_sizer.cheapest_many([current_cpu_cores], [current_memory_gb])
+if right_sized_types[0] is not None:
+    st.sidebar.caption(
+        f"Right-sizing: {right_sized_types[0]} is the cheapest fit for {current_cpu_cores} vCPU / "
+        f"{current_memory_gb} GB (${right_sized_rates[0]:.3f}/hour)"
+    )
+else:
+    st.sidebar.caption(f"Right-sizing: no priced instance offers {current_cpu_cores} vCPU / {current_memory_gb} GB")
+
 # EBS Configuration
 st.sidebar.subheader("Storage Configuration")
 ebs_volume_type = st.sidebar.selectbox(
     "EBS Volume Type",
     ["gp3", "gp2", "io2", "io1"],
+    index=plan_index(["gp3", "gp2", "io2", "io1"], 'ebs_volume_type'),
+    key='plan_ebs_volume_type',
     help="Select Amazon EBS volume type for storage performance requirements"
 )
+storage_iops = st.sidebar.number_input(
+    "Required IOPS per Instance",
+    *PLAN_RANGES['storage_iops'], value=plan_default('storage_iops', 0), step=1000,
+    key='plan_storage_iops',
+    help="Peak IOPS across data, log and tempdb; 0 prices storage by capacity only"
+)
+storage_throughput_mbps = st.sidebar.number_input(
+    "Required Throughput (MB/s) per Instance",
+    *PLAN_RANGES['storage_throughput_mbps'], value=plan_default('storage_throughput_mbps', 0), step=50,
+    key='plan_storage_throughput_mbps',
+    help="Peak MB/s across data, log and tempdb; 0 prices storage by capacity only"
+)
+if storage_iops or storage_throughput_mbps:
+    st.sidebar.caption("Data, log and tempdb volumes are sized separately, each on its cheapest EBS type")
 
 # Patch Management
 enable_ssm_patching = st.sidebar.checkbox(
     "AWS Systems Manager Patch Management",
-    value=True,
+    value=plan_default('enable_ssm_patching', True),
+    key='plan_enable_ssm_patching',
     help="Enable automated patching with AWS Systems Manager for operational efficiency"
 )
 
@@ -593,7 +603,8 @@ enable_ssm_patching = st.sidebar.checkbox(
 st.sidebar.subheader("🆕 Monitoring & Observability")
 enable_datadog = st.sidebar.checkbox(
     "Datadog Monitoring Platform",
-    value=False,
+    value=plan_default('enable_datadog', False),
+    key='plan_enable_datadog',
     help="NEW: Enable Datadog monitoring and observability ($1,000/instance/year)"
 )
 
@@ -604,294 +615,365 @@ else:
 
 # Target State Configuration
 st.sidebar.subheader("Target State Planning")
-target_clusters = st.sidebar.number_input(
-    f"Target {'Clusters' if deployment_type == 'AlwaysOn Cluster' else 'Instances'}", 
-    min_value=current_clusters, max_value=10000, value=50  # Reduced from 100
-)
-timeframe = st.sidebar.number_input("Implementation Timeframe (months)", min_value=6, max_value=60, value=24)
+if portfolio_mode:
+    target_clusters = int(portfolio_groups['clusters'].sum())
+    st.sidebar.caption(f"Clusters: {current_clusters:,} current → {target_clusters:,} target across "
+                       f"{len(portfolio_groups)} portfolio groups")
+else:
+    target_clusters = st.sidebar.number_input(
+        f"Target {'Clusters' if deployment_type == 'AlwaysOn Cluster' else 'Instances'}", 
+        current_clusters, PLAN_RANGES['target_clusters'][1],
+        value=max(plan_default('target_clusters', 50), current_clusters),  # Reduced from 100
+        key='plan_target_clusters'
+    )
+timeframe = st.sidebar.number_input("Implementation Timeframe (months)", *PLAN_RANGES['timeframe'],
+                                    value=plan_default('timeframe', 24), key='plan_timeframe')
 
 # Service Level Requirements
 st.sidebar.subheader("Service Level Requirements")
-availability_target = st.sidebar.slider("Availability Target (%)", 95.0, 99.99, 99.5, 0.01)  # Adjusted default
-rpo_minutes = st.sidebar.slider("Recovery Point Objective (minutes)", 5, 1440, 60, 5)
-rto_minutes = st.sidebar.slider("Recovery Time Objective (minutes)", 15, 1440, 240, 15)
+availability_target = st.sidebar.slider("Availability Target (%)", *PLAN_RANGES['availability_target'],
+                                        plan_default('availability_target', 99.5), 0.01,
+                                        key='plan_availability_target')  # Adjusted default
+rpo_minutes = st.sidebar.slider("Recovery Point Objective (minutes)", *PLAN_RANGES['rpo_minutes'], plan_default('rpo_minutes', 60), 5,
+                                key='plan_rpo_minutes')
+rto_minutes = st.sidebar.slider("Recovery Time Objective (minutes)", *PLAN_RANGES['rto_minutes'], plan_default('rto_minutes', 240), 15,
+                                key='plan_rto_minutes')
 
 # Support model
-support_24x7 = st.sidebar.checkbox("24x7 Global Support Coverage", value=False)
+support_24x7 = st.sidebar.checkbox("24x7 Global Support Coverage", value=plan_default('support_24x7', False),
+                                   key='plan_support_24x7')
 
-# Skills requirements calculation with realistic constraints
-def calculate_skills_requirements(clusters, automation_level, support_24x7):
-    """Calculate required skills with practical automation constraints and minimum staffing"""
-    
-    # Ensure config_params has required keys with defaults
-    if 'max_automation_maturity' not in st.session_state.config_params:
-        st.session_state.config_params['max_automation_maturity'] = 65
-    if 'max_workforce_reduction' not in st.session_state.config_params:
-        st.session_state.config_params['max_workforce_reduction'] = 55
-    
-    # Cap automation at realistic maximum (65%)
-    effective_automation = min(automation_level, st.session_state.config_params['max_automation_maturity'])
-    
-    base_requirements = {
-        'SQL Server DBA Expert': max(1, math.ceil(clusters / st.session_state.config_params['dba_ratio'])),
-        'Infrastructure Automation': max(1, math.ceil(clusters / st.session_state.config_params['automation_ratio'])),
-        'ITIL Service Manager': max(1, math.ceil(clusters / st.session_state.config_params['itil_ratio'])),
-    }
-    
-    # Support coverage multiplier (increased for true 24x7)
-    support_multiplier = st.session_state.config_params['support_24x7_multiplier'] if support_24x7 else 1.0
-    
-    adjusted_requirements = {}
-    for role, base_req in base_requirements.items():
-        
-        # Role-specific automation limitations (more conservative)
-        if role == 'SQL Server DBA Expert':
-            # DBAs capped at 50% automation due to legacy systems, human judgment needs
-            role_automation_cap = min(effective_automation, 50)
-            role_reduction = (role_automation_cap / 100) * 0.45  # Max 45% reduction
-            role_multiplier = 1.0 - role_reduction
-            
-        elif role == 'Infrastructure Automation':
-            # Automation engineers benefit most but still need oversight
-            role_automation_cap = effective_automation
-            role_reduction = (role_automation_cap / 100) * 0.60  # Up to 60% reduction
-            role_multiplier = 1.0 - role_reduction
-            
-        elif role == 'ITIL Service Manager':
-            # Service management capped at 40% automation - coordination requires humans
-            role_automation_cap = min(effective_automation, 40)
-            role_reduction = (role_automation_cap / 100) * 0.35  # Max 35% reduction
-            role_multiplier = 1.0 - role_reduction
-        
-        else:
-            # Generic fallback
-            automation_reduction_factor = (effective_automation / 100) * (st.session_state.config_params['max_workforce_reduction'] / 100)
-            role_multiplier = 1.0 - automation_reduction_factor
-        
-        # Apply both automation and support multipliers
-        adjusted_req = math.ceil(base_req * support_multiplier * role_multiplier)
-        
-        # Apply minimum staffing levels for enterprise operations
-        min_staffing_levels = {
-            'SQL Server DBA Expert': 1,  # Always need at least 1 DBA
-            'Infrastructure Automation': 1,  # Always need at least 1 automation engineer
-            'ITIL Service Manager': 1 if clusters > 10 else 0  # Need ITIL manager for 10+ clusters
-        }
-        
-        min_required = min_staffing_levels.get(role, 0)
-        adjusted_requirements[role] = max(adjusted_req, min_required) if base_req > 0 else 0
-    
-    return adjusted_requirements
+# Monte Carlo cost uncertainty
+st.sidebar.subheader("Cost Uncertainty")
+enable_simulation = st.sidebar.checkbox(
+    "Monte Carlo TCO Simulation",
+    value=False,
+    help="Sample price drift, cluster growth, storage growth and hiring lead times to report P10/P50/P90 bands"
+)
 
-# ENHANCED: Cost calculation functions with BYOL and Datadog support
-def calculate_infrastructure_costs(clusters, instance_type, instances_per_cluster, storage_tb, ebs_type, enable_patching, sql_edition, licensing_model, enable_datadog):
-    """Calculate comprehensive infrastructure costs with BYOL and Datadog support"""
-    
-    windows_rate = pricing_data['ec2_windows'].get(instance_type, 0.456)
-    
-    # NEW: Calculate SQL Server costs based on licensing model
-    if licensing_model == "BYOL (Bring Your Own License)":
-        # BYOL: Only pay for Windows compute, customer provides SQL licenses
-        hourly_rate = windows_rate
-        licensing_component = 0
-    else:
-        # License-Included: Pay for SQL Server + Windows
-        edition_key_map = {
-            "Web": "ec2_sql_web",
-            "Standard": "ec2_sql_standard", 
-            "Enterprise": "ec2_sql_enterprise"
-        }
-        edition_key = edition_key_map.get(sql_edition, "ec2_sql_standard")
-        sql_rate = pricing_data[edition_key].get(instance_type, windows_rate * 2)
-        hourly_rate = sql_rate
-        licensing_component = sql_rate - windows_rate
-    
-    total_instances = clusters * instances_per_cluster
-    
-    monthly_ec2_cost = hourly_rate * 24 * 30 * total_instances
-    
-    ebs_rate_per_gb = pricing_data['ebs'][ebs_type]
-    storage_gb = storage_tb * 1024
-    monthly_ebs_cost = ebs_rate_per_gb * storage_gb * total_instances
-    
-    monthly_ssm_cost = 0
-    if enable_patching:
-        ssm_hourly_rate = pricing_data['ssm']['patch_manager']
-        monthly_ssm_cost = ssm_hourly_rate * 24 * 30 * total_instances
-    
-    # NEW: Datadog monitoring cost ($1000/instance/year = $83.33/instance/month)
-    monthly_datadog_cost = 0
-    if enable_datadog:
-        annual_datadog_per_instance = pricing_data['datadog']['annual_per_instance']
-        monthly_datadog_cost = (annual_datadog_per_instance / 12) * total_instances
-    
-    # More realistic data transfer costs (reduced)
-    base_transfer_cost = 20 if deployment_type == "AlwaysOn Cluster" else 8  # Reduced from 25/10
-    monthly_data_transfer = clusters * base_transfer_cost
-    
-    return {
-        'ec2_compute_monthly': (windows_rate * 24 * 30 * total_instances),
-        'sql_licensing_monthly': licensing_component * 24 * 30 * total_instances if licensing_model != "BYOL (Bring Your Own License)" else 0,
-        'ebs_monthly': monthly_ebs_cost,
-        'ssm_monthly': monthly_ssm_cost,
-        'datadog_monthly': monthly_datadog_cost,  # NEW
-        'data_transfer_monthly': monthly_data_transfer,
-        'total_monthly': monthly_ec2_cost + monthly_ebs_cost + monthly_ssm_cost + monthly_datadog_cost + monthly_data_transfer,
-        'total_instances': total_instances,
-        'licensing_model': licensing_model,  # NEW
-        'sql_edition': sql_edition  # NEW
+simulation_distributions = None
+if enable_simulation:
+    with st.sidebar.expander("Simulation Distributions"):
+        simulation_samples = st.select_slider(
+            "Samples", options=[10_000, 50_000, 100_000, 250_000], value=DEFAULT_SAMPLES
+        )
+        _, drift_mean, drift_sd = DEFAULT_DISTRIBUTIONS['price_drift_annual_pct']
+        price_drift_mean = st.number_input("Annual Price Drift Mean (%)", -20.0, 20.0, drift_mean, 0.5)
+        price_drift_sd = st.number_input("Annual Price Drift Std Dev (%)", 0.0, 20.0, drift_sd, 0.5)
+        _, growth_low, growth_mode, growth_high = DEFAULT_DISTRIBUTIONS['cluster_growth_factor']
+        cluster_growth_range = st.slider(
+            "Share of Planned Cluster Growth Realized", 0.0, 2.0, (growth_low, growth_high), 0.05,
+            help="Triangular distribution peaking at the plan (1.0)"
+        )
+        _, storage_low, storage_mode, storage_high = DEFAULT_DISTRIBUTIONS['storage_growth_annual_pct']
+        storage_growth_range = st.slider(
+            "Annual Storage Growth per Instance (%)", 0.0, 100.0, (storage_low, storage_high), 1.0
+        )
+        storage_growth_mode = st.number_input(
+            "Most Likely Storage Growth (%)", storage_growth_range[0], storage_growth_range[1],
+            min(max(storage_mode, storage_growth_range[0]), storage_growth_range[1]), 1.0
+        )
+        lead_time_range = st.slider("Hiring Lead Time (months)", 1, 12, (2, 6))
+    
+    simulation_distributions = {
+        'price_drift_annual_pct': ('normal', price_drift_mean, price_drift_sd),
+        'cluster_growth_factor': ('triangular', cluster_growth_range[0],
+                                  min(max(growth_mode, cluster_growth_range[0]), cluster_growth_range[1]),
+                                  cluster_growth_range[1]),
+        'storage_growth_annual_pct': ('triangular', storage_growth_range[0], storage_growth_mode,
+                                      storage_growth_range[1]),
+        'hire_lead_time_months': ('choice', tuple(range(lead_time_range[0], lead_time_range[1] + 1))),
     }
 
-def calculate_workforce_requirements(skills_requirements):
-    """Calculate workforce requirements in FTE (Full Time Equivalent) counts"""
-    
-    total_fte = sum(skills_requirements.values())
-    
-    return {
-        'total_fte': total_fte,
-        'breakdown': skills_requirements.copy()
-    }
+# Sidebar plan inputs passed explicitly to the planning engine
+plan = {
+    'deployment_type': deployment_type,
+    'current_clusters': current_clusters,
+    'current_resources': current_resources,
+    'instance_type': instance_type,
+    'current_cpu_cores': current_cpu_cores,
+    'current_memory_gb': current_memory_gb,
+    'current_storage_tb': current_storage_tb,
+    'ec2_per_cluster': ec2_per_cluster,
+    'licensing_model': licensing_model,
+    'sql_edition': sql_edition,
+    'ebs_volume_type': ebs_volume_type,
+    'storage_iops': storage_iops,
+    'storage_throughput_mbps': storage_throughput_mbps,
+    'enable_ssm_patching': enable_ssm_patching,
+    'enable_datadog': enable_datadog,
+    'target_clusters': target_clusters,
+    'timeframe': timeframe,
+    'availability_target': availability_target,
+    'rpo_minutes': rpo_minutes,
+    'rto_minutes': rto_minutes,
+    'support_24x7': support_24x7,
+    'region': region
+}
 
-def calculate_total_cost_of_ownership(clusters, automation_level, timeframe_months):
-    """Calculate infrastructure TCO and workforce FTE requirements with BYOL and Datadog support"""
-    
-    # Infrastructure costs (infrastructure only - no workforce costs)
-    infra_costs = calculate_infrastructure_costs(
-        clusters, instance_type, ec2_per_cluster, current_storage_tb, 
-        ebs_volume_type, enable_ssm_patching, sql_edition, licensing_model, enable_datadog
-    )
-    
-    # Workforce requirements (FTE counts, not costs)
-    skills_needed = calculate_skills_requirements(clusters, automation_level, support_24x7)
-    workforce_requirements = calculate_workforce_requirements(skills_needed)
-    
-    # Total infrastructure cost over timeframe
-    total_infrastructure_cost = infra_costs['total_monthly'] * timeframe_months
+try:
+    price_index.ec2_rate(instance_type, priced_edition(sql_edition, licensing_model))
+except MissingPriceError as e:
+    st.error(f"Pricing unavailable for this configuration: {e}")
+    st.stop()
+
+# Saved scenarios: plan and planning state with their results, in the local scenario store
+def scenario_widget_keys():
+    """Widget keys holding plan and panel values; cleared so an opened scenario's values take effect"""
+    
+    keys = [f"plan_{field}" for field in plan]
+    keys += [f"auto_{name}" for name in st.session_state.automation_components]
+    keys += [f"{prefix}_{practice}" for practice in st.session_state.itil_practices for prefix in ('itil', 'maturity')]
+    keys += [f"governance_{item}" for item in st.session_state.governance_framework]
+    keys += [f"current_{role}" for role in OPERATIONS_ROLES]
+    return keys
+
+def open_saved_scenario():
+    scenario = load_scenario(st.session_state.scenario_to_open, DEFAULT_SCENARIO_STORE_PATH)
+    if scenario is None:
+        return
+    for key in scenario_widget_keys():
+        st.session_state.pop(key, None)
+    for key in SCENARIO_STATE_KEYS:
+        if key in scenario['state']:
+            st.session_state[key] = scenario['state'][key]
+    st.session_state.scenario_plan = scenario['plan']
+    # Stored results stand in for the pipeline on the next run instead of a recompute
+    st.session_state.scenario_seed = {key: scenario[key] for key in ('content_hash', 'price_fingerprint', 'results')}
+
+st.sidebar.subheader("Saved Scenarios")
+scenario_name = st.sidebar.text_input("Scenario Name", placeholder="e.g. Q3 baseline")
+save_requested = st.sidebar.button("Save Scenario", disabled=not scenario_name.strip() or portfolio_mode,
+                                   help="Saved scenarios hold a single fleet; turn off portfolio mode to save"
+                                   if portfolio_mode else None)
+saved_scenario_panel = st.sidebar.container()
+
+# Panel widgets keep their latest values under their keys; copy them into the planning
+# state before any metric is computed so a full rerun never renders stale selections
+def sync_panel_state():
+    for comp_name, comp_data in st.session_state.automation_components.items():
+        comp_data['enabled'] = st.session_state.get(f"auto_{comp_name}", comp_data['enabled'])
+    
+    for practice, data in st.session_state.itil_practices.items():
+        data['implemented'] = st.session_state.get(f"itil_{practice}", data['implemented'])
+        if data['implemented']:
+            data['maturity'] = st.session_state.get(f"maturity_{practice}", data['maturity'])
+    
+    for item in st.session_state.governance_framework:
+        st.session_state.governance_framework[item] = st.session_state.get(
+            f"governance_{item}", st.session_state.governance_framework[item]
+        )
+
+sync_panel_state()
+
+@st.cache_data(max_entries=64)
+def run_tco_simulation(plan, automation_level, _price_index, price_fingerprint, config_params, current_skills,
+                       distributions, samples):
+    """Monte Carlo TCO bands; the price index is keyed by its fingerprint and the seed is fixed so reruns are stable"""
     
-    # NEW: Enhanced TCO breakdown with BYOL and Datadog support
-    tco_breakdown = {
-        'EC2 Compute': infra_costs['ec2_compute_monthly'] * timeframe_months,
-        'EBS Storage': infra_costs['ebs_monthly'] * timeframe_months,
-        'SSM Patching': infra_costs['ssm_monthly'] * timeframe_months,
-        'Data Transfer': infra_costs['data_transfer_monthly'] * timeframe_months,
-    }
+    return simulate_tco(plan, automation_level, _price_index, config_params, current_skills,
+                        distributions, samples, seed=7)
+
+def simulation_node(plan, automation_maturity, prices, config_params, current_skills, simulation_settings):
+    """Monte Carlo results when the simulation is enabled, otherwise None"""
     
-    # Add appropriate licensing cost based on model
-    if licensing_model == "BYOL (Bring Your Own License)":
-        tco_breakdown['BYOL Licensing'] = 0  # Customer provides licenses
-    else:
-        tco_breakdown['SQL Licensing (AWS)'] = infra_costs['sql_licensing_monthly'] * timeframe_months
+    if simulation_settings is None:
+        return None
+    return run_tco_simulation(plan, automation_maturity, prices, prices.fingerprint, config_params, current_skills,
+                              simulation_settings['distributions'], simulation_settings['samples'])
+
+def show_chart(fig):
+    """Render a figure with a caption reporting the JSON payload shipped to the browser"""
     
-    # Add Datadog if enabled
-    if enable_datadog:
-        tco_breakdown['Datadog Monitoring'] = infra_costs['datadog_monthly'] * timeframe_months
-    
-    return {
-        'infrastructure': infra_costs,
-        'workforce_requirements': workforce_requirements,
-        'skills_required': skills_needed,
-        'total_infrastructure_cost': total_infrastructure_cost,
-        'tco_breakdown': tco_breakdown
-    }
+    payload = figure_payload(fig)
+    st.plotly_chart(fig, use_container_width=True)
+    details = [f"{payload['bytes'] / 1024:,.1f} KB", f"{payload['points']:,} points"]
+    if payload['source_points'] > payload['points']:
+        details.append(f"LTTB-downsampled from {payload['source_points']:,}")
+    if payload['webgl']:
+        details.append("WebGL")
+    st.caption("Chart payload: " + " · ".join(details))
 
-# Calculate comprehensive enterprise metrics
-def calculate_enterprise_metrics():
-    """Calculate enterprise-grade operational metrics with workforce focus"""
-    
-    total_weight = sum(comp['weight'] for comp in st.session_state.automation_components.values())
-    enabled_weight = sum(comp['weight'] for comp in st.session_state.automation_components.values() if comp['enabled'])
-    automation_maturity = (enabled_weight / total_weight) * 100 if total_weight > 0 else 0
-    
-    # Calculate weighted workforce reduction potential
-    enabled_components = [comp for comp in st.session_state.automation_components.values() if comp['enabled']]
-    if enabled_components:
-        total_weight_enabled = sum(comp['weight'] for comp in enabled_components)
-        weighted_workforce_reduction = sum(
-            comp['workforce_reduction'] * (comp['weight'] / total_weight_enabled) 
-            for comp in enabled_components
-        )
-    else:
-        weighted_workforce_reduction = 0
+def build_forecast_figure(forecast, simulation):
+    """Scaling forecast chart with the Monte Carlo team size band when a simulation ran"""
     
-    current_ec2_instances = current_clusters * ec2_per_cluster
-    target_ec2_instances = target_clusters * ec2_per_cluster
-    scale_factor = target_clusters / current_clusters
+    months = [f"Month {d['month']}" for d in forecast]
+    clusters = [d['clusters'] for d in forecast]
+    team_sizes = [d['total_team_size'] for d in forecast]
+    automation_levels = [d['automation_maturity'] for d in forecast]
     
-    itil_implemented = sum(1 for practice in st.session_state.itil_practices.values() if practice['implemented'])
-    itil_total = len(st.session_state.itil_practices)
-    itil_maturity = (itil_implemented / itil_total * 100) if itil_total > 0 else 0
+    from plotly.subplots import make_subplots
     
-    required_skills = calculate_skills_requirements(target_clusters, automation_maturity, support_24x7)
-    total_skill_gap = sum(
-        max(0, required_skills[role] - st.session_state.current_skills.get(role, 0))
-        for role in required_skills.keys()
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Infrastructure Scale & Team Growth', 'Automation Maturity Progression (65% Cap)'),
+        specs=[[{"secondary_y": True}], [{"secondary_y": False}]]
     )
     
-    critical_components = sum(
-        1 for comp in st.session_state.automation_components.values()
-        if comp['enabled'] and comp['business_impact'] == 'Critical'
+    fig.add_trace(
+        go.Scatter(x=months, y=clusters, name="Infrastructure Clusters", line=dict(color='#1e40af', width=3)),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=months, y=team_sizes, name="Team Size", line=dict(color='#059669', width=3)),
+        row=1, col=1, secondary_y=True
     )
     
-    high_complexity_enabled = sum(
-        1 for comp in st.session_state.automation_components.values()
-        if comp['enabled'] and comp['technical_complexity'] == 'High'
+    fig.add_trace(
+        go.Scatter(x=months, y=automation_levels, name="Automation Maturity %", 
+                  line=dict(color='#dc2626', width=3), fill='tonexty'),
+        row=2, col=1
     )
     
-    # Risk assessment based on enterprise factors
-    risks = []
-    
-    if not st.session_state.automation_components['Zero-Trust Security Model']['enabled']:
-        risks.append({
-            'category': 'Security',
-            'risk': 'Inadequate security model for enterprise scale',
-            'severity': 'Critical',
-            'impact': 'Data breaches, unauthorized access, security incidents'
-        })
-    
-    if not st.session_state.automation_components['AI-Powered Monitoring']['enabled'] and target_clusters > 30:
-        risks.append({
-            'category': 'Operations',
-            'risk': 'Manual monitoring at enterprise scale',
-            'severity': 'High',
-            'impact': 'Delayed incident detection, performance degradation'
-        })
-    
-    if total_skill_gap > 3:  # Reduced threshold for more realistic alert
-        risks.append({
-            'category': 'Workforce',
-            'risk': 'Critical skills gap for enterprise operations',
-            'severity': 'High',
-            'impact': 'Operational failures, knowledge dependencies, staff burnout'
-        })
-    
-    if not st.session_state.automation_components['Cross-Region DR Automation']['enabled']:
-        risks.append({
-            'category': 'Business Continuity',
-            'risk': 'Manual disaster recovery procedures',
-            'severity': 'Critical',
-            'impact': 'Extended downtime, data loss, business disruption'
-        })
-    
-    return {
-        'automation_maturity': automation_maturity,
-        'workforce_reduction_potential': weighted_workforce_reduction,
-        'current_ec2_instances': current_ec2_instances,
-        'target_ec2_instances': target_ec2_instances,
-        'scale_factor': scale_factor,
-        'itil_maturity': itil_maturity,
-        'total_skill_gap': total_skill_gap,
-        'critical_components': critical_components,
-        'high_complexity_enabled': high_complexity_enabled,
-        'risks': risks
-    }
-
-metrics = calculate_enterprise_metrics()
+    if simulation:
+        # P10-P90 team size band from the Monte Carlo cluster growth and hiring samples
+        fig.add_trace(
+            go.Scatter(x=months, y=simulation['team_size_bands']['P90'], name="Team Size P90",
+                      line=dict(color='#059669', width=0), showlegend=False),
+            row=1, col=1, secondary_y=True
+        )
+        fig.add_trace(
+            go.Scatter(x=months, y=simulation['team_size_bands']['P10'], name="Team Size P10-P90",
+                      line=dict(color='#059669', width=0), fill='tonexty', fillcolor='rgba(5,150,105,0.15)'),
+            row=1, col=1, secondary_y=True
+        )
+    
+    # Add 65% automation cap line
+    fig.add_hline(y=65, line_dash="dash", line_color="red", 
+                  annotation_text="65% Automation Cap", row=2, col=1)
+    
+    fig.update_layout(height=500, title_text="Strategic Scaling Forecast with Practical Constraints")
+    fig.update_xaxes(title_text="Implementation Timeline", row=2, col=1)
+    fig.update_yaxes(title_text="Infrastructure Clusters", row=1, col=1)
+    fig.update_yaxes(title_text="Team Members (FTE)", row=1, col=1, secondary_y=True)
+    fig.update_yaxes(title_text="Automation Maturity (%)", row=2, col=1)
+    return optimize_figure(fig)
 
-# Calculate current and target scenarios
-current_tco = calculate_total_cost_of_ownership(current_clusters, metrics['automation_maturity'], timeframe)
-target_tco = calculate_total_cost_of_ownership(target_clusters, metrics['automation_maturity'], timeframe)
+def build_tco_figure(plan, target_tco, simulation):
+    """TCO component bars with Monte Carlo P50 markers and P10-P90 whiskers when a simulation ran"""
+    
+    fig_tco = go.Figure(data=[
+        go.Bar(
+            name='Cost Components',
+            x=list(target_tco['tco_breakdown'].keys()),
+            y=list(target_tco['tco_breakdown'].values()),
+            marker_color=['#1e40af', '#dc2626', '#059669', '#f59e0b', '#7c3aed', '#be123c', '#10b981'][:len(target_tco['tco_breakdown'])]
+        )
+    ])
+    
+    if simulation:
+        # Monte Carlo P50 per component with P10-P90 whiskers
+        components = list(target_tco['tco_breakdown'].keys())
+        bands = [simulation['tco_breakdown'][component] for component in components]
+        fig_tco.add_trace(go.Scatter(
+            name='Monte Carlo P50 (P10-P90)',
+            x=components,
+            y=[band['P50'] for band in bands],
+            mode='markers',
+            marker=dict(color='#111827', size=9, symbol='diamond'),
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=[band['P90'] - band['P50'] for band in bands],
+                arrayminus=[band['P50'] - band['P10'] for band in bands]
+            )
+        ))
+    
+    fig_tco.update_layout(
+        title=f"Total Cost of Ownership Analysis - {plan['timeframe']} Month Projection (v7.0: {plan['licensing_model']}{'+ Datadog' if plan['enable_datadog'] else ''})",
+        xaxis_title="Cost Components",
+        yaxis_title="Total Cost (USD)",
+        height=400,
+        font=dict(family="Arial, sans-serif", size=12),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return optimize_figure(fig_tco)
+
+def build_page_graph():
+    """Engine pipeline (rolled up from the portfolio groups in portfolio mode) plus the page's simulation and
+    chart nodes; outputs persist in the session"""
+    
+    graph_factory = portfolio_planning_graph if portfolio_mode else planning_graph
+    graph = graph_factory(outputs=st.session_state.setdefault('pipeline_outputs', {}))
+    graph.add('simulation', simulation_node,
+              inputs=('automation_maturity', 'prices', 'config_params', 'current_skills', 'simulation_settings'),
+              plan_keys=SIMULATION_KEYS)
+    graph.add('forecast_figure', build_forecast_figure, inputs=('forecast', 'simulation'))
+    graph.add('tco_figure', build_tco_figure, inputs=('target_tco', 'simulation'),
+              plan_keys=('timeframe', 'licensing_model', 'enable_datadog'))
+    return graph
+
+# Only pipeline stages whose inputs changed since the last run are recomputed
+section("pipeline")
+page_graph = build_page_graph()
+page_sources = {
+    'plan': plan,
+    'prices': price_index,
+    'automation_components': st.session_state.automation_components,
+    'itil_practices': st.session_state.itil_practices,
+    'governance_framework': st.session_state.governance_framework,
+    'current_skills': st.session_state.current_skills,
+    'config_params': st.session_state.config_params,
+    'simulation_settings': (
+        {'distributions': simulation_distributions, 'samples': simulation_samples} if enable_simulation else None
+    ),
+}
+if portfolio_mode:
+    page_sources['portfolio'] = portfolio_groups
+scenario_seed = st.session_state.pop('scenario_seed', None)
+if (scenario_seed and not portfolio_mode and scenario_seed['price_fingerprint'] == price_index.fingerprint
+        and scenario_seed['content_hash'] == scenario_hash(plan, st.session_state)):
+    page_graph.seed(page_sources, scenario_seed['results'])
+page_results = page_graph.evaluate(page_sources)
+startup_profile.mark('pipeline')
+metrics = page_results['metrics']
+current_tco = page_results['current_tco']
+target_tco = page_results['target_tco']
+baseline_tco = page_results['baseline_tco']
+forecast_data = page_results['forecast']
+simulation = page_results['simulation']
+
+if portfolio_mode:
+    # Page text follows the groups' licensing and monitoring rather than the single-fleet sidebar choices
+    licensing_model = target_tco['infrastructure']['licensing_model']
+    enable_datadog = target_tco['infrastructure']['datadog_monthly'] > 0
+    
+    with portfolio_results_panel:
+        group_costs = page_results['portfolio_costs']['target']
+        st.dataframe(
+            group_costs[['group', 'clusters', 'total_instances', 'ec2_compute_monthly', 'sql_licensing_monthly',
+                         'ebs_monthly', 'total_monthly']].rename(columns={
+                'group': 'Group', 'clusters': 'Target Clusters', 'total_instances': 'Instances',
+                'ec2_compute_monthly': 'EC2 ($/month)', 'sql_licensing_monthly': 'SQL Licensing ($/month)',
+                'ebs_monthly': 'EBS ($/month)', 'total_monthly': 'Total ($/month)'
+            }).round(0),
+            hide_index=True,
+            use_container_width=True
+        )
+        if 'portfolio_costs' in page_graph.last_run['recomputed']:
+            repriced = sum(costs.attrs.get('repriced_groups', 0) for costs in page_results['portfolio_costs'].values())
+            pricing_note = f"{repriced} new group configurations priced this run"
+        else:
+            pricing_note = "groups unchanged since the last run"
+        st.caption(f"{len(group_costs)} groups · {target_tco['infrastructure']['total_instances']:,} target "
+                   f"instances · ${target_tco['infrastructure']['total_monthly']:,.0f}/month · {pricing_note}")
+
+if save_requested:
+    save_scenario(scenario_name.strip(), plan, st.session_state, page_results, price_index, DEFAULT_SCENARIO_STORE_PATH)
+    st.sidebar.success(f"Saved scenario '{scenario_name.strip()}'")
+
+with saved_scenario_panel:
+    saved_scenarios = list_scenarios(DEFAULT_SCENARIO_STORE_PATH)
+    if saved_scenarios:
+        st.selectbox("Saved Scenario", [scenario['name'] for scenario in saved_scenarios], key='scenario_to_open',
+                     help="Most recently saved first")
+        st.button("Open Scenario", on_click=open_saved_scenario)
+    else:
+        st.caption("No saved scenarios yet")
 
 # Executive Dashboard with Cost Metrics
+section("executive dashboard")
 st.markdown('<div class="section-header">Executive Dashboard & Financial Analysis (v7.0)</div>', unsafe_allow_html=True)
 
 # Cost summary section with NEW features highlighted
@@ -911,11 +993,14 @@ with col1:
         <p><strong>{licensing_badge}</strong> {datadog_badge}</p>
     </div>
     """, unsafe_allow_html=True)
+    
+    if simulation:
+        tco_band = simulation['total_infrastructure_cost']
+        st.caption(f"Monte Carlo ({simulation['samples']:,} samples): P10 ${tco_band['P10']:,.0f} | "
+                   f"P50 ${tco_band['P50']:,.0f} | P90 ${tco_band['P90']:,.0f}")
 
 with col2:
     # Calculate workforce savings through automation
-    baseline_automation = 0  # No automation scenario
-    baseline_tco = calculate_total_cost_of_ownership(target_clusters, baseline_automation, timeframe)
     fte_reduction = baseline_tco['workforce_requirements']['total_fte'] - target_tco['workforce_requirements']['total_fte']
     
     st.markdown(f"""
@@ -963,6 +1048,7 @@ with col6:
     st.metric("Total Compute Instances", f"{metrics['target_ec2_instances']}")
 
 # NEW: Licensing & Monitoring Cost Analysis Section
+section("licensing & monitoring costs")
 st.markdown('<div class="section-header">🆕 Licensing & Monitoring Cost Analysis</div>', unsafe_allow_html=True)
 
 col1, col2, col3 = st.columns(3)
@@ -972,23 +1058,19 @@ with col1:
     <div class="executive-summary">
         <h4>SQL Server Licensing Analysis</h4>
         <p><strong>Model:</strong> {licensing_model}</p>
-        <p><strong>Edition:</strong> SQL Server {sql_edition}</p>
+        <p><strong>Edition:</strong> SQL Server {target_tco['infrastructure']['sql_edition']}</p>
         <p><strong>Total Instances:</strong> {target_tco['infrastructure']['total_instances']}</p>
     </div>
     """, unsafe_allow_html=True)
     
     if licensing_model == "BYOL (Bring Your Own License)":
         st.metric("AWS Licensing Cost", "$0 (BYOL)")
-        # Estimate external BYOL costs
-        if sql_edition == "Enterprise":
-            est_annual_per_core = 14256
-        elif sql_edition == "Standard":
-            est_annual_per_core = 3717
+        # Estimate external BYOL costs (assume 4 cores per instance)
+        if portfolio_mode:
+            est_total_annual = (page_results['licensing']['estimated_byol_annual_per_instance']
+                                * target_tco['infrastructure']['total_instances'])
         else:
-            est_annual_per_core = 1435
-        
-        est_cores = 4  # Assume 4 cores per instance
-        est_total_annual = est_annual_per_core * est_cores * target_tco['infrastructure']['total_instances']
+            est_total_annual = estimate_byol_annual_cost(sql_edition, target_tco['infrastructure']['total_instances'])
         st.caption(f"Est. External BYOL Cost: ${est_total_annual:,.0f}/year")
     else:
         monthly_licensing = target_tco['infrastructure']['sql_licensing_monthly']
@@ -1052,6 +1134,7 @@ with col3:
         st.info("Using BYOL + Basic monitoring (lowest cost option)")
 
 # Workforce Planning with practical parameters
+section("workforce planning")
 st.markdown('<div class="section-header">Workforce Planning & Resource Requirements</div>', unsafe_allow_html=True)
 
 st.markdown(f"""
@@ -1071,8 +1154,7 @@ st.markdown('<div class="subsection-header">Current Resource Allocation</div>',
 st.write("Configure current staffing levels for operational assessment:")
 
 skills_input_cols = st.columns(3)
-operations_roles = ['SQL Server DBA Expert', 'Infrastructure Automation', 'ITIL Service Manager']
-for i, role in enumerate(operations_roles):
+for i, role in enumerate(OPERATIONS_ROLES):
     col_idx = i % 3
     with skills_input_cols[col_idx]:
         current_count = st.number_input(
@@ -1087,7 +1169,7 @@ for i, role in enumerate(operations_roles):
 # Calculate requirements and create comparison table
 st.markdown('<div class="subsection-header">Resource Gap Analysis</div>', unsafe_allow_html=True)
 
-required_skills = calculate_skills_requirements(target_clusters, metrics['automation_maturity'], support_24x7)
+required_skills = calculate_skills_requirements(target_clusters, metrics['automation_maturity'], support_24x7, st.session_state.config_params)
 
 skills_certifications = {
     'SQL Server DBA Expert': 'Microsoft Certified: Azure Database Administrator', 
@@ -1180,125 +1262,15 @@ with col2:
         st.markdown(f'<div class="alert-info">Practical automation framework reduces staffing requirements by approximately {metrics["workforce_reduction_potential"]:.0f}%</div>', unsafe_allow_html=True)
 
 # Monthly Forecasting System with realistic hiring lead times
+section("monthly forecast")
 st.markdown("---")
 st.markdown('<div class="subsection-header">Strategic Resource Planning Forecast</div>', unsafe_allow_html=True)
 
-def calculate_monthly_forecast():
-    """Calculate month-by-month scaling forecast with realistic hiring lead times"""
-    
-    cluster_growth_per_month = (target_clusters - current_clusters) / timeframe
-    automation_start = metrics['automation_maturity']
-    
-    # Cap automation target at 65% maximum
-    automation_target = min(st.session_state.config_params['max_automation_maturity'], automation_start + 35)
-    automation_growth_per_month = (automation_target - automation_start) / timeframe
-    
-    forecast_data = []
-    
-    for month in range(timeframe + 1):
-        month_clusters = current_clusters + (cluster_growth_per_month * month)
-        month_automation = automation_start + (automation_growth_per_month * month)
-        
-        # Ensure automation doesn't exceed 65% maximum
-        month_automation = min(month_automation, st.session_state.config_params['max_automation_maturity'])
-        
-        month_required_skills = calculate_skills_requirements(
-            int(month_clusters), 
-            month_automation, 
-            support_24x7
-        )
-        
-        # Role-specific hiring lead times (more realistic)
-        hire_lead_time = 4  # Increased from 3 for specialized roles
-        target_month_for_hiring = month + hire_lead_time
-        if target_month_for_hiring <= timeframe:
-            target_clusters_for_hiring = current_clusters + (cluster_growth_per_month * target_month_for_hiring)
-            target_automation_for_hiring = automation_start + (automation_growth_per_month * target_month_for_hiring)
-            target_automation_for_hiring = min(target_automation_for_hiring, st.session_state.config_params['max_automation_maturity'])
-            target_skills_for_hiring = calculate_skills_requirements(
-                int(target_clusters_for_hiring), 
-                target_automation_for_hiring, 
-                support_24x7
-            )
-        else:
-            target_skills_for_hiring = month_required_skills
-        
-        current_total = sum(st.session_state.current_skills.get(role, 0) for role in month_required_skills.keys())
-        if month == 0:
-            previous_required = current_total
-        else:
-            previous_required = sum(forecast_data[-1]['required_skills'].values())
-        
-        new_hires_needed = {}
-        total_new_hires = 0
-        
-        for role in month_required_skills.keys():
-            current_role_staff = st.session_state.current_skills.get(role, 0)
-            if month == 0:
-                previous_role_required = current_role_staff
-            else:
-                previous_role_required = forecast_data[-1]['required_skills'].get(role, 0)
-            
-            target_role_required = target_skills_for_hiring.get(role, 0)
-            new_hires_this_role = max(0, target_role_required - previous_role_required)
-            new_hires_needed[role] = new_hires_this_role
-            total_new_hires += new_hires_this_role
-        
-        forecast_data.append({
-            'month': month,
-            'clusters': int(month_clusters),
-            'automation_maturity': month_automation,
-            'required_skills': month_required_skills,
-            'new_hires_needed': new_hires_needed,
-            'total_new_hires': total_new_hires,
-            'total_team_size': sum(month_required_skills.values())
-        })
-    
-    return forecast_data
-
-forecast_data = calculate_monthly_forecast()
-
 # Create forecast visualization
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    months = [f"Month {d['month']}" for d in forecast_data]
-    clusters = [d['clusters'] for d in forecast_data]
-    team_sizes = [d['total_team_size'] for d in forecast_data]
-    automation_levels = [d['automation_maturity'] for d in forecast_data]
-    
-    fig = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=('Infrastructure Scale & Team Growth', 'Automation Maturity Progression (65% Cap)'),
-        specs=[[{"secondary_y": True}], [{"secondary_y": False}]]
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=months, y=clusters, name="Infrastructure Clusters", line=dict(color='#1e40af', width=3)),
-        row=1, col=1
-    )
-    fig.add_trace(
-        go.Scatter(x=months, y=team_sizes, name="Team Size", line=dict(color='#059669', width=3)),
-        row=1, col=1, secondary_y=True
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=months, y=automation_levels, name="Automation Maturity %", 
-                  line=dict(color='#dc2626', width=3), fill='tonexty'),
-        row=2, col=1
-    )
-    
-    # Add 65% automation cap line
-    fig.add_hline(y=65, line_dash="dash", line_color="red", 
-                  annotation_text="65% Automation Cap", row=2, col=1)
-    
-    fig.update_layout(height=500, title_text="Strategic Scaling Forecast with Practical Constraints")
-    fig.update_xaxes(title_text="Implementation Timeline", row=2, col=1)
-    fig.update_yaxes(title_text="Infrastructure Clusters", row=1, col=1)
-    fig.update_yaxes(title_text="Team Members (FTE)", row=1, col=1, secondary_y=True)
-    fig.update_yaxes(title_text="Automation Maturity (%)", row=2, col=1)
-    
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(page_results['forecast_figure'])
 
 with col2:
     st.markdown("### Key Forecast Metrics")
@@ -1310,6 +1282,9 @@ with col2:
     st.metric("Total New Positions", f"{total_hires_needed}")
     st.metric("Peak Monthly Hiring", f"{peak_monthly_hires}")
     st.metric("Final Team Size", f"{final_team_size} FTE")
+    if simulation:
+        st.caption(f"Monte Carlo P10-P90: {simulation['final_team_size']['P10']}-{simulation['final_team_size']['P90']} FTE, "
+                   f"{simulation['total_new_hires']['P10']}-{simulation['total_new_hires']['P90']} new positions")
     st.metric("Final Automation Level", f"{forecast_data[-1]['automation_maturity']:.0f}%")
     
     urgent_months = [d for d in forecast_data if d['total_new_hires'] > 2]
@@ -1337,7 +1312,7 @@ for data in forecast_data:
             'Automation %': f"{data['automation_maturity']:.0f}%"
         }
         
-        for role in ['SQL Server DBA Expert', 'Infrastructure Automation', 'ITIL Service Manager']:
+        for role in OPERATIONS_ROLES:
             if data['new_hires_needed'].get(role, 0) > 0:
                 month_row[f'{role} Positions'] = data['new_hires_needed'][role]
         
@@ -1346,38 +1321,81 @@ for data in forecast_data:
 breakdown_df = pd.DataFrame(monthly_breakdown)
 st.dataframe(breakdown_df, use_container_width=True)
 
+# Interactive panels run as fragments: a toggle reruns only its own panel. Page-wide
+# results (dashboard, TCO, workforce, risks) depend on the panels through
+# calculate_enterprise_metrics and the governance maturity, so each panel compares
+# those values against the ones the page was rendered with and offers a full
+# rerun only when they differ.
+dashboard_governance_maturity = page_results['governance_maturity']
+
+def render_dashboard_refresh(panel, plan, dashboard_metrics, dashboard_governance):
+    """Show an update prompt when panel changes affect page-wide results"""
+    
+    live_metrics = calculate_enterprise_metrics(
+        plan,
+        st.session_state.automation_components,
+        st.session_state.itil_practices,
+        st.session_state.current_skills,
+        st.session_state.config_params
+    )
+    # The panels never change instance counts; portfolio mode replaces them with per-group sums
+    for key in ('current_ec2_instances', 'target_ec2_instances'):
+        live_metrics[key] = dashboard_metrics[key]
+    live_governance = calculate_governance_maturity(st.session_state.governance_framework)
+    
+    if live_metrics == dashboard_metrics and live_governance == dashboard_governance:
+        return
+    
+    st.info(f"Selections changed: automation {live_metrics['automation_maturity']:.0f}% "
+            f"(page shows {dashboard_metrics['automation_maturity']:.0f}%), "
+            f"ITIL coverage {live_metrics['itil_maturity']:.0f}% "
+            f"(page shows {dashboard_metrics['itil_maturity']:.0f}%), "
+            f"governance {live_governance:.0f}% (page shows {dashboard_governance:.0f}%).")
+    if st.button("Update dashboard & cost analysis", key=f"refresh_{panel}"):
+        st.rerun()
+
 # ITIL 4 Service Management Framework
+section("ITIL panel")
 st.markdown('<div class="section-header">ITIL 4 Service Management Framework</div>', unsafe_allow_html=True)
 
-itil_cols = st.columns(4)
-for i, (practice, data) in enumerate(st.session_state.itil_practices.items()):
-    col_idx = i % 4
-    with itil_cols[col_idx]:
-        implemented = st.checkbox(
-            f"**{practice}**",
-            value=data['implemented'],
-            key=f"itil_{practice}"
-        )
-        
-        if implemented:
-            maturity = st.selectbox(
-                "Maturity Level",
-                ["Initial", "Defined", "Managed", "Optimized"],
-                index=["Initial", "Defined", "Managed", "Optimized"].index(data['maturity']),
-                key=f"maturity_{practice}"
+@st.fragment
+def itil_panel(plan, dashboard_metrics, dashboard_governance):
+    """ITIL practice grid; reruns on its own when a practice changes"""
+    
+    itil_cols = st.columns(4)
+    for i, (practice, data) in enumerate(st.session_state.itil_practices.items()):
+        col_idx = i % 4
+        with itil_cols[col_idx]:
+            implemented = st.checkbox(
+                f"**{practice}**",
+                value=data['implemented'],
+                key=f"itil_{practice}"
             )
-            st.session_state.itil_practices[practice]['maturity'] = maturity
         
-        priority_indicator = {
-            'Critical': '🔴 HIGH PRIORITY',
-            'High': '🟡 MEDIUM PRIORITY', 
-            'Medium': '🟢 STANDARD PRIORITY'
-        }
-        st.caption(f"{priority_indicator[data['priority']]}")
+            if implemented:
+                maturity = st.selectbox(
+                    "Maturity Level",
+                    ["Initial", "Defined", "Managed", "Optimized"],
+                    index=["Initial", "Defined", "Managed", "Optimized"].index(data['maturity']),
+                    key=f"maturity_{practice}"
+                )
+                st.session_state.itil_practices[practice]['maturity'] = maturity
+        
+            priority_indicator = {
+                'Critical': '🔴 HIGH PRIORITY',
+                'High': '🟡 MEDIUM PRIORITY', 
+                'Medium': '🟢 STANDARD PRIORITY'
+            }
+            st.caption(f"{priority_indicator[data['priority']]}")
         
-        st.session_state.itil_practices[practice]['implemented'] = implemented
+            st.session_state.itil_practices[practice]['implemented'] = implemented
+    
+    render_dashboard_refresh("itil", plan, dashboard_metrics, dashboard_governance)
+
+itil_panel(plan, metrics, dashboard_governance_maturity)
 
 # Enhanced Automation Components
+section("automation panel")
 st.markdown('<div class="section-header">Enterprise Automation Framework</div>', unsafe_allow_html=True)
 
 categories = {
@@ -1390,44 +1408,106 @@ categories = {
     'Portal': 'Self-Service Portal'
 }
 
-tabs = st.tabs([f"{cat}" for cat in categories.values()])
+def apply_automation_selection(selected):
+    """Enable exactly the optimizer's components (runs as a callback, before the widgets are drawn)"""
+    
+    for comp_name, comp_data in st.session_state.automation_components.items():
+        comp_data['enabled'] = comp_name in selected
+        st.session_state[f"auto_{comp_name}"] = comp_name in selected
 
-for tab, (category, display_name) in zip(tabs, categories.items()):
-    with tab:
-        category_components = [
-            (name, comp) for name, comp in st.session_state.automation_components.items()
-            if comp['category'] == category
-        ]
+def render_automation_optimizer(plan):
+    with st.expander("Automation Portfolio Optimizer", expanded=False):
+        components = st.session_state.automation_components
+        opt_col1, opt_col2, opt_col3 = st.columns(3)
+        
+        with opt_col1:
+            objective_label = st.radio(
+                "Optimize For",
+                ["Automation Maturity", "FTE Reduction"],
+                help="FTE Reduction finds the least effort that reaches the lowest FTE at the target scale, "
+                     "including the per-role automation caps"
+            )
+        with opt_col2:
+            effort_budget = st.number_input(
+                "Effort Budget (hours)", min_value=0, max_value=int(sum(c['effort'] for c in components.values())),
+                value=min(1000, int(sum(c['effort'] for c in components.values()))), step=40
+            )
+        with opt_col3:
+            keep_enabled = st.checkbox(
+                "Keep enabled components", value=False,
+                help="Treat currently enabled components as already built: they stay on and use no budget"
+            )
+        
+        result = optimize_automation(
+            components, effort_budget, plan,
+            'automation_maturity' if objective_label == "Automation Maturity" else 'fte_reduction',
+            st.session_state.config_params,
+            locked=[name for name, comp in components.items() if comp['enabled']] if keep_enabled else ()
+        )
         
-        for comp_name, comp_data in category_components:
-            col1, col2 = st.columns([3, 1])
+        res_col1, res_col2, res_col3, res_col4 = st.columns(4)
+        res_col1.metric("Automation Maturity", f"{result['automation_maturity']:.0f}%")
+        res_col2.metric("Target FTE", f"{result['total_fte']}", f"-{result['fte_reduction']} vs no automation")
+        res_col3.metric("Effort Used", f"{result['total_effort']:,.0f} h", f"of {effort_budget:,} h budget", delta_color="off")
+        res_col4.metric("Components", f"{len(result['selected'])} of {len(components)}")
+        
+        if objective_label == "FTE Reduction" and result['fte_reduction'] == 0:
+            st.caption(f"Automation does not lower FTE at {plan['target_clusters']} clusters; "
+                       f"role ratios and minimum staffing already bound the team.")
+        
+        st.write(", ".join(result['selected']) if result['selected'] else "No components selected")
+        st.button("Apply Selection", key="apply_automation_selection",
+                  on_click=apply_automation_selection, args=(set(result['selected']),))
+
+@st.fragment
+def automation_panel(plan, dashboard_metrics, dashboard_governance):
+    """Automation component tabs; reruns on its own when a component is toggled"""
+    
+    render_automation_optimizer(plan)
+    
+    tabs = st.tabs([f"{cat}" for cat in categories.values()])
+
+    for tab, (category, display_name) in zip(tabs, categories.items()):
+        with tab:
+            category_components = [
+                (name, comp) for name, comp in st.session_state.automation_components.items()
+                if comp['category'] == category
+            ]
+        
+            for comp_name, comp_data in category_components:
+                col1, col2 = st.columns([3, 1])
             
-            with col1:
-                enabled = st.checkbox(
-                    f"**{comp_name}**",
-                    value=comp_data['enabled'],
-                    key=f"auto_{comp_name}"
-                )
+                with col1:
+                    enabled = st.checkbox(
+                        f"**{comp_name}**",
+                        value=comp_data['enabled'],
+                        key=f"auto_{comp_name}"
+                    )
                 
-                st.caption(comp_data['description'])
+                    st.caption(comp_data['description'])
                 
-                impact_levels = {'Critical': '🔴 CRITICAL', 'High': '🟡 HIGH', 'Medium': '🟢 MEDIUM'}
-                complexity_levels = {'High': '🔴 HIGH', 'Medium': '🟡 MEDIUM', 'Low': '🟢 LOW'}
+                    impact_levels = {'Critical': '🔴 CRITICAL', 'High': '🟡 HIGH', 'Medium': '🟢 MEDIUM'}
+                    complexity_levels = {'High': '🔴 HIGH', 'Medium': '🟡 MEDIUM', 'Low': '🟢 LOW'}
                 
-                st.caption(f"**Business Impact:** {impact_levels[comp_data['business_impact']]} | "
-                          f"**Technical Complexity:** {complexity_levels[comp_data['technical_complexity']]} | "
-                          f"**Workforce Reduction:** {comp_data['workforce_reduction']}%")
+                    st.caption(f"**Business Impact:** {impact_levels[comp_data['business_impact']]} | "
+                              f"**Technical Complexity:** {complexity_levels[comp_data['technical_complexity']]} | "
+                              f"**Workforce Reduction:** {comp_data['workforce_reduction']}%")
                 
-                st.session_state.automation_components[comp_name]['enabled'] = enabled
+                    st.session_state.automation_components[comp_name]['enabled'] = enabled
             
-            with col2:
-                st.write(f"**Priority Weight:** {comp_data['weight']}%")
-                st.write(f"**Implementation Effort:** {comp_data['effort']} hours")
-                st.write(f"**Workforce Reduction:** {comp_data['workforce_reduction']}%")
+                with col2:
+                    st.write(f"**Priority Weight:** {comp_data['weight']}%")
+                    st.write(f"**Implementation Effort:** {comp_data['effort']} hours")
+                    st.write(f"**Workforce Reduction:** {comp_data['workforce_reduction']}%")
             
-            st.markdown("---")
+                st.markdown("---")
+    
+    render_dashboard_refresh("automation", plan, dashboard_metrics, dashboard_governance)
+
+automation_panel(plan, metrics, dashboard_governance_maturity)
 
 # Enterprise Risk Assessment
+section("risk assessment")
 st.markdown('<div class="section-header">Enterprise Risk Assessment & Governance</div>', unsafe_allow_html=True)
 
 if metrics['risks']:
@@ -1444,6 +1524,7 @@ else:
     st.success("Enterprise risk profile is well-managed with current automation strategy implementation.")
 
 # Industry Benchmark Comparison
+section("industry benchmarks")
 st.markdown('<div class="section-header">Industry Benchmark Assessment</div>', unsafe_allow_html=True)
 
 benchmark_scores = {
@@ -1508,6 +1589,7 @@ for metric_name, scores in benchmark_scores.items():
     """, unsafe_allow_html=True)
 
 # Enterprise Governance Framework
+section("governance panel")
 st.markdown('<div class="section-header">Enterprise Governance Framework</div>', unsafe_allow_html=True)
 
 st.markdown("""
@@ -1517,23 +1599,32 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-governance_cols = st.columns(3)
-governance_items = list(st.session_state.governance_framework.keys())
+@st.fragment
+def governance_panel(plan, dashboard_metrics, dashboard_governance):
+    """Governance body checkboxes; reruns on its own when a body is toggled"""
+    
+    governance_cols = st.columns(3)
+    governance_items = list(st.session_state.governance_framework.keys())
 
-for i, item in enumerate(governance_items):
-    col_idx = i % 3
-    with governance_cols[col_idx]:
-        enabled = st.checkbox(
-            item.replace('_', ' ').title(),
-            value=st.session_state.governance_framework[item],
-            key=f"governance_{item}"
-        )
-        st.session_state.governance_framework[item] = enabled
+    for i, item in enumerate(governance_items):
+        col_idx = i % 3
+        with governance_cols[col_idx]:
+            enabled = st.checkbox(
+                item.replace('_', ' ').title(),
+                value=st.session_state.governance_framework[item],
+                key=f"governance_{item}"
+            )
+            st.session_state.governance_framework[item] = enabled
+
+    
+    st.metric("Governance Maturity Level", f"{calculate_governance_maturity(st.session_state.governance_framework):.0f}%")
+    render_dashboard_refresh("governance", plan, dashboard_metrics, dashboard_governance)
 
-governance_maturity = sum(st.session_state.governance_framework.values()) / len(st.session_state.governance_framework) * 100
-st.metric("Governance Maturity Level", f"{governance_maturity:.0f}%")
+governance_panel(plan, metrics, dashboard_governance_maturity)
+governance_maturity = page_results['governance_maturity']
 
 # Cost Analysis Sections
+section("cost methodology")
 st.markdown("---")
 st.markdown('<div class="section-header">Comprehensive Cost Analysis (v7.0)</div>', unsafe_allow_html=True)
 
@@ -1541,25 +1632,26 @@ st.markdown('<div class="section-header">Comprehensive Cost Analysis (v7.0)</div
 st.markdown("### Detailed Cost Calculation Methodology")
 
 with st.expander("Infrastructure Cost Calculations", expanded=False):
+    if portfolio_mode:
+        st.info("Portfolio mode: this walkthrough follows the sidebar's single-fleet configuration. "
+                "Per-group costs are in the Cluster Group Portfolio table.")
     st.markdown("#### Infrastructure Components Breakdown")
     
     # Get current pricing for display
-    windows_rate = pricing_data['ec2_windows'].get(instance_type, 0.456)
+    windows_rate = price_index.ec2_rate(instance_type, 'Windows')
     
     if licensing_model == "BYOL (Bring Your Own License)":
         compute_rate = windows_rate
         licensing_rate = 0
         licensing_desc = "🆕 BYOL (Customer Licenses)"
     else:
-        edition_key_map = {"Web": "ec2_sql_web", "Standard": "ec2_sql_standard", "Enterprise": "ec2_sql_enterprise"}
-        edition_key = edition_key_map.get(sql_edition, "ec2_sql_standard")
-        sql_rate = pricing_data[edition_key].get(instance_type, windows_rate * 2)
+        sql_rate = price_index.ec2_rate(instance_type, sql_edition)
         licensing_rate = sql_rate - windows_rate
         compute_rate = sql_rate
         licensing_desc = f"SQL {sql_edition} License-Included"
     
     total_instances = target_clusters * ec2_per_cluster
-    ebs_rate_per_gb = pricing_data['ebs'][ebs_volume_type]
+    ebs_rate_per_gb = price_index.ebs_rate(ebs_volume_type)
     storage_gb = current_storage_tb * 1024
     
     st.markdown(f"""
@@ -1573,17 +1665,34 @@ with st.expander("Infrastructure Cost Calculations", expanded=False):
     - Total Instances: {target_clusters} clusters × {ec2_per_cluster} instances = {total_instances} instances
     - Monthly Compute Cost: {total_instances} × ${compute_rate:.3f} × 24 × 30 = ${total_instances * compute_rate * 24 * 30:,.0f}
     - **{timeframe}-Month Total**: ${total_instances * compute_rate * 24 * 30 * timeframe:,.0f}
-    
-    **EBS Storage:**
-    - Volume Type: {ebs_volume_type.upper()}
-    - Rate: ${ebs_rate_per_gb}/GB/month (updated pricing)
-    - Storage per Instance: {current_storage_tb} TB = {storage_gb:,.0f} GB
-    - Monthly Storage Cost: {total_instances} instances × {storage_gb:,.0f} GB × ${ebs_rate_per_gb} = ${total_instances * storage_gb * ebs_rate_per_gb:,.0f}
-    - **{timeframe}-Month Total**: ${total_instances * storage_gb * ebs_rate_per_gb * timeframe:,.0f}
     """)
     
+    storage_layout = target_tco['infrastructure'].get('storage_layout')
+    if storage_layout is None:
+        st.markdown(f"""
+        **EBS Storage:**
+        - Volume Type: {ebs_volume_type.upper()}
+        - Rate: ${ebs_rate_per_gb}/GB/month (updated pricing)
+        - Storage per Instance: {current_storage_tb} TB = {storage_gb:,.0f} GB
+        - Monthly Storage Cost: {total_instances} instances × {storage_gb:,.0f} GB × ${ebs_rate_per_gb} = ${total_instances * storage_gb * ebs_rate_per_gb:,.0f}
+        - **{timeframe}-Month Total**: ${total_instances * storage_gb * ebs_rate_per_gb * timeframe:,.0f}
+        """)
+    else:
+        volume_lines = "\n".join(
+            f"        - {volume.title()}: {storage_layout[f'{volume}_volumes']} × {storage_layout[f'{volume}_type']} "
+            f"{storage_layout[f'{volume}_size_gb']:,.0f} GB, {storage_layout[f'{volume}_iops']:,.0f} IOPS, "
+            f"{storage_layout[f'{volume}_throughput_mbps']:,.0f} MB/s = ${storage_layout[f'{volume}_monthly']:,.2f}/month"
+            for volume in STORAGE_LAYOUT
+        )
+        st.markdown(f"""
+        **EBS Storage (sized for {storage_iops:,} IOPS / {storage_throughput_mbps:,} MB/s per instance):**
+{volume_lines}
+        - Monthly Storage Cost: {total_instances} instances × ${storage_layout['storage_monthly']:,.2f} = ${total_instances * storage_layout['storage_monthly']:,.0f}
+        - **{timeframe}-Month Total**: ${total_instances * storage_layout['storage_monthly'] * timeframe:,.0f}
+        """)
+    
     if enable_ssm_patching:
-        ssm_rate = pricing_data['ssm']['patch_manager']
+        ssm_rate = price_index.ssm_rate()
         monthly_ssm = ssm_rate * 24 * 30 * total_instances
         st.markdown(f"""
         **Systems Manager Patching:**
@@ -1602,26 +1711,20 @@ with st.expander("Infrastructure Cost Calculations", expanded=False):
         - **Includes**: Infrastructure monitoring, APM, log analytics, synthetic monitoring, custom dashboards
         """)
     
-    data_transfer_monthly = target_clusters * (20 if deployment_type == "AlwaysOn Cluster" else 8)
+    transfer_rate = data_transfer_rate(deployment_type)
+    data_transfer_monthly = target_clusters * transfer_rate
     st.markdown(f"""
     **Data Transfer (updated estimates):**
-    - Rate: ${20 if deployment_type == "AlwaysOn Cluster" else 8}/cluster/month (reduced from previous estimates)
-    - Monthly Cost: {target_clusters} clusters × ${20 if deployment_type == "AlwaysOn Cluster" else 8} = ${data_transfer_monthly:,.0f}
+    - Rate: ${transfer_rate}/cluster/month (reduced from previous estimates)
+    - Monthly Cost: {target_clusters} clusters × ${transfer_rate} = ${data_transfer_monthly:,.0f}
     - **{timeframe}-Month Total**: ${data_transfer_monthly * timeframe:,.0f}
     
     **Infrastructure Grand Total**: ${target_tco['infrastructure']['total_monthly'] * timeframe:,.0f}
     """)
     
     if licensing_model == "BYOL (Bring Your Own License)":
-        if sql_edition == "Enterprise":
-            est_annual_per_core = 14256
-        elif sql_edition == "Standard":
-            est_annual_per_core = 3717
-        else:
-            est_annual_per_core = 1435
-        
-        est_cores = 4  # Assume 4 cores per instance
-        est_total_annual = est_annual_per_core * est_cores * total_instances
+        est_annual_per_core = BYOL_ANNUAL_PER_CORE.get(sql_edition, BYOL_ANNUAL_PER_CORE['Web'])
+        est_total_annual = estimate_byol_annual_cost(sql_edition, total_instances)
         
         st.markdown(f"""
         **🆕 BYOL Licensing Notes:**
@@ -1632,93 +1735,288 @@ with st.expander("Infrastructure Cost Calculations", expanded=False):
         - **Cost breakdown**: {total_instances} instances × 4 cores × ${est_annual_per_core:,.0f}/core
         """)
 
-# Infrastructure Cost Breakdown Chart
-fig_tco = go.Figure(data=[
-    go.Bar(
-        name='Cost Components',
-        x=list(target_tco['tco_breakdown'].keys()),
-        y=list(target_tco['tco_breakdown'].values()),
-        marker_color=['#1e40af', '#dc2626', '#059669', '#f59e0b', '#7c3aed', '#be123c', '#10b981'][:len(target_tco['tco_breakdown'])]
-    )
-])
-
-fig_tco.update_layout(
-    title=f"Total Cost of Ownership Analysis - {timeframe} Month Projection (v7.0: {licensing_model}{'+ Datadog' if enable_datadog else ''})",
-    xaxis_title="Cost Components",
-    yaxis_title="Total Cost (USD)",
-    height=400,
-    font=dict(family="Arial, sans-serif", size=12),
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)'
-)
-
-st.plotly_chart(fig_tco, use_container_width=True)
+if len(pricing_regions) > 1:
+    with st.expander("Regional Cost Comparison", expanded=False):
+        compared_regions = st.multiselect(
+            "Regions to compare",
+            pricing_regions,
+            default=pricing_regions[:6],
+            help="Regions are loaded in parallel on first use and cached for every session"
+        )
+        
+        if compared_regions:
+            region_comparison = compare_regions(
+                plan, compared_regions, regional_pricing, metrics['automation_maturity'], st.session_state.config_params
+            )
+            st.dataframe(
+                region_comparison.rename(columns={
+                    'region': 'Region',
+                    'total_monthly': 'Monthly Infrastructure ($)',
+                    'total_infrastructure_cost': f'{timeframe}-Month Total ($)',
+                    'vs_cheapest_pct': 'vs Cheapest (%)',
+                    'note': 'Note'
+                })[['Region', 'Monthly Infrastructure ($)', f'{timeframe}-Month Total ($)', 'vs Cheapest (%)', 'Note']],
+                use_container_width=True,
+                hide_index=True
+            )
 
-# Enhanced SQL Server Licensing Calculator with BYOL support
-def calculate_sql_server_licensing_aws(deployment_type, instance_type, num_instances, edition="Standard", licensing_model="License-Included"):
-    """Calculate SQL Server licensing costs using AWS License-Included pricing or BYOL with updated rates"""
-    
-    windows_rate = pricing_data['ec2_windows'].get(instance_type, 0.456)
+@st.cache_data(max_entries=16)
+def run_configuration_sweep(plan, automation_level, _price_index, price_fingerprint, config_params, include_byol_estimate):
+    """Evaluate the full configuration grid once per input set"""
+    
+    return sweep_configurations(plan, automation_level, _price_index, config_params,
+                                include_byol_estimate=include_byol_estimate)
+
+section("configuration sweep")
+with st.expander("Configuration Sweep & Pareto Frontier", expanded=False):
+    st.markdown("Evaluates every combination of instance type, SQL edition, licensing model, EBS volume type, "
+                "instances per cluster, Datadog and 24x7 support for the target footprint.")
+    
+    sweep_col1, sweep_col2 = st.columns(2)
+    with sweep_col1:
+        run_sweep = st.checkbox("Run configuration sweep", value=False)
+    with sweep_col2:
+        include_byol_estimate = st.checkbox(
+            "Include estimated BYOL licence cost", value=True,
+            help="BYOL licences are not on the AWS bill; counting them keeps BYOL from always looking cheapest"
+        )
     
-    if licensing_model == "BYOL (Bring Your Own License)":
-        # For BYOL, only pay for Windows compute, bring your own SQL licenses
-        licensing_hourly_rate = 0
-        total_hourly_rate = windows_rate
-        licensing_model_desc = "🆕 BYOL (Customer Licenses)"
-        licensing_notes = f"Customer provides SQL Server {edition} licenses. Only paying for Windows compute."
+    if run_sweep:
+        sweep_results = run_configuration_sweep(
+            plan, metrics['automation_maturity'], price_index, price_index.fingerprint,
+            st.session_state.config_params, include_byol_estimate
+        )
+        best = cheapest_meeting_target(sweep_results)
         
-        # Estimate typical BYOL licensing costs for reference (not included in AWS bill)
-        if edition == "Enterprise":
-            estimated_byol_annual_per_core = 14256  # Approximate SQL Server Enterprise per core
-        elif edition == "Standard": 
-            estimated_byol_annual_per_core = 3717   # Approximate SQL Server Standard per core
+        if best is None:
+            st.warning(f"No configuration reaches the {availability_target}% availability target.")
         else:
-            estimated_byol_annual_per_core = 1435   # Approximate SQL Server Web per core
-            
-        # Assume 4 cores per instance for estimation
-        estimated_cores_per_instance = 4
-        estimated_byol_annual_cost = estimated_byol_annual_per_core * estimated_cores_per_instance
+            st.success(
+                f"Cheapest configuration meeting {availability_target}% availability: {best['instance_type']} | "
+                f"SQL {best['sql_edition']} {best['licensing_model']} | {best['ebs_volume_type']} | "
+                f"{best['ec2_per_cluster']} instances/cluster | Datadog {'on' if best['enable_datadog'] else 'off'} | "
+                f"24x7 {'on' if best['support_24x7'] else 'off'} - ${best['effective_monthly']:,.0f}/month, "
+                f"{best['total_fte']} FTE, {best['availability_pct']:.3f}% estimated availability"
+            )
         
-    else:
-        # AWS License-Included model
-        edition_key_map = {
-            "Web": "ec2_sql_web",
-            "Standard": "ec2_sql_standard", 
-            "Enterprise": "ec2_sql_enterprise"
-        }
+        frontier = sweep_results[sweep_results['pareto']].sort_values('total_cost')
+        st.caption(f"{len(sweep_results):,} configurations evaluated, {len(frontier)} on the Pareto frontier "
+                   f"(lower cost, lower FTE, higher availability)")
         
-        edition_key = edition_key_map.get(edition, "ec2_sql_standard")
-        sql_rate = pricing_data[edition_key].get(instance_type, windows_rate * 2)
+        fig_sweep = go.Figure()
+        fig_sweep.add_trace(go.Scattergl(
+            x=sweep_results['total_cost'], y=sweep_results['availability_pct'], mode='markers',
+            name='All configurations', marker=dict(color='#cbd5e1', size=5)
+        ))
+        fig_sweep.add_trace(go.Scatter(
+            x=frontier['total_cost'], y=frontier['availability_pct'], mode='markers', name='Pareto frontier',
+            marker=dict(color=frontier['total_fte'], colorscale='Viridis', size=11, showscale=True,
+                        colorbar=dict(title='FTE')),
+            text=frontier['instance_type'] + ' / ' + frontier['sql_edition'] + ' / ' + frontier['ec2_per_cluster'].astype(str) + ' per cluster'
+        ))
+        fig_sweep.add_hline(y=availability_target, line_dash="dash", line_color="red",
+                            annotation_text=f"{availability_target}% target")
+        fig_sweep.update_layout(
+            title=f"{timeframe}-Month Cost vs Estimated Availability",
+            xaxis_title=f"{timeframe}-Month Cost (USD)", yaxis_title="Estimated Availability (%)", height=450
+        )
+        show_chart(optimize_figure(fig_sweep))
         
-        licensing_hourly_rate = sql_rate - windows_rate
-        total_hourly_rate = sql_rate
-        licensing_model_desc = "AWS License-Included"
-        licensing_notes = f"Based on updated AWS {edition} License-Included pricing vs Windows-only pricing"
-        estimated_byol_annual_cost = 0
+        st.dataframe(
+            frontier[['instance_type', 'sql_edition', 'licensing_model', 'ebs_volume_type', 'ec2_per_cluster',
+                      'enable_datadog', 'support_24x7', 'effective_monthly', 'total_cost', 'total_fte',
+                      'availability_pct', 'meets_target']].rename(columns={
+                'instance_type': 'Instance Type', 'sql_edition': 'Edition', 'licensing_model': 'Licensing',
+                'ebs_volume_type': 'EBS', 'ec2_per_cluster': 'Instances/Cluster', 'enable_datadog': 'Datadog',
+                'support_24x7': '24x7', 'effective_monthly': 'Monthly ($)', 'total_cost': f'{timeframe}-Month ($)',
+                'total_fte': 'FTE', 'availability_pct': 'Availability (%)', 'meets_target': 'Meets Target'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+@st.cache_data(max_entries=4)
+def summarize_telemetry(telemetry_files):
+    """Stream uploaded telemetry files into per-server statistics once per upload set"""
+    
+    return ingest_telemetry(telemetry_files)
+
+section("telemetry sizing")
+with st.expander("Workload Telemetry Sizing", expanded=False):
+    st.markdown("Upload perfmon/DMV exports (one row per server per sample) with a `server` column and any of "
+                "`cpu_pct`, `memory_gb`, `iops`, `throughput_mbps` and `vcpu`. Files are streamed in chunks into "
+                "per-server percentile sketches, then every server is right-sized and priced.")
+    
+    telemetry_files = st.file_uploader(
+        "Telemetry files (CSV or Parquet)", type=['csv', 'parquet'], accept_multiple_files=True
+    )
+    telemetry_col1, telemetry_col2 = st.columns(2)
+    with telemetry_col1:
+        telemetry_statistic = st.selectbox("Size to", list(QUANTILES) + ['peak'], index=0)
+    with telemetry_col2:
+        telemetry_headroom = st.slider("Headroom (%)", 0, 100, 20, 5)
+    
+    if telemetry_files:
+        telemetry_stats = summarize_telemetry(telemetry_files)
+        try:
+            sized_servers = rightsize_from_telemetry(
+                telemetry_stats, plan, price_index, telemetry_statistic, telemetry_headroom / 100,
+                default_vcpu=current_cpu_cores
+            )
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            estate_costs = estate_infrastructure_costs(sized_servers, plan, price_index)
+            st.success(
+                f"{len(sized_servers):,} servers sized at {telemetry_statistic.upper()} + {telemetry_headroom}% headroom: "
+                f"${estate_costs['total_monthly'].sum():,.0f}/month infrastructure, one instance per server"
+            )
+            st.dataframe(
+                estate_costs[['instance_type', 'servers', 'ec2_compute_monthly', 'sql_licensing_monthly',
+                              'ebs_monthly', 'total_monthly']].rename(columns={
+                    'instance_type': 'Instance Type', 'servers': 'Servers', 'ec2_compute_monthly': 'EC2 ($/month)',
+                    'sql_licensing_monthly': 'SQL Licensing ($/month)', 'ebs_monthly': 'EBS ($/month)',
+                    'total_monthly': 'Total ($/month)'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.dataframe(
+                sized_servers[['vcpu', 'memory_gib', 'ebs_bandwidth_mbps', 'iops', 'recommended_instance_type',
+                               'monthly_cost']].rename(columns={
+                    'vcpu': 'vCPU Needed', 'memory_gib': 'Memory Needed (GiB)',
+                    'ebs_bandwidth_mbps': 'EBS Bandwidth (Mbps)', 'iops': 'IOPS',
+                    'recommended_instance_type': 'Recommended Instance', 'monthly_cost': 'Instance ($/month)'
+                }),
+                use_container_width=True
+            )
+
+@st.cache_data(max_entries=16)
+def compare_saved_scenarios(names, content_hashes, _regional_pricing, catalog_mtime):
+    """One batch evaluation of the selected saved scenarios, priced across their regions.
+
+    Content hashes re-key the cache when a name is re-saved, the catalog mtime after a re-ingest.
+    """
     
-    licensing_monthly_cost = licensing_hourly_rate * 24 * 30
+    scenarios = load_scenarios(names, DEFAULT_SCENARIO_STORE_PATH)
+    regions = sorted({scenario['plan'].get('region') or DEFAULT_REGION for scenario in scenarios})
+    return compare_scenarios(scenarios, _regional_pricing.combined_index(regions))
+
+section("scenario comparison")
+with st.expander("Scenario Comparison", expanded=False):
+    st.markdown(f"Compare up to {MAX_COMPARED_SCENARIOS} saved scenarios side by side. All selected scenarios are "
+                "costed and forecast in one batch.")
     
-    if deployment_type == "AlwaysOn Cluster":
-        total_monthly_cost = licensing_monthly_cost * 3 * num_instances
-        total_instances_calc = 3 * num_instances
+    comparable = {scenario['name']: scenario['content_hash'] for scenario in saved_scenarios}
+    compared_names = st.multiselect("Scenarios to compare", list(comparable),
+                                    max_selections=MAX_COMPARED_SCENARIOS)
+    
+    comparison = None
+    if not comparable:
+        st.caption("Save scenarios from the sidebar to compare them here.")
+    elif len(compared_names) < 2:
+        st.caption("Select at least two scenarios.")
     else:
-        total_monthly_cost = licensing_monthly_cost * num_instances
-        total_instances_calc = num_instances
-    
-    return {
-        "monthly_cost": total_monthly_cost,
-        "annual_cost": total_monthly_cost * 12,
-        "licensing_model": licensing_model_desc, 
-        "edition": edition,
-        "hourly_rate_per_instance": licensing_hourly_rate,
-        "total_hourly_rate": total_hourly_rate,
-        "estimated_byol_annual_per_instance": estimated_byol_annual_cost if licensing_model == "BYOL (Bring Your Own License)" else 0,
-        "notes": licensing_notes
-    }
+        try:
+            comparison = compare_saved_scenarios(
+                tuple(compared_names), tuple(comparable[name] for name in compared_names),
+                regional_pricing, catalog_mtime
+            )
+        except MissingPriceError as e:
+            st.error(f"Pricing unavailable for a compared scenario: {e}")
+    
+    if comparison is not None:
+        summary = comparison['summary']
+        st.dataframe(
+            summary[['instance_type', 'sql_edition', 'licensing_model', 'region', 'target_clusters', 'timeframe',
+                     'automation_maturity', 'target_monthly', 'total_infrastructure_cost', 'target_fte',
+                     'fte_reduction', 'peak_team_size', 'total_new_hires']].rename(columns={
+                'instance_type': 'Instance Type', 'sql_edition': 'Edition', 'licensing_model': 'Licensing',
+                'region': 'Region', 'target_clusters': 'Target Clusters', 'timeframe': 'Months',
+                'automation_maturity': 'Automation (%)', 'target_monthly': 'Target Monthly ($)',
+                'total_infrastructure_cost': 'Infrastructure TCO ($)', 'target_fte': 'Target FTE',
+                'fte_reduction': 'FTE Saved by Automation', 'peak_team_size': 'Peak Team Size',
+                'total_new_hires': 'Total New Hires'
+            }),
+            use_container_width=True
+        )
+        
+        breakdown = comparison['tco_breakdown']
+        fig_compare_tco = go.Figure([
+            go.Bar(name=component, x=breakdown.index, y=breakdown[component])
+            for component in breakdown.columns if breakdown[component].any()
+        ])
+        fig_compare_tco.update_layout(barmode='stack', title="Infrastructure TCO by Component",
+                                      xaxis_title="Scenario", yaxis_title="Total Cost (USD)", height=420)
+        show_chart(optimize_figure(fig_compare_tco))
+        
+        compared_forecast = comparison['forecast']
+        from plotly.subplots import make_subplots
+        
+        fig_compare_forecast = make_subplots(
+            rows=2, cols=1, shared_xaxes=True,
+            subplot_titles=('Team Size (FTE) by Month', 'Infrastructure Clusters by Month')
+        )
+        for name, scenario_forecast in compared_forecast.groupby('scenario', sort=False):
+            fig_compare_forecast.add_trace(
+                go.Scatter(x=scenario_forecast['month'], y=scenario_forecast['total_team_size'], name=name,
+                           legendgroup=name, mode='lines'),
+                row=1, col=1
+            )
+            fig_compare_forecast.add_trace(
+                go.Scatter(x=scenario_forecast['month'], y=scenario_forecast['clusters'], name=name,
+                           legendgroup=name, showlegend=False, mode='lines'),
+                row=2, col=1
+            )
+        fig_compare_forecast.update_layout(height=550, title_text="Scenario Forecasts")
+        fig_compare_forecast.update_xaxes(title_text="Month", row=2, col=1)
+        show_chart(optimize_figure(fig_compare_forecast))
+
+section("export")
+with st.expander("📥 Export Roadmap & TCO", expanded=False):
+    st.markdown("Download the monthly roadmap (with per-role hiring), TCO breakdown and summary of the current plan "
+                "and of any scenarios selected for comparison above. Rows are streamed into the file as they are "
+                "computed; use `python -m planner.export` for whole scenario files.")
+    
+    export_format = st.radio("Export format", EXPORT_FORMATS, horizontal=True, format_func=str.upper)
+    current_plan_name = "Current plan" if "Current plan" not in compared_names else "Current plan (unsaved)"
+    # Prepared files stay valid until the plan, the compared scenarios, the format or the prices change
+    export_key = (scenario_hash(plan, st.session_state), tuple(comparable[name] for name in compared_names),
+                  export_format, price_index.fingerprint)
+    
+    if st.button("Prepare Export"):
+        export_scenarios = [{'name': current_plan_name, **scenario_content(plan, st.session_state)}]
+        if compared_names:
+            export_scenarios += load_scenarios(compared_names, DEFAULT_SCENARIO_STORE_PATH)
+        export_regions = sorted({scenario['plan'].get('region') or DEFAULT_REGION for scenario in export_scenarios})
+        try:
+            export_prices = price_index if export_regions == [region] else regional_pricing.combined_index(export_regions)
+            st.session_state.export_files = (
+                export_key, export_bytes(export_chunks(export_scenarios, export_prices), export_format)
+            )
+        except MissingPriceError as e:
+            st.error(f"Pricing unavailable for an exported scenario: {e}")
+        except ImportError as e:
+            st.error(str(e))
+    
+    prepared_export = st.session_state.get('export_files')
+    if prepared_export is not None and prepared_export[0] == export_key:
+        for file_name, data in prepared_export[1].items():
+            st.download_button(f"Download {file_name}", data, file_name=file_name,
+                               mime=EXPORT_MIME_TYPES[export_format], key=f"download_{file_name}")
+    elif prepared_export is not None:
+        st.caption("Inputs changed since the last export; prepare it again.")
+
+# Infrastructure Cost Breakdown Chart
+section("TCO chart & licensing analysis")
+show_chart(page_results['tco_figure'])
 
 st.markdown("### SQL Server Licensing Analysis")
 
-aws_licensing_info = calculate_sql_server_licensing_aws(deployment_type, instance_type, target_clusters, sql_edition, licensing_model)
+if portfolio_mode:
+    aws_licensing_info = page_results['licensing']
+else:
+    aws_licensing_info = calculate_sql_server_licensing_aws(deployment_type, instance_type, target_clusters, sql_edition, licensing_model, price_index)
 
 col1, col2, col3 = st.columns(3)
 
@@ -1754,6 +2052,16 @@ with col3:
     
     st.caption(f"**Pricing Model:** {aws_licensing_info['notes']}")
 
+if portfolio_mode:
+    st.dataframe(
+        pd.DataFrame(aws_licensing_info['by_edition']).rename(columns={
+            'sql_edition': 'Edition', 'licensing_model': 'Licensing Model', 'total_instances': 'Instances',
+            'sql_licensing_monthly': 'AWS Licensing ($/month)', 'estimated_byol_annual': 'Est. External BYOL ($/year)'
+        }).round(0),
+        hide_index=True,
+        use_container_width=True
+    )
+
 # Add Datadog monitoring cost display if enabled
 if enable_datadog:
     st.markdown("### 🆕 Datadog Monitoring Analysis")
@@ -1782,6 +2090,7 @@ if enable_datadog:
         st.caption("**Includes:** Infrastructure monitoring, APM, log analytics, synthetic monitoring, and custom dashboards")
 
 # Workforce FTE Impact Analysis
+section("workforce FTE analysis")
 st.markdown("### Workforce FTE Requirements Analysis")
 
 col1, col2, col3 = st.columns(3)
@@ -1841,6 +2150,7 @@ with col3:
         st.warning("Limited workforce impact - consider additional automation")
 
 # Executive Summary & Recommendations
+section("executive summary")
 st.subheader("Executive Summary & Recommendations")
 
 col1, col2 = st.columns(2)
@@ -1938,6 +2248,7 @@ else:
     st.markdown('<div class="alert-info"><strong>⚠️ DEVELOPMENT REQUIRED</strong> - Significant gaps exist, requires practical development approach</div>', unsafe_allow_html=True)
 
 # Final validation note with practical parameters and new features
+section("methodology notes")
 st.markdown("---")
 st.markdown(f"""
 ### 🆕 Enterprise SQL Server Platform v7.0 - Complete Analysis Summary
@@ -1998,4 +2309,68 @@ This updated estimation tool provides infrastructure cost projections with curre
 # Footer with version update
 st.markdown("---")
 st.markdown("**🆕 Enterprise SQL Server Scaling Platform v7.0 - BYOL & Datadog Edition**")
-st.markdown("*Complete Feature Set | BYOL Support | Datadog Monitoring | Practical Automation Limits | Conservative Workforce Ratios | Current 2025 AWS Pricing | Monthly Forecasting | ITIL Framework | Enterprise Governance | Industry Benchmarks | Risk Assessment*")
\ No newline at end of file
+st.markdown("*Complete Feature Set | BYOL Support | Datadog Monitoring | Practical Automation Limits | Conservative Workforce Ratios | Current 2025 AWS Pricing | Monthly Forecasting | ITIL Framework | Enterprise Governance | Industry Benchmarks | Risk Assessment*")
+
+# Performance panel: this rerun's section and calculation spans plus a rolling history
+PERFORMANCE_HISTORY = 30
+rerun_trace = stop_recording()
+if rerun_trace is not None:
+    if TRACE_LOG_PATH:
+        append_trace_log(rerun_trace)
+    performance_traces = st.session_state.setdefault('performance_traces', [])
+    performance_traces.append(rerun_trace)
+    del performance_traces[:-PERFORMANCE_HISTORY]
+
+st.sidebar.checkbox("⏱️ Performance panel", key='performance_panel',
+                    help="Time every page section and engine calculation on each rerun")
+if st.session_state.performance_panel and rerun_trace is not None:
+    performance_traces = st.session_state.performance_traces
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.metric("This Rerun", f"{rerun_trace.duration_ms:,.0f} ms",
+                  delta=(f"{rerun_trace.duration_ms - performance_traces[-2].duration_ms:+,.0f} ms"
+                         if len(performance_traces) > 1 else None), delta_color='inverse')
+        
+        section_times = pd.DataFrame([
+            {'Section': item['name'], 'Time (ms)': item['duration_ns'] / 1e6}
+            for item in rerun_trace.spans if item['attributes'].get('section')
+        ])
+        st.dataframe(section_times.sort_values('Time (ms)', ascending=False).round(1),
+                     hide_index=True, use_container_width=True)
+        
+        st.markdown("**Slowest spans**")
+        st.dataframe(
+            pd.DataFrame(span_summary(rerun_trace)).head(15).rename(columns={
+                'name': 'Span', 'calls': 'Calls', 'total_ms': 'Total (ms)', 'self_ms': 'Self (ms)'
+            }).round(1),
+            hide_index=True, use_container_width=True
+        )
+        
+        st.markdown(f"**Last {len(performance_traces)} reruns**")
+        st.area_chart(pd.DataFrame([
+            {item['name']: item['duration_ns'] / 1e6 for item in trace.spans if item['attributes'].get('section')}
+            for trace in performance_traces
+        ]).fillna(0.0), height=220)
+        
+        st.download_button("Download spans (JSON)",
+                           json.dumps([span_records(trace) for trace in performance_traces]),
+                           file_name="planner_spans.json", mime="application/json")
+        st.download_button("Download spans (OTLP JSON)", json.dumps(otlp_json(performance_traces)),
+                           file_name="planner_spans_otlp.json", mime="application/json")
+
+# Startup profile (SQLAO_PROFILE_STARTUP=1): phase timings of this run against the cold-start budget
+startup_profile.mark('render')
+if PROFILE_STARTUP:
+    startup_report = startup_profile.report()
+    st.session_state.startup_profile = startup_report
+    with st.sidebar.expander("⏱️ Startup Profile", expanded=startup_report['cold']):
+        st.caption(f"{'Cold start' if startup_report['cold'] else 'Warm rerun'} - "
+                   f"{startup_report['modules_loaded']:,} modules imported during this run")
+        for name, value in startup_report['totals'].items():
+            budget = startup_report['budget'][name]
+            label = 'Rerun' if name == 'first_render' and not startup_report['cold'] else name.replace('_', ' ').title()
+            st.metric(label, f"{value:,.0f} ms", delta=f"{value - budget:+,.0f} ms vs budget", delta_color='inverse')
+        st.dataframe(pd.DataFrame({'Phase': list(startup_report['phases']),
+                                   'Time (ms)': [round(value) for value in startup_report['phases'].values()]}),
+                     hide_index=True, use_container_width=True)
+        st.caption(f"Budget tracked between releases with `python -m planner.startup` "
+                   f"(first render {STARTUP_BUDGET_MS['first_render']:,} ms).")
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Planning API request validation, driven through PlanningService.handle"""
+
+import asyncio
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+
+from planner import api
+from planner.api import PlanningService
+from planner.catalog import PriceListDumpClient, ingest_pricing
+from planner.regions import RegionalPricing, catalog_loader, representative_loader
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'get_products.json')
+
+
+def handle(path, body, loader=representative_loader):
+    async def run():
+        service = PlanningService(RegionalPricing(loader), workers=1)
+        try:
+            return await service.handle('POST', path, json.dumps(body).encode())
+        finally:
+            service.close()
+
+    status, payload = asyncio.run(run())
+    return status, json.loads(payload)
+
+
+@pytest.mark.parametrize('path, body, message', [
+    ('/tco', {'plan': [1]}, "'plan' must be a JSON object"),
+    ('/licensing', {'plan': 'x'}, "'plan' must be a JSON object"),
+    ('/batch', {'scenarios': ['x']}, "'scenarios[0]' must be a JSON object"),
+    ('/batch', {'scenarios': [{}, {'plan': [1]}]}, "'scenarios[1].plan' must be a JSON object"),
+    ('/tco', {'automation_components': [1]}, "'automation_components' must be a JSON object"),
+    ('/forecast', {'config_params': 'x'}, "'config_params' must be a JSON object"),
+    ('/tco', {'itil_practices': {'Incident Management': True}},
+     "'itil_practices.Incident Management' must be a JSON object"),
+    ('/batch', {'scenarios': [{'current_skills': [2]}]}, "'scenarios[0].current_skills' must be a JSON object"),
+    ('/forecast', {'plan': {'timeframe': 100000000}}, "'plan.timeframe' must be a number from 6 to 60"),
+    ('/forecast', {'plan': {'timeframe': 0}}, "'plan.timeframe' must be a number from 6 to 60"),
+    ('/tco', {'plan': {'target_clusters': -5}}, "'plan.target_clusters' must be a number from 1 to 10000"),
+    ('/tco', {'plan': {'current_clusters': '5'}}, "'plan.current_clusters' must be a number from 1 to 1000"),
+    ('/tco', {'config_params': {'dba_ratio': 0}}, "'config_params.dba_ratio' must be a number from 15 to 40"),
+    ('/batch', {'scenarios': [{'plan': {'timeframe': 0}}]},
+     "'scenarios[0].plan.timeframe' must be a number from 6 to 60"),
+    ('/rightsize', {'servers': [{'vcpu': 8, 'memory_gib': 64}], 'headroom': 5},
+     "'headroom' must be a number from 0 to 1"),
+    ('/rightsize', {}, "'servers' must be a non-empty list of rows with vcpu and memory_gib"),
+    ('/rightsize', {'servers': []}, "'servers' must be a non-empty list of rows with vcpu and memory_gib"),
+    ('/rightsize', {'servers': [1, 'x']}, "'servers' must be a non-empty list of rows with vcpu and memory_gib"),
+])
+def test_malformed_requests_are_rejected(path, body, message):
+    assert handle(path, body) == (HTTPStatus.BAD_REQUEST, {'error': message})
+
+
+@pytest.mark.parametrize('region', ['ap-south-1', 'xx-nowhere-1'])
+def test_region_missing_from_catalog(tmp_path, region):
+    catalog_path = str(tmp_path / 'pricing_catalog.sqlite')
+    ingest_pricing(PriceListDumpClient.from_file(FIXTURE), ['us-east-1', 'ap-south-1'], catalog_path)
+
+    status, payload = handle('/tco', {'plan': {'region': region}}, catalog_loader(catalog_path))
+
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert region in payload['error']
+
+
+def test_unpriced_region():
+    status, payload = handle('/tco', {'plan': {'region': 'eu-west-1'}})
+
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert 'eu-west-1' in payload['error']
+
+
+def test_unexpected_errors_answer_500(monkeypatch):
+    def broken_endpoint(request, prices):
+        return 1 / 0
+
+    monkeypatch.setitem(api.ENDPOINTS, '/tco', broken_endpoint)
+    status, payload = handle('/tco', {})
+
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert payload['error'].startswith('Internal error: ZeroDivisionError')
+
+
+def test_non_finite_results_answer_422(monkeypatch):
+    monkeypatch.setitem(api.ENDPOINTS, '/tco', lambda request, prices: {'total': float('nan')})
+    status, payload = handle('/tco', {})
+
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert payload == {'error': 'These inputs produce non-finite results'}
+
+
+def test_valid_request():
+    status, payload = handle('/tco', {'plan': {'target_clusters': 5}})
+
+    assert status == HTTPStatus.OK
+    assert set(payload) == {'automation_maturity', 'current', 'target', 'baseline'}
+
+
+def test_rightsize_without_regions_uses_default_region():
+    status, payload = handle('/rightsize', {'servers': [{'vcpu': 8, 'memory_gib': 64}]})
+
+    assert status == HTTPStatus.OK
+    assert len(payload['servers']) == 1
@@ -0,0 +1,24 @@
+"""Page behaviour through Streamlit's app test harness"""
+
+import os
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'streamlit_app.py')
+
+
+def refresh_prompts(app):
+    return [button.key for button in app.button if str(button.key).startswith('refresh_')]
+
+
+def test_unchanged_panels_show_no_refresh_prompt():
+    app = AppTest.from_file(APP_PATH, default_timeout=300)
+    app.run()
+    assert not app.exception
+    assert refresh_prompts(app) == []
+
+    # Portfolio mode overrides the dashboard's instance counts with per-group sums
+    app.sidebar.toggle(key='portfolio_mode').set_value(True).run()
+    assert not app.exception
+    assert refresh_prompts(app) == []
+    assert not [info for info in app.info if 'Selections changed' in info.value]
@@ -0,0 +1,37 @@
+"""Automation portfolio optimizer"""
+
+import math
+
+import pytest
+
+from planner.defaults import DEFAULT_AUTOMATION_COMPONENTS, DEFAULT_PLAN
+from planner.optimizer import _integer_weights, optimize_automation
+
+
+@pytest.mark.parametrize('weights, expected', [
+    ([8, 9, 10], [8, 9, 10]),
+    ([10, 20, 15], [2, 4, 3]),
+    ([0.5, 1.25, 2], [2, 5, 8]),
+    ([0.01, 1], [1, 100]),
+    ([], []),
+])
+def test_integer_weights_keep_ratios(weights, expected):
+    assert _integer_weights(weights).tolist() == expected
+
+
+def test_integer_weights_reject_finer_than_precision():
+    with pytest.raises(ValueError, match='multiples of 0.01'):
+        _integer_weights([1, 1 / 3])
+
+
+@pytest.mark.parametrize('effort_budget', [-1, -0.5, math.nan])
+def test_invalid_effort_budget(effort_budget):
+    with pytest.raises(ValueError, match='Effort budget'):
+        optimize_automation(DEFAULT_AUTOMATION_COMPONENTS, effort_budget, DEFAULT_PLAN)
+
+
+def test_zero_budget_selects_nothing():
+    result = optimize_automation(DEFAULT_AUTOMATION_COMPONENTS, 0, DEFAULT_PLAN)
+
+    assert result['selected'] == []
+    assert result['automation_maturity'] == 0
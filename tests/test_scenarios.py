@@ -0,0 +1,24 @@
+"""Saved scenario store"""
+
+from planner.defaults import default_state, make_plan
+from planner.scenarios import list_scenarios, load_scenario, save_scenario
+
+
+def test_saves_within_one_second_list_newest_first(tmp_path):
+    store_path = str(tmp_path / 'scenarios.sqlite')
+    state = default_state()
+    for name, clusters in [('b', 10), ('c', 20), ('a', 30)]:
+        save_scenario(name, make_plan(target_clusters=clusters), state, store_path=store_path)
+
+    assert [row['name'] for row in list_scenarios(store_path)] == ['a', 'c', 'b']
+
+
+def test_resave_moves_name_to_front(tmp_path):
+    store_path = str(tmp_path / 'scenarios.sqlite')
+    state = default_state()
+    save_scenario('a', make_plan(target_clusters=10), state, store_path=store_path)
+    save_scenario('b', make_plan(target_clusters=20), state, store_path=store_path)
+    save_scenario('a', make_plan(target_clusters=30), state, store_path=store_path)
+
+    assert [row['name'] for row in list_scenarios(store_path)] == ['a', 'b']
+    assert load_scenario('a', store_path)['plan']['target_clusters'] == 30
@@ -0,0 +1,21 @@
+"""Configuration sweep"""
+
+import pandas as pd
+
+from planner.defaults import DEFAULT_PLAN
+from planner.sweep import configuration_grid, default_sweep_axes, parallel_threshold, sweep_configurations
+
+
+def test_parallel_threshold():
+    assert parallel_threshold(1) == float('inf')
+    assert parallel_threshold(2) > parallel_threshold(4) > parallel_threshold(64)
+    # The pool cannot win on the default grid: its startup costs more than the whole in-process run
+    assert len(configuration_grid(default_sweep_axes(DEFAULT_PLAN))) < parallel_threshold(64)
+
+
+def test_pooled_sweep_matches_in_process():
+    axes = {'ec2_per_cluster': list(range(2, 16))}
+    in_process = sweep_configurations(DEFAULT_PLAN, 50, axes=axes, workers=1)
+    assert len(in_process) >= parallel_threshold(2)
+
+    pd.testing.assert_frame_equal(sweep_configurations(DEFAULT_PLAN, 50, axes=axes, workers=2), in_process)